@@ -1,9 +1,23 @@
 __all__ = [
+	"backends",
+	"batch",
+	"cache",
+	"columnar",
 	"data",
+	"hashing",
+	"join",
 	"model",
+	"modelfile",
+	"optim",
 	"metrics",
 	"cv",
+	"pipeline",
 	"pricing",
+	"portfolio",
+	"profiling",
+	"scorer",
+	"search",
+	"topk",
 	"utils",
 ]
 
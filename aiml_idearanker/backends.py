@@ -0,0 +1,144 @@
+from operator import mul
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .columnar import FeatureMatrix
+from .metrics import log_loss
+from .utils import sigmoid
+
+
+# Compute kernels for logistic regression. The training loop in model.py is backend-agnostic;
+# a backend only supplies batched probabilities, the (unnormalized) log-loss gradient over a
+# contiguous row range, mean log-loss, and a row permutation for mini-batch shuffling.
+# `offset` is an optional extra margin per row (of the same range), added before the sigmoid;
+# hashed features use it for their sparse part of the dot product.
+
+_NUMPY: Any = None
+
+
+def _numpy() -> Any:
+	global _NUMPY
+	if _NUMPY is None:
+		try:
+			import numpy
+		except ImportError:
+			_NUMPY = False
+		else:
+			_NUMPY = numpy
+	return _NUMPY or None
+
+
+def numpy_available() -> bool:
+	return _numpy() is not None
+
+
+def predict_proba_columns(weights: List[float], X: FeatureMatrix, offset: Optional[Sequence[float]] = None) -> List[float]:
+	bias = weights[0]
+	w = weights[1:]
+	if offset is not None:
+		return [sigmoid(bias + o + sum(map(mul, w, vals))) for vals, o in zip(zip(*X.columns), offset)]
+	return [sigmoid(bias + sum(map(mul, w, vals))) for vals in zip(*X.columns)]
+
+
+class PythonKernels:
+	def __init__(self, X: FeatureMatrix, y: Optional[Sequence[int]] = None) -> None:
+		self.X = X
+		self.y = y
+
+	def predict(self, w: List[float], offset: Optional[Sequence[float]] = None) -> List[float]:
+		return predict_proba_columns(w, self.X, offset)
+
+	def permute(self, order: Sequence[int]) -> None:
+		self.X = self.X.take(order)
+		if self.y is not None:
+			self.y = [self.y[i] for i in order]
+
+	def _rows(self, start: int, stop: Optional[int]) -> FeatureMatrix:
+		if start == 0 and stop is None:
+			return self.X
+		return FeatureMatrix([col[start:stop] for col in self.X.columns])
+
+	def errors(self, w: List[float], start: int = 0, stop: Optional[int] = None, offset: Optional[Sequence[float]] = None) -> List[float]:
+		# p - y over rows[start:stop]
+		y = self.y[start:stop] if self.y is not None else ()
+		return [p - t for p, t in zip(predict_proba_columns(w, self._rows(start, stop), offset), y)]
+
+	def error_gradient(self, err: Sequence[float], start: int = 0, stop: Optional[int] = None) -> List[float]:
+		return [sum(err)] + [sum(map(mul, err, col)) for col in self._rows(start, stop).columns]
+
+	def gradient(self, w: List[float], start: int = 0, stop: Optional[int] = None, offset: Optional[Sequence[float]] = None) -> List[float]:
+		# [sum(err), sum(err * x_1), ...] over rows[start:stop], in row order
+		X = self._rows(start, stop)
+		y = self.y if X is self.X else self.y[start:stop]  # type: ignore[index]
+		err = [p - t for p, t in zip(predict_proba_columns(w, X, offset), y or ())]
+		return [sum(err)] + [sum(map(mul, err, col)) for col in X.columns]
+
+	def loss(self, w: List[float], offset: Optional[Sequence[float]] = None) -> float:
+		return log_loss(self.y or (), self.predict(w, offset))
+
+
+class NumpyKernels:
+	def __init__(self, X: FeatureMatrix, y: Optional[Sequence[int]] = None) -> None:
+		np = _numpy()
+		if np is None:
+			raise ImportError("numpy backend requested but numpy is not installed")
+		self.np = np
+		# (n_rows, n_features) copy built once from the column buffers
+		if X.n_features:
+			self.X = np.column_stack([np.frombuffer(col, dtype=np.float64) for col in X.columns])
+		else:
+			self.X = np.empty((len(X), 0), dtype=np.float64)
+		self.y = np.asarray(y, dtype=np.float64) if y is not None else None
+
+	def _sigmoid(self, z: Any) -> Any:
+		# Stable: exp only ever sees non-positive arguments.
+		e = self.np.exp(-self.np.abs(z))
+		return self.np.where(z >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
+
+	def _proba(self, w: List[float], offset: Any = None) -> Any:
+		z = self.X @ self.np.asarray(w[1:], dtype=self.np.float64) + w[0]
+		return self._sigmoid(z if offset is None else z + offset)
+
+	def predict(self, w: List[float], offset: Any = None) -> List[float]:
+		return self._proba(w, offset).tolist()
+
+	def permute(self, order: Sequence[int]) -> None:
+		idx = self.np.asarray(order, dtype=self.np.intp)
+		self.X = self.X[idx]
+		if self.y is not None:
+			self.y = self.y[idx]
+
+	def errors(self, w: List[float], start: int = 0, stop: Optional[int] = None, offset: Any = None) -> Any:
+		z = self.X[start:stop] @ self.np.asarray(w[1:], dtype=self.np.float64) + w[0]
+		return self._sigmoid(z if offset is None else z + offset) - self.y[start:stop]
+
+	def error_gradient(self, err: Any, start: int = 0, stop: Optional[int] = None) -> List[float]:
+		return [float(err.sum())] + (self.X[start:stop].T @ err).tolist()
+
+	def gradient(self, w: List[float], start: int = 0, stop: Optional[int] = None, offset: Any = None) -> List[float]:
+		return self.error_gradient(self.errors(w, start, stop, offset), start, stop)
+
+	def loss(self, w: List[float], offset: Any = None, eps: float = 1e-15) -> float:
+		p = self.np.clip(self._proba(w, offset), eps, 1.0 - eps)
+		return float(-self.np.mean(self.y * self.np.log(p) + (1.0 - self.y) * self.np.log(1.0 - p)))
+
+
+BACKENDS: Dict[str, Callable[..., Any]] = {
+	"python": PythonKernels,
+	"numpy": NumpyKernels,
+}
+
+
+def register_backend(name: str, factory: Callable[..., Any]) -> None:
+	BACKENDS[name] = factory
+
+
+def resolve_backend(name: str = "auto") -> str:
+	if name == "auto":
+		return "numpy" if numpy_available() else "python"
+	if name not in BACKENDS:
+		raise ValueError(f"Unknown backend '{name}'. Choose from: auto, {', '.join(sorted(BACKENDS))}")
+	return name
+
+
+def make_kernels(backend: str, X: FeatureMatrix, y: Optional[Sequence[int]] = None) -> Any:
+	return BACKENDS[resolve_backend(backend)](X, y)
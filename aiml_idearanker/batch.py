@@ -0,0 +1,214 @@
+import csv
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .data import build_features, iter_csv_chunks, load_csv
+from .join import read_header
+from .pipeline import score, write_predictions
+from .profiling import span
+from .scorer import Scorer, load_scorer
+from .topk import merge_top_k, read_top_k, top_k_file, write_top_k
+from .utils import ensure_dir, file_sha256, load_json
+
+
+# Sharded batch scoring: every input shard gets its own predictions file and an entry in a JSON
+# manifest. Shards run in a process pool whose workers load the model once; a re-run skips shards
+# whose manifest entry is "done" for the same model and unchanged input, so failures are resumable.
+
+MANIFEST_NAME = "manifest.json"
+# Names shard_output and the merged top-K file use (see find_shards)
+OUTPUT_NAME = re.compile(r"(.*\.(predictions|top\d+)|top\d+)\.csv")
+
+
+def score_file(model: Scorer, input_path: str, output_path: str, chunk_size: int = 0, id_column: Optional[str] = "idea_id") -> int:
+	# Writes prob_success (preceded by id_column when the input has it); returns the row count.
+	# chunk_size > 0 streams the input so memory is O(chunk_size).
+	if id_column not in read_header(input_path):
+		id_column = None
+	if chunk_size <= 0:
+		rows = load_csv(input_path)
+		records = score(model, rows)
+		if id_column:
+			records.add(id_column, [r[id_column] for r in rows])
+		write_predictions(output_path, records, id_column)
+		return len(records)
+	n = 0
+	with open(output_path, "w", encoding="utf-8", newline="") as f:
+		writer = csv.writer(f)
+		writer.writerow(([id_column] if id_column else []) + ["prob_success"])
+		for rows in iter_csv_chunks(input_path, chunk_size):
+			X, _ = build_features(rows)
+			probs = model.predict_proba(X, copy=False, sparse=model.hash_rows(rows))
+			with span("write_csv", rows=len(rows)):
+				if id_column:
+					writer.writerows([r[id_column], f"{p:.6f}"] for r, p in zip(rows, probs))
+				else:
+					writer.writerows([f"{p:.6f}"] for p in probs)
+			n += len(rows)
+	return n
+
+
+def find_shards(source: str, output_dir: Optional[str] = None) -> List[str]:
+	# A directory means every *.csv directly inside it; anything else is a glob pattern (** allowed).
+	# Outputs of earlier runs are never shards: in output_dir or any dir holding a manifest, files
+	# named like outputs (stale ones from an earlier mode or an interrupted run included), and any
+	# file a manifest lists as an output. So an output dir that is the shard dir, or that the glob
+	# matches, is not rescored.
+	out_dir = os.path.realpath(output_dir) if output_dir else None
+	folders: Dict[str, Tuple[bool, Set[str]]] = {}
+
+	def is_output(path: str) -> bool:
+		real = os.path.realpath(path)
+		folder, name = os.path.split(real)
+		if folder not in folders:
+			has_manifest = os.path.exists(os.path.join(folder, MANIFEST_NAME))
+			folders[folder] = (folder == out_dir or has_manifest, manifest_outputs(folder) if has_manifest else set())
+		output_dir_like, listed = folders[folder]
+		return real in listed or (output_dir_like and OUTPUT_NAME.fullmatch(name) is not None)
+
+	pattern = os.path.join(source, "*.csv") if os.path.isdir(source) else source
+	shards = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p) and not is_output(p))
+	names = [os.path.basename(p) for p in shards]
+	dupes = sorted({n for n in names if names.count(n) > 1})
+	if dupes:
+		raise ValueError(f"Shard file names must be unique (outputs are named after them): {dupes}")
+	return shards
+
+
+def shard_output(output_dir: str, shard: str, top_k: int = 0) -> str:
+	stem, _ = os.path.splitext(os.path.basename(shard))
+	return os.path.join(output_dir, f"{stem}.top{top_k}.csv" if top_k > 0 else f"{stem}.predictions.csv")
+
+
+def input_fingerprint(path: str) -> Dict[str, int]:
+	st = os.stat(path)
+	return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_manifest(output_dir: str) -> Dict[str, object]:
+	path = os.path.join(output_dir, MANIFEST_NAME)
+	if not os.path.exists(path):
+		return {"shards": {}}
+	return load_json(path)
+
+
+def manifest_outputs(output_dir: str) -> Set[str]:
+	# Real paths of every output recorded in output_dir's manifest (none without one)
+	try:
+		manifest = load_manifest(output_dir)
+	except (OSError, ValueError):
+		return set()
+	paths = [e.get("output") for e in manifest.get("shards", {}).values()] + [manifest.get("top_k_output")]  # type: ignore[union-attr]
+	return {os.path.realpath(str(p)) for p in paths if p}
+
+
+def save_manifest(output_dir: str, manifest: Dict[str, object]) -> None:
+	path = os.path.join(output_dir, MANIFEST_NAME)
+	tmp = path + ".tmp"
+	with open(tmp, "w", encoding="utf-8") as f:
+		json.dump(manifest, f, indent=2)
+	os.replace(tmp, path)
+
+
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(model_path: str, backend: str, precision: str) -> None:
+	_WORKER["model"] = load_scorer(model_path, precision, backend)
+
+
+def _score_shard(shard: str, output: str, chunk_size: int, id_column: Optional[str], top_k: int, columns: Sequence[str]) -> Tuple[int, float]:
+	# Runs in a worker; the output appears only once complete (tmp file + rename), and a stale
+	# output from an earlier run of the shard is removed first so a failure never leaves one behind
+	t0 = time.perf_counter()
+	tmp = output + ".tmp"
+	if os.path.exists(output):
+		os.remove(output)
+	try:
+		if top_k > 0:
+			# Per-shard heap, written in full precision so the parent can merge the shard files
+			top, rows = top_k_file(_WORKER["model"], shard, top_k, id_column, columns, chunk_size)  # type: ignore[arg-type]
+			write_top_k(tmp, top.ranked(), id_column if id_column in read_header(shard) else None, columns)
+		else:
+			rows = score_file(_WORKER["model"], shard, tmp, chunk_size, id_column)  # type: ignore[arg-type]
+	except BaseException:
+		if os.path.exists(tmp):
+			os.remove(tmp)
+		raise
+	os.replace(tmp, output)
+	return rows, time.perf_counter() - t0
+
+
+def score_shards(
+	model_path: str,
+	source: str,
+	output_dir: str,
+	workers: int = 1,
+	backend: str = "auto",
+	chunk_size: int = 0,
+	id_column: Optional[str] = "idea_id",
+	force: bool = False,
+	top_k: int = 0,
+	columns: Sequence[str] = (),
+	precision: str = "float64",
+) -> Dict[str, object]:
+	# Returns the manifest: {"model", "model_sha256", "shards": {shard: entry}} where entry has
+	# status ("done" | "failed"), output, rows, seconds, input fingerprint and error (if failed).
+	# top_k > 0 writes each shard's top K rows instead of every prediction, and once all shards
+	# are done merges them into top<K>.csv (manifest["top_k_output"]).
+	# precision: how workers compile the model (scorer.load_scorer; "reference" = uncompiled).
+	ensure_dir(output_dir)
+	shards = find_shards(source, output_dir)
+	if not shards:
+		raise ValueError(f"No input shards match {source}")
+	model_hash = file_sha256(model_path)
+	manifest = load_manifest(output_dir)
+	entries: Dict[str, Dict[str, object]] = manifest.setdefault("shards", {})  # type: ignore[assignment]
+	manifest.update(model=model_path, model_sha256=model_hash)
+	settings = {"id_column": id_column, "top_k": top_k, "columns": list(columns), "precision": precision}
+
+	def up_to_date(shard: str) -> bool:
+		entry = entries.get(shard)
+		return (
+			entry is not None
+			and entry.get("status") == "done"
+			and entry.get("model_sha256") == model_hash
+			and entry.get("settings") == settings
+			and entry.get("input") == input_fingerprint(shard)
+			and os.path.exists(str(entry.get("output")))
+		)
+
+	todo = [s for s in shards if force or not up_to_date(s)]
+	skipped = len(shards) - len(todo)
+	with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_worker, initargs=(model_path, backend, precision)) as pool:
+		futures = {pool.submit(_score_shard, s, shard_output(output_dir, s, top_k), chunk_size, id_column, top_k, columns): s for s in todo}
+		for fut in as_completed(futures):
+			shard = futures[fut]
+			entry: Dict[str, object] = {
+				"output": shard_output(output_dir, shard, top_k), "input": input_fingerprint(shard),
+				"model_sha256": model_hash, "settings": settings,
+			}
+			try:
+				rows, seconds = fut.result()
+				entry.update(status="done", rows=rows, seconds=round(seconds, 4))
+			except Exception as e:
+				entry.update(status="failed", error=f"{type(e).__name__}: {e}")
+			entries[shard] = entry
+			# Saved after every shard so an interrupted run resumes from here
+			save_manifest(output_dir, manifest)
+	manifest["last_run"] = {"shards": len(shards), "scored": len(todo), "skipped": skipped}
+	manifest.pop("top_k_output", None)
+	if top_k > 0 and all(entries[s]["status"] == "done" for s in shards):
+		# Shard index is the tiebreak, so equal scores rank as in one pass over the shards in order
+		merged = merge_top_k((read_top_k(str(entries[s]["output"]), top_k, i) for i, s in enumerate(shards)), top_k)
+		path = os.path.join(output_dir, f"top{top_k}.csv")
+		id_name = id_column if id_column and any(id_column in read_header(s) for s in shards) else None
+		write_top_k(path, merged.ranked(), id_name, columns, sources=shards)
+		manifest["top_k_output"] = path
+	save_manifest(output_dir, manifest)
+	return manifest
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils import ensure_dir
+
+
+# Content-addressed cache for pipeline stage outputs. An entry's key is the hash of everything the
+# stage depends on (input file hashes, hyperparameters, upstream keys), so a changed input simply
+# misses; stale entries are evicted least-recently-used first once the directory exceeds max_bytes.
+
+def payload_sha256(payload: Any) -> str:
+	blob = json.dumps(payload, sort_keys=True)
+	return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+	def __init__(self, directory: str, max_bytes: int = 512 << 20) -> None:
+		self.directory = directory
+		self.max_bytes = max_bytes
+		ensure_dir(directory)
+
+	def path(self, stage: str, key: str) -> str:
+		return os.path.join(self.directory, f"{stage}-{key}.json")
+
+	def get(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+		path = self.path(stage, key)
+		try:
+			with open(path, "r", encoding="utf-8") as f:
+				entry = json.load(f)
+		except (OSError, ValueError):
+			return None
+		# Bump mtime so LRU eviction keeps entries that are still being used
+		os.utime(path)
+		return entry
+
+	def put(self, stage: str, key: str, payload: Dict[str, Any]) -> None:
+		path = self.path(stage, key)
+		tmp = path + ".tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(payload, f)
+		os.replace(tmp, path)
+		self.evict(keep=path)
+
+	def _manifest_path(self) -> str:
+		return os.path.join(self.directory, "sinks.manifest")
+
+	def _manifest(self) -> Dict[str, Dict[str, Any]]:
+		try:
+			with open(self._manifest_path(), "r", encoding="utf-8") as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return {}
+
+	def sink_current(self, path: str, key: str) -> bool:
+		# True when `path` was last written from output `key` and has not been touched since
+		entry = self._manifest().get(os.path.abspath(path))
+		if entry is None or entry.get("key") != key:
+			return False
+		try:
+			st = os.stat(path)
+		except OSError:
+			return False
+		return entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns
+
+	def record_sink(self, path: str, key: str) -> None:
+		manifest = self._manifest()
+		st = os.stat(path)
+		manifest[os.path.abspath(path)] = {"key": key, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+		tmp = self._manifest_path() + ".tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump(manifest, f)
+		os.replace(tmp, self._manifest_path())
+
+	def entries(self) -> List[Tuple[float, int, str]]:
+		# (mtime, size, path), oldest first
+		out = []
+		for name in os.listdir(self.directory):
+			if not name.endswith(".json"):
+				continue
+			path = os.path.join(self.directory, name)
+			try:
+				st = os.stat(path)
+			except OSError:
+				continue
+			out.append((st.st_mtime, st.st_size, path))
+		out.sort()
+		return out
+
+	def evict(self, keep: Optional[str] = None) -> int:
+		entries = self.entries()
+		total = sum(size for _, size, _ in entries)
+		removed = 0
+		for _, size, path in entries:
+			if total <= self.max_bytes:
+				break
+			if path == keep:
+				continue
+			try:
+				os.remove(path)
+			except OSError:
+				continue
+			total -= size
+			removed += 1
+		return removed
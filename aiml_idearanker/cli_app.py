@@ -1,11 +1,133 @@
 import argparse
 import os
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from .cli_train import run_train
-from .cli_predict import run_predict
-from .cli_merge import run_merge
-from .cli_pricing import run_pricing
-from .cli_report import run_report
+from .cache import StageCache, payload_sha256
+from .data import load_csv, read_features
+from .model import IdeaRankerModel
+from .pipeline import (
+	PRICE_COLUMNS,
+	Records,
+	StageTimer,
+	price,
+	product_brief,
+	score,
+	train_model,
+	write_predictions,
+	write_pricing,
+	write_pricing_input,
+	write_text,
+)
+from .profiling import add_profile_args, run_profiled
+from .utils import file_sha256, save_json
+
+
+SINKS = ["model", "predictions", "merged", "pricing", "report"]
+
+
+def run_app(args: argparse.Namespace) -> StageTimer:
+	# Train -> predict -> price -> report in one process. Records stay in memory between stages;
+	# the CSV/JSON/TXT artifacts are written at the end, only for the requested sinks.
+	# Stage outputs are cached by content hash, so e.g. a new --unit_cost only re-runs pricing.
+	sinks = set(getattr(args, "sinks", SINKS))
+	force = getattr(args, "force", False)
+	os.makedirs(args.artifacts, exist_ok=True)
+	paths: Dict[str, str] = {
+		"model": os.path.join(args.artifacts, "model.json"),
+		"predictions": os.path.join(args.artifacts, "predictions.csv"),
+		"merged": os.path.join(args.artifacts, "predictions_with_users.csv"),
+		"pricing": os.path.join(args.artifacts, "pricing_report.csv"),
+		"report": os.path.join(args.artifacts, "product_brief.txt"),
+	}
+	cache: Optional[StageCache] = None
+	if not getattr(args, "no_cache", False):
+		cache_dir = getattr(args, "cache_dir", None) or os.path.join(args.artifacts, "cache")
+		cache = StageCache(cache_dir, max_bytes=int(getattr(args, "cache_max_mb", 512) * (1 << 20)))
+
+	def lookup(stage: str, key: str) -> Optional[Dict[str, Any]]:
+		# --force skips lookups but still stores fresh results
+		return cache.get(stage, key) if cache is not None and not force else None
+
+	def store(stage: str, key: str, payload: Dict[str, Any]) -> None:
+		if cache is not None:
+			cache.put(stage, key, payload)
+
+	timer = StageTimer()
+
+	with timer.stage("hash"):
+		data_hash = file_sha256(args.data)
+		inference_hash = file_sha256(args.inference)
+
+	with timer.stage("train") as info:
+		train_args = argparse.Namespace(data=args.data, lr=args.lr, epochs=args.epochs, l2=args.l2, threshold=0.5)
+		# The data path is part of the key because it is recorded in the model metadata
+		train_key = payload_sha256({
+			"stage": "train", "data": data_hash, "path": args.data,
+			"lr": args.lr, "epochs": args.epochs, "l2": args.l2,
+		})
+		payload = lookup("train", train_key)
+		if payload is None:
+			X, y = read_features(args.data)
+			model = train_model(X, y, train_args)
+			store("train", train_key, model.to_dict())
+			info["rows"] = len(X)
+		else:
+			model = IdeaRankerModel.from_dict(payload)
+			info["cached"] = 1
+
+	with timer.stage("predict") as info:
+		predict_key = payload_sha256({"stage": "predict", "model": payload_sha256(model.to_dict()), "inference": inference_hash})
+		payload = lookup("predict", predict_key)
+		if payload is None:
+			records = score(model, load_csv(args.inference))
+			store("predict", predict_key, records.to_dict())
+		else:
+			records = Records.from_dict(payload)
+			info["cached"] = 1
+		info["rows"] = len(records)
+
+	with timer.stage("price") as info:
+		price_key = payload_sha256({"stage": "price", "predict": predict_key, "unit_cost": args.unit_cost})
+		payload = lookup("price", price_key)
+		if payload is None:
+			price(records, args.unit_cost)
+			store("price", price_key, {name: records[name] for name in PRICE_COLUMNS})
+		else:
+			for name in PRICE_COLUMNS:
+				records.add(name, payload[name])
+			info["cached"] = 1
+		info["rows"] = len(records)
+
+	with timer.stage("report") as info:
+		brief = product_brief(records, args.unit_cost)
+		info["rows"] = len(records)
+
+	with timer.stage("write") as info:
+		# Each artifact is derived from one stage output; skip rewriting files already produced from it
+		writers: Dict[str, Tuple[str, Callable[[str], None]]] = {
+			"model": (train_key, lambda path: save_json(path, model.to_dict())),
+			"predictions": (predict_key, lambda path: write_predictions(path, records)),
+			"merged": (predict_key, lambda path: write_pricing_input(path, records)),
+			"pricing": (price_key, lambda path: write_pricing(path, records)),
+			"report": (price_key, lambda path: write_text(path, brief)),
+		}
+		for name in SINKS:
+			if name not in sinks:
+				continue
+			key, write = writers[name]
+			if cache is not None and not force and cache.sink_current(paths[name], key):
+				continue
+			write(paths[name])
+			if cache is not None:
+				cache.record_sink(paths[name], key)
+			info["rows"] = len(records)
+
+	print("End-to-end run completed.")
+	for name, label in (("model", "Model"), ("predictions", "Predictions"), ("pricing", "Pricing"), ("report", "Report")):
+		if name in sinks:
+			print(f"{label}: {paths[name]}")
+	print(timer.report())
+	return timer
 
 
 def main() -> None:
@@ -17,40 +139,14 @@ def main() -> None:
 	p.add_argument("--lr", type=float, default=0.1)
 	p.add_argument("--epochs", type=int, default=300)
 	p.add_argument("--l2", type=float, default=0.0)
+	p.add_argument("--sinks", nargs="*", choices=SINKS, default=SINKS, help="Artifacts to write (default: all)")
+	p.add_argument("--cache-dir", default=None, help="Stage cache directory (default: <artifacts>/cache)")
+	p.add_argument("--cache-max-mb", type=float, default=512, help="Evict least-recently-used cache entries above this size")
+	p.add_argument("--force", action="store_true", help="Recompute every stage, ignoring cached outputs")
+	p.add_argument("--no-cache", action="store_true", help="Neither read nor write the stage cache")
+	add_profile_args(p)
 	args = p.parse_args()
-
-	os.makedirs(args.artifacts, exist_ok=True)
-	model_path = os.path.join(args.artifacts, "model.json")
-	pred_path = os.path.join(args.artifacts, "predictions.csv")
-	merged_path = os.path.join(args.artifacts, "predictions_with_users.csv")
-	pricing_path = os.path.join(args.artifacts, "pricing_report.csv")
-	report_path = os.path.join(args.artifacts, "product_brief.txt")
-
-	# Train
-	_run_train = argparse.Namespace(data=args.data, model=model_path, lr=args.lr, epochs=args.epochs, l2=args.l2, threshold=0.5)
-	run_train(_run_train)
-
-	# Predict
-	_run_predict = argparse.Namespace(model=model_path, input=args.inference, output=pred_path)
-	run_predict(_run_predict)
-
-	# Merge for pricing
-	_run_merge = argparse.Namespace(predictions=pred_path, inference=args.inference, output=merged_path)
-	run_merge(_run_merge)
-
-	# Pricing
-	_run_pricing = argparse.Namespace(input=merged_path, output=pricing_path, unit_cost=args.unit_cost)
-	run_pricing(_run_pricing)
-
-	# Report
-	_run_report = argparse.Namespace(input=merged_path, output=report_path, unit_cost=args.unit_cost)
-	run_report(_run_report)
-
-	print("End-to-end run completed.")
-	print(f"Model: {model_path}")
-	print(f"Predictions: {pred_path}")
-	print(f"Pricing: {pricing_path}")
-	print(f"Report: {report_path}")
+	run_profiled(run_app, args)
 
 
 if __name__ == "__main__":
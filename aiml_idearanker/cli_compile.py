@@ -0,0 +1,47 @@
+import argparse
+
+from .data import MISSING_POLICIES, read_features, read_hashed_features
+from .modelfile import load_model
+from .profiling import add_profile_args, run_profiled
+from .scorer import PRECISIONS, compare, compile_model, save_scorer
+
+
+def run_compile(args: argparse.Namespace) -> None:
+	model = load_model(args.model)
+	model.backend = args.backend
+	scorer = compile_model(model, args.precision)
+	if args.check:
+		# Equivalence check on real rows: the compiled scorer against the model's own predict_proba
+		if model.hashing is not None:
+			X, y, sparse = read_hashed_features(args.check, model.hashing, args.missing)
+		else:
+			(X, y), sparse = read_features(args.check, args.missing), None
+		checks = compare(model, scorer, X, y if len(y) else None, sparse, args.threshold)
+		print(f"Check on {args.check} ({int(checks['rows'])} rows, {args.precision}):")
+		for key, value in checks.items():
+			if key != "rows":
+				print(f"  {key:<15} {value:.3g}")
+		if args.tolerance is not None and checks["max_abs_delta"] > args.tolerance:
+			raise SystemExit(f"max_abs_delta {checks['max_abs_delta']:.3g} exceeds --tolerance {args.tolerance:g}; scorer not written")
+		scorer.checks = {**checks, "tolerance": args.tolerance} if args.tolerance is not None else checks
+	save_scorer(args.output, scorer)
+	print(f"Saved {args.precision} scorer ({scorer.n_features} folded weights{f', {len(scorer.hashed)} hashed' if scorer.hashed else ''}) to {args.output}")
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Compile a model into a scorer with the scaler folded into the weights (optionally float32 or 16-bit fixed-point)")
+	parser.add_argument("--model", required=True, help="Path to model (JSON or binary)")
+	parser.add_argument("--output", required=True, help="Scorer JSON, usable as --model by cli_predict and cli_serve")
+	parser.add_argument("--precision", choices=PRECISIONS, default="float64")
+	parser.add_argument("--check", default="", help="CSV to compare the scorer against the model on (labels add AUC / log-loss deltas)")
+	parser.add_argument("--tolerance", type=float, default=None, help="With --check, fail unless every probability is within this of the model's")
+	parser.add_argument("--threshold", type=float, default=0.5, help="Decision threshold for counting flipped predictions")
+	parser.add_argument("--missing", choices=MISSING_POLICIES, default="zero")
+	parser.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	add_profile_args(parser)
+	args = parser.parse_args()
+	run_profiled(run_compile, args)
+
+
+if __name__ == "__main__":
+	main()
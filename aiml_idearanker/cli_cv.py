@@ -0,0 +1,51 @@
+import argparse
+import time
+
+from .backends import resolve_backend
+from .cv import run_cv
+from .data import MISSING_POLICIES, read_features
+from .metrics import THRESHOLD_METRICS
+from .profiling import add_profile_args, run_profiled
+from .utils import DEFAULT_SEED, save_json
+
+
+def run_cv_cli(args: argparse.Namespace) -> None:
+	X, y = read_features(args.data, getattr(args, "missing", "zero"), getattr(args, "feature_cache", None) or None)
+	t0 = time.perf_counter()
+	result = run_cv(
+		X, y, k=args.k, seed=args.seed, workers=args.workers, threshold=args.threshold,
+		optimize_threshold=getattr(args, "optimize_threshold", None),
+		backend=resolve_backend(args.backend), lr=args.lr, epochs=args.epochs, l2=args.l2,
+	)
+	elapsed = time.perf_counter() - t0
+	m = result["metrics"]
+	print(f"CV ({args.k} folds, {args.workers} workers, {elapsed:.2f}s) | acc={m['accuracy']:.3f} p={m['precision']:.3f} r={m['recall']:.3f} f1={m['f1']:.3f}")  # type: ignore[index]
+	label = "mean fold threshold" if getattr(args, "optimize_threshold", None) else "threshold"
+	print(f"{label}={m['threshold']:.4f} auc={m['auc']:.3f} pr_auc={m['pr_auc']:.3f} log_loss={m['log_loss']:.4f}")  # type: ignore[index]
+	if args.output:
+		save_json(args.output, {"k": args.k, "workers": args.workers, "seconds": elapsed, **result})
+		print(f"Wrote CV report to {args.output}")
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="K-fold cross-validation, one process per fold")
+	p.add_argument("--data", required=True, help="Path to training CSV")
+	p.add_argument("--k", type=int, default=5)
+	p.add_argument("--workers", type=int, default=1, help="Parallel fold workers (1 = sequential, in-process)")
+	p.add_argument("--lr", type=float, default=0.1)
+	p.add_argument("--epochs", type=int, default=300)
+	p.add_argument("--l2", type=float, default=0.0)
+	p.add_argument("--threshold", type=float, default=0.5)
+	p.add_argument("--optimize-threshold", choices=THRESHOLD_METRICS, default=None, help="Tune the threshold maximizing this metric per fold on its training split, then score the held-out fold at it")
+	p.add_argument("--seed", type=int, default=DEFAULT_SEED)
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	p.add_argument("--output", default="", help="Optional JSON report path")
+	p.add_argument("--missing", choices=MISSING_POLICIES, default="zero", help="Empty or absent feature/label cells: read as 0, skip the row, or fail")
+	p.add_argument("--feature-cache", default="", help="Binary file of parsed columns, reused while the CSV is unchanged")
+	add_profile_args(p)
+	args = p.parse_args()
+	run_profiled(run_cv_cli, args)
+
+
+if __name__ == "__main__":
+	main()
@@ -1,10 +1,207 @@
 import argparse
 import csv
+import glob
 import html
+import json
+import math
 import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .profiling import add_profile_args, run_profiled, span
+from .topk import TopK
+
+
+# Paginated mode (--page-size > 0): the pricing CSV is streamed once. KPIs come from running
+# accumulators, the top-N ideas by expected revenue from a bounded heap, and every row goes to a
+# page file as soon as its page is full, so generation memory is O(page size + N) at any input size.
+# The index page holds the KPIs, the top-N table and navigation; pages are static HTML (works from
+# file://) or JSON chunks fetched on demand by a small viewer in the index (serve over HTTP).
+
+COLUMNS = ["prob_success", "projected_users", "best_price", "expected_revenue", "expected_profit"]
+HEADINGS = ["Prob Success", "Projected Users", "Best Price", "Expected Revenue", "Expected Profit"]
+MONEY = {"best_price", "expected_revenue", "expected_profit"}
+PAGE_FORMATS = ["html", "json"]
+MAX_PAGE_LINKS = 500
+STYLE = "<style>body{font-family:Arial,Helvetica,sans-serif;margin:24px} table{border-collapse:collapse;width:100%} th,td{border:1px solid #ddd;padding:8px} th{background:#f2f2f2;text-align:left} .kpi{display:flex;gap:24px;margin-bottom:16px} .kpi div{background:#fafafa;padding:12px;border:1px solid #eee;border-radius:8px} nav{margin:12px 0}</style>"
+Row = Tuple[int, Sequence[str]]
+
+
+class Kpis:
+	# Running accumulators; non-numeric cells count as 0 like the single-file mode's `or 0.0`
+	def __init__(self) -> None:
+		self.n = 0
+		self.pmin = math.inf
+		self.pmax = -math.inf
+		self.psum = 0.0
+		self.revenue = 0.0
+		self.profit = 0.0
+
+	def add(self, prob: float, revenue: float, profit: float) -> None:
+		self.n += 1
+		self.pmin = min(self.pmin, prob)
+		self.pmax = max(self.pmax, prob)
+		self.psum += prob
+		self.revenue += revenue
+		self.profit += profit
+
+	def html(self) -> str:
+		pmin, pmax = (self.pmin, self.pmax) if self.n else (0.0, 0.0)
+		pavg = self.psum / self.n if self.n else 0.0
+		return (f"<div class='kpi'><div><b>Ideas</b><br>{self.n}</div><div><b>Prob min/avg/max</b><br>{pmin:.3f}/{pavg:.3f}/{pmax:.3f}</div>"
+			f"<div><b>Total revenue</b><br>${self.revenue:,.2f}</div><div><b>Total profit</b><br>${self.profit:,.2f}</div></div>")
+
+
+def _num(cell: str) -> float:
+	try:
+		return float(cell) if cell else 0.0
+	except ValueError:
+		return 0.0
+
+
+def iter_pricing_rows(path: str) -> Iterator[List[str]]:
+	# Cells of COLUMNS per row ("" when the column or cell is absent)
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		reader = csv.reader(f)
+		header = next(reader, [])
+		idx = [header.index(c) if c in header else None for c in COLUMNS]
+		for row in filter(None, reader):
+			yield [row[i] if i is not None and i < len(row) else "" for i in idx]
+
+
+def _head(title: str) -> str:
+	return f"<html><head><meta charset='utf-8'><title>{html.escape(title)}</title>{STYLE}</head><body>"
+
+
+ROW_HTML = "<tr><td>{}</td>" + "".join("<td>${}</td>" if c in MONEY else "<td>{}</td>" for c in COLUMNS) + "</tr>"
+SPECIAL = "&<>\"'"
+
+
+def _table(rows: Sequence[Row]) -> str:
+	# Numeric cells almost never need escaping; checking the row once is much cheaper than
+	# html.escape on every cell
+	out = ["<table><thead><tr><th>#</th>" + "".join(f"<th>{h}</th>" for h in HEADINGS) + "</tr></thead><tbody>"]
+	fmt = ROW_HTML.format
+	for idx, cells in rows:
+		joined = "".join(cells)
+		if any(ch in joined for ch in SPECIAL):
+			cells = [html.escape(c) for c in cells]
+		out.append(fmt(idx, *cells))
+	out.append("</tbody></table>")
+	return "".join(out)
+
+
+def page_name(number: int, fmt: str) -> str:
+	return f"page-{number:05d}.html" if fmt == "html" else f"chunk-{number:05d}.json"
+
+
+def write_page(directory: str, number: int, rows: Sequence[Row], fmt: str, has_next: bool, index_href: str) -> None:
+	path = os.path.join(directory, page_name(number, fmt))
+	with span("write_page", rows=len(rows)), open(path, "w", encoding="utf-8") as f:
+		if fmt == "json":
+			json.dump({"page": number, "first_row": rows[0][0], "rows": [list(cells) for _, cells in rows]}, f, separators=(",", ":"))
+			return
+		links = [f"<a href='{html.escape(index_href)}'>Index</a>"]
+		if number > 1:
+			links.append(f"<a href='{page_name(number - 1, fmt)}'>&larr; Page {number - 1}</a>")
+		if has_next:
+			links.append(f"<a href='{page_name(number + 1, fmt)}'>Page {number + 1} &rarr;</a>")
+		nav = "<nav>" + " | ".join(links) + "</nav>"
+		f.write(_head(f"IdeaRanker Dashboard - page {number}"))
+		f.write(f"<h1>Page {number}</h1><p>Rows {rows[0][0]:,}&ndash;{rows[-1][0]:,}</p>{nav}")
+		f.write(_table(rows))
+		f.write(nav + "</body></html>")
+
+
+def _pages_html(pages_href: str, n_pages: int, page_size: int, n_rows: int, fmt: str) -> str:
+	if not n_pages:
+		return ""
+	out = [f"<h2>All ideas</h2><p>{n_rows:,} rows in {n_pages:,} pages of {page_size:,}.</p>"]
+	if fmt == "json":
+		# Viewer: fetches one chunk at a time; cells are inserted as text, never as HTML
+		out.append(
+			"<nav><button id='prev'>&larr;</button> Page <input id='page' type='number' min='1' "
+			f"max='{n_pages}' value='1' style='width:6em'> of {n_pages:,} <button id='next'>&rarr;</button> <span id='status'></span></nav>"
+			"<table><thead><tr><th>#</th>" + "".join(f"<th>{h}</th>" for h in HEADINGS) + "</tr></thead><tbody id='rows'></tbody></table>"
+			"<script>"
+			f"const DIR={json.dumps(pages_href)}, PAGES={n_pages}, MONEY={json.dumps([c in MONEY for c in COLUMNS])};"
+			"const input=document.getElementById('page'), body=document.getElementById('rows'), msg=document.getElementById('status');"
+			"async function show(p){p=Math.max(1,Math.min(PAGES,p|0));input.value=p;msg.textContent='loading...';"
+			"try{const r=await fetch(DIR+'/chunk-'+String(p).padStart(5,'0')+'.json');const d=await r.json();body.textContent='';"
+			"d.rows.forEach((cells,i)=>{const tr=body.insertRow();tr.insertCell().textContent=d.first_row+i;"
+			"cells.forEach((c,j)=>{tr.insertCell().textContent=(MONEY[j]?'$':'')+c;});});msg.textContent='';}"
+			"catch(e){msg.textContent='Could not load page '+p+' (serve this directory over HTTP).';}}"
+			"document.getElementById('prev').onclick=()=>show(+input.value-1);"
+			"document.getElementById('next').onclick=()=>show(+input.value+1);"
+			"input.onchange=()=>show(+input.value);show(1);"
+			"</script>"
+		)
+		return "".join(out)
+	first, last = page_name(1, fmt), page_name(n_pages, fmt)
+	jump = (f"const p=Math.max(1,Math.min({n_pages},this.p.value|0));"
+		f"location.href={json.dumps(pages_href + '/')}+'page-'+String(p).padStart(5,'0')+'.html';return false;")
+	out.append(
+		f"<nav><form onsubmit=\"{html.escape(jump)}\">"
+		f"Go to page <input name='p' type='number' min='1' max='{n_pages}' value='1' style='width:6em'> <button>Go</button> "
+		f"<a href='{html.escape(pages_href)}/{first}'>first</a> | <a href='{html.escape(pages_href)}/{last}'>last</a></form></nav>"
+	)
+	if n_pages <= MAX_PAGE_LINKS:
+		links = []
+		for number in range(1, n_pages + 1):
+			lo, hi = (number - 1) * page_size + 1, min(n_rows, number * page_size)
+			links.append(f"<a href='{html.escape(pages_href)}/{page_name(number, fmt)}'>{lo:,}&ndash;{hi:,}</a>")
+		out.append("<p>" + " &middot; ".join(links) + "</p>")
+	return "".join(out)
+
+
+def run_dashboard_paged(args: argparse.Namespace) -> None:
+	fmt = getattr(args, "pages", "html")
+	if fmt not in PAGE_FORMATS:
+		raise ValueError(f"Unknown page format '{fmt}'. Choose from: {', '.join(PAGE_FORMATS)}")
+	page_size, top_n = args.page_size, max(0, getattr(args, "top", 100))
+	out_dir = os.path.dirname(args.output) or "."
+	stem = os.path.splitext(os.path.basename(args.output))[0]
+	pages_href = f"{stem}_pages"
+	pages_dir = os.path.join(out_dir, pages_href)
+	os.makedirs(pages_dir, exist_ok=True)
+	# Pages from an earlier, longer run would otherwise stay reachable
+	for old in glob.glob(os.path.join(pages_dir, "page-*.html")) + glob.glob(os.path.join(pages_dir, "chunk-*.json")):
+		os.remove(old)
+	index_href = "../" + os.path.basename(args.output)
+	kpis = Kpis()
+	top: Optional[TopK] = TopK(top_n) if top_n else None
+	page: List[Row] = []
+	n_pages = 0
+	for idx, cells in enumerate(iter_pricing_rows(args.pricing), start=1):
+		revenue = _num(cells[3])
+		kpis.add(_num(cells[0]), revenue, _num(cells[4]))
+		if top is not None:
+			top.push((revenue, (0, -idx), "", tuple(cells)))
+		if len(page) == page_size:
+			# The next page exists, so the full one can be written with a "next" link
+			n_pages += 1
+			write_page(pages_dir, n_pages, page, fmt, True, index_href)
+			page = []
+		page.append((idx, cells))
+	if page:
+		n_pages += 1
+		write_page(pages_dir, n_pages, page, fmt, False, index_href)
+	with open(args.output, "w", encoding="utf-8") as f:
+		f.write(_head("IdeaRanker Dashboard"))
+		f.write("<h1>IdeaRanker Dashboard</h1>")
+		f.write(kpis.html())
+		if top is not None:
+			ranked = [(-neg_row, values) for _, (_, neg_row), _, values in top.ranked()]
+			f.write(f"<h2>Top {len(ranked):,} by expected revenue</h2>")
+			f.write(_table(ranked))
+		f.write(_pages_html(pages_href, n_pages, page_size, kpis.n, fmt))
+		f.write("</body></html>")
+	print(f"Wrote dashboard to {args.output} ({kpis.n} rows, {n_pages} {fmt} pages in {pages_dir})")
 
 
 def run_dashboard(args: argparse.Namespace) -> None:
+	if getattr(args, "page_size", 0) > 0:
+		run_dashboard_paged(args)
+		return
 	items = []
 	with open(args.pricing, "r", encoding="utf-8", newline="") as f:
 		r = csv.DictReader(f)
@@ -53,8 +250,12 @@ def main() -> None:
 	p = argparse.ArgumentParser(description="Generate HTML dashboard from pricing report")
 	p.add_argument("--pricing", required=True, help="pricing_report.csv path")
 	p.add_argument("--output", required=True, help="dashboard HTML output path")
+	p.add_argument("--page-size", type=int, default=0, help="Stream the report and split rows into pages of this size next to the index (0 = one HTML file with every row)")
+	p.add_argument("--top", type=int, default=100, help="With --page-size: ideas shown inline on the index, by expected revenue")
+	p.add_argument("--pages", choices=PAGE_FORMATS, default="html", help="With --page-size: static HTML pages, or JSON chunks loaded on demand by the index (needs HTTP)")
+	add_profile_args(p)
 	args = p.parse_args()
-	run_dashboard(args)
+	run_profiled(run_dashboard, args)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
 import argparse
 import csv
+import os
+from typing import Dict
 
+from .join import KEY_TYPES, METHODS, join_files, read_header
+from .profiling import add_profile_args, run_profiled
 
-def run_merge(args: argparse.Namespace) -> None:
-	# inputs: predictions.csv (prob_success), inference.csv (projected_users)
+
+def run_merge_positional(args: argparse.Namespace) -> None:
+	# Legacy pairing by row position, for inputs without an id column
 	preds = []
 	with open(args.predictions, "r", encoding="utf-8", newline="") as f:
 		r = csv.DictReader(f)
@@ -15,11 +20,52 @@ def run_merge(args: argparse.Namespace) -> None:
 		for row in r:
 			users.append(row["projected_users"])  # keep as string
 	rows = min(len(preds), len(users))
+	if len(preds) != len(users):
+		print(f"Warning: {len(preds)} predictions vs {len(users)} inference rows; pairing by position and truncating to {rows}")
 	with open(args.output, "w", encoding="utf-8", newline="") as f:
 		w = csv.writer(f)
-		w.writerow(["prob_success", "projected_users"]) 
+		w.writerow(["prob_success", "projected_users"])
 		for i in range(rows):
 			w.writerow([preds[i], users[i]])
+
+
+def run_merge(args: argparse.Namespace) -> None:
+	# inputs: predictions.csv (prob_success), inference.csv (projected_users)
+	# Joined on the id column when both files have it; otherwise paired by row position.
+	key = getattr(args, "key", "idea_id")
+	if not key or key not in read_header(args.predictions) or key not in read_header(args.inference):
+		run_merge_positional(args)
+		print(f"Wrote merged pricing input to {args.output}")
+		return
+	stats: Dict[str, object] = {}
+	n = 0
+	# Written to a tmp file and renamed once complete: a merge join that finds unsorted input
+	# midway raises, and must not leave a partial output behind
+	tmp = args.output + ".tmp"
+	try:
+		with open(tmp, "w", encoding="utf-8", newline="") as f:
+			w = csv.writer(f)
+			w.writerow([key, "prob_success", "projected_users"])
+			for k, (prob,), (users,) in join_files(
+				args.predictions, args.inference, key, ["prob_success"], ["projected_users"],
+				method=getattr(args, "method", "auto"),
+				key_type=getattr(args, "key_type", "str"),
+				memory_mb=getattr(args, "memory_mb", 256.0),
+				tmp_dir=getattr(args, "tmp_dir", None),
+				stats=stats,
+			):
+				w.writerow([k, prob, users])
+				n += 1
+	except BaseException:
+		if os.path.exists(tmp):
+			os.remove(tmp)
+		raise
+	os.replace(tmp, args.output)
+	spill = f", spilled to {stats['partitions']} partitions" if int(stats["partitions"]) > 1 else ""  # type: ignore[call-overload]
+	print(
+		f"Joined {n} rows on '{key}' ({stats['method']} join{spill}); "
+		f"unmatched: {stats['left_unmatched']} predictions, {stats['right_unmatched']} inference rows"
+	)
 	print(f"Wrote merged pricing input to {args.output}")
 
 
@@ -28,8 +74,14 @@ def main() -> None:
 	p.add_argument("--predictions", required=True, help="CSV with prob_success column")
 	p.add_argument("--inference", required=True, help="CSV with projected_users column")
 	p.add_argument("--output", required=True, help="Output CSV path")
+	p.add_argument("--key", default="idea_id", help="Join column; files without it are paired by row position")
+	p.add_argument("--key-type", choices=sorted(KEY_TYPES), default="str", help="How keys are compared (sort order for the merge join)")
+	p.add_argument("--method", choices=METHODS, default="auto", help="auto: sort-merge when both files are sorted by key, else hash join")
+	p.add_argument("--memory-mb", type=float, default=256.0, help="Hash-join memory budget; larger inputs spill to partitioned temp files")
+	p.add_argument("--tmp-dir", default=None, help="Directory for spill files (default: system temp)")
+	add_profile_args(p)
 	args = p.parse_args()
-	run_merge(args)
+	run_profiled(run_merge, args)
 
 
 if __name__ == "__main__":
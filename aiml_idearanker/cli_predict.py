@@ -1,33 +1,88 @@
 import argparse
-import csv
-from typing import Dict, List
+import os
 
-from .data import build_features, load_csv
-from .model import IdeaRankerModel
-from .utils import load_json
+from .batch import score_file, score_shards
+from .join import read_header
+from .profiling import add_profile_args, run_profiled
+from .scorer import PRECISIONS, REFERENCE, load_scorer
+from .topk import top_k_file, write_top_k
 
 
 def run_predict(args: argparse.Namespace) -> None:
-	payload = load_json(args.model)
-	model = IdeaRankerModel.from_dict(payload)
-	rows = load_csv(args.input)
-	X, _ = build_features(rows)
-	probs = model.predict_proba(X)
-	with open(args.output, "w", encoding="utf-8", newline="") as f:
-		writer = csv.writer(f)
-		writer.writerow(["prob_success"]) 
-		for p in probs:
-			writer.writerow([f"{p:.6f}"])
+	# Compiled at load (scaler folded into the weights) unless --precision reference
+	model = load_scorer(args.model, getattr(args, "precision", "float64"), getattr(args, "backend", "auto"))
+	chunk_size = getattr(args, "chunk_size", 0) or 0
+	id_column = getattr(args, "id_column", "idea_id") or None
+	top_k = getattr(args, "top_k", 0) or 0
+	if top_k > 0:
+		# Always streams (default chunk 50k); only the K best rows are kept
+		columns = getattr(args, "columns", None) or []
+		top, n = top_k_file(model, args.input, top_k, id_column, columns, chunk_size)
+		write_top_k(args.output, top.ranked(), id_column if id_column in read_header(args.input) else None, columns)
+		print(f"Wrote top {len(top)} of {n} ideas to {args.output}")
+		return
+	# Streaming (chunk_size > 0): read, score and write one chunk at a time so memory is O(chunk_size)
+	score_file(model, args.input, args.output, chunk_size, id_column)
 	print(f"Wrote predictions to {args.output}")
 
 
+def run_predict_shards(args: argparse.Namespace) -> None:
+	# One output per shard plus manifest.json in --output-dir; re-running resumes failed/new shards
+	manifest = score_shards(
+		args.model,
+		args.shards,
+		args.output_dir,
+		workers=getattr(args, "workers", 0) or os.cpu_count() or 1,
+		backend=getattr(args, "backend", "auto"),
+		chunk_size=getattr(args, "chunk_size", 0) or 0,
+		id_column=getattr(args, "id_column", "idea_id") or None,
+		force=getattr(args, "force", False),
+		top_k=getattr(args, "top_k", 0) or 0,
+		columns=getattr(args, "columns", None) or [],
+		precision=getattr(args, "precision", "float64"),
+	)
+	entries = manifest["shards"]
+	failed = [(shard, e) for shard, e in entries.items() if e["status"] == "failed"]  # type: ignore[attr-defined]
+	done = [e for e in entries.values() if e["status"] == "done"]  # type: ignore[attr-defined]
+	run = manifest["last_run"]
+	print(f"Scored {run['scored']} shards, skipped {run['skipped']} up to date")  # type: ignore[index]
+	print(f"{len(done)} shards done ({sum(int(e['rows']) for e in done)} rows), {len(failed)} failed")
+	for shard, e in failed:
+		print(f"  failed: {shard}: {e['error']}")
+	if "top_k_output" in manifest:
+		print(f"Wrote merged top {args.top_k} to {manifest['top_k_output']}")
+	print(f"Wrote manifest to {os.path.join(args.output_dir, 'manifest.json')}")
+	if failed:
+		# Non-zero exit so schedulers retry; the re-run only rescores the failed shards
+		raise SystemExit(1)
+
+
 def main() -> None:
 	parser = argparse.ArgumentParser(description="Predict success probability for ideas")
-	parser.add_argument("--model", required=True, help="Path to model JSON")
-	parser.add_argument("--input", required=True, help="Path to inference CSV")
-	parser.add_argument("--output", required=True, help="Path to output predictions CSV")
+	parser.add_argument("--model", required=True, help="Path to model (JSON or binary)")
+	source = parser.add_mutually_exclusive_group(required=True)
+	source.add_argument("--input", help="Path to inference CSV")
+	source.add_argument("--shards", help="Batch mode: directory of CSV shards or a glob pattern (quote it)")
+	parser.add_argument("--output", help="Path to output predictions CSV (with --input)")
+	parser.add_argument("--output-dir", help="Per-shard predictions and manifest.json (with --shards)")
+	parser.add_argument("--workers", type=int, default=0, help="Worker processes for --shards (0 = one per CPU)")
+	parser.add_argument("--force", action="store_true", help="Rescore every shard, ignoring the manifest")
+	parser.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto", help="Compute backend (auto uses numpy when installed)")
+	parser.add_argument("--chunk-size", type=int, default=0, help="Stream the input in batches of this many rows (0 = load whole file)")
+	parser.add_argument("--id-column", default="idea_id", help="Copy this input column into the output (when present) so cli_merge can join on it")
+	parser.add_argument("--top-k", type=int, default=0, help="Write only the K highest-scoring rows, ranked (bounded heap; O(K) memory)")
+	parser.add_argument("--columns", nargs="*", default=[], help="Input columns to carry into the --top-k output")
+	parser.add_argument("--precision", choices=PRECISIONS + [REFERENCE], default="float64", help="Score with the compiled scorer at this precision, or 'reference' for the uncompiled model (a scorer file from cli_compile keeps its own)")
+	add_profile_args(parser)
 	args = parser.parse_args()
-	run_predict(args)
+	if args.shards:
+		if not args.output_dir:
+			parser.error("--shards requires --output-dir")
+		run_profiled(run_predict_shards, args)
+	else:
+		if not args.output:
+			parser.error("--input requires --output")
+		run_profiled(run_predict, args)
 
 
 if __name__ == "__main__":
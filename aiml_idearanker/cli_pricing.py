@@ -1,32 +1,19 @@
 import argparse
-import csv
-from typing import List
 
-from .pricing import optimize_revenue
+from .pipeline import price, read_pricing_input, write_pricing
+from .pricing import DEMAND_CURVES
+from .profiling import add_profile_args, run_profiled
 
 
 def run_pricing(args: argparse.Namespace) -> None:
-	# Expects predictions CSV with column prob_success and an auxiliary input with projected_users
-	# For simplicity, we read a CSV that has both columns: prob_success, projected_users
-	rows: List[dict] = []
-	with open(args.input, "r", encoding="utf-8", newline="") as f:
-		reader = csv.DictReader(f)
-		for r in reader:
-			rows.append(r)
-	with open(args.output, "w", encoding="utf-8", newline="") as f:
-		writer = csv.writer(f)
-		writer.writerow(["prob_success", "projected_users", "best_price", "expected_revenue", "expected_profit"]) 
-		for r in rows:
-			p = float(r.get("prob_success", "0") or 0.0)
-			u = float(r.get("projected_users", "0") or 0.0)
-			res = optimize_revenue(p, u, unit_cost=args.unit_cost)
-			writer.writerow([
-				f"{p:.6f}",
-				int(u),
-				f"{res['best_price']:.2f}",
-				f"{res['expected_revenue']:.2f}",
-				f"{res['expected_profit']:.2f}",
-			])
+	# Expects a CSV with both columns: prob_success, projected_users (see cli_merge)
+	records = price(
+		read_pricing_input(args.input), args.unit_cost,
+		curve=getattr(args, "curve", "linear"),
+		objective=getattr(args, "objective", "revenue"),
+		method=getattr(args, "method", "analytic"),
+	)
+	write_pricing(args.output, records)
 	print(f"Wrote pricing report to {args.output}")
 
 
@@ -35,8 +22,12 @@ def main() -> None:
 	parser.add_argument("--input", required=True, help="CSV with columns: prob_success, projected_users")
 	parser.add_argument("--output", required=True, help="Output CSV path")
 	parser.add_argument("--unit_cost", type=float, default=0.0)
+	parser.add_argument("--curve", choices=sorted(DEMAND_CURVES), default="linear", help="Demand-curve family")
+	parser.add_argument("--objective", choices=["revenue", "profit"], default="revenue", help="Quantity the price maximizes")
+	parser.add_argument("--method", choices=["analytic", "search", "grid"], default="analytic", help="grid reproduces the legacy 40-point scan")
+	add_profile_args(parser)
 	args = parser.parse_args()
-	run_pricing(args)
+	run_profiled(run_pricing, args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+
+from .backends import resolve_backend
+from .data import MISSING_POLICIES, read_features
+from .model import IdeaRankerModel
+from .modelfile import MODEL_FORMATS, save_model
+from .profiling import add_profile_args, run_profiled
+from .search import METRICS, TrialCache, grid_trials, random_trials, search
+from .utils import DEFAULT_SEED, file_sha256, save_json
+
+
+def run_search(args: argparse.Namespace) -> None:
+	missing = getattr(args, "missing", "zero")
+	X, y = read_features(args.data, missing, getattr(args, "feature_cache", None) or None)
+	backend = resolve_backend(args.backend)
+	space = {"lr": args.lr, "epochs": args.epochs, "l2": args.l2}
+	trials = grid_trials(space) if args.mode == "grid" else random_trials(space, args.n_trials, seed=args.seed)
+	settings = {"k": args.k, "seed": args.seed, "threshold": args.threshold, "backend": backend}
+	if missing != "zero":
+		# Only non-default policies change the key, so existing cached trials stay valid
+		settings["missing"] = missing
+	cache = TrialCache(args.cache_dir, file_sha256(args.data), settings)
+	summary = search(
+		X, y, trials, cache, metric=args.metric, workers=args.workers,
+		halving=args.halving, eta=args.eta, min_epochs=args.min_epochs,
+	)
+	print(f"{'lr':>10} {'epochs':>7} {'l2':>10} {args.metric:>9} {'cached':>7}")
+	for r in summary["trials"]:  # type: ignore[union-attr]
+		prm = r["params"]
+		print(f"{prm['lr']:>10.4g} {int(prm['epochs']):>7} {prm['l2']:>10.4g} {r['metrics'][args.metric]:>9.4f} {str(r.get('cached', False)):>7}")
+	best = summary["best"]
+	params = best["params"]  # type: ignore[index]
+	print(f"Best {args.metric}={best['metrics'][args.metric]:.4f} with lr={params['lr']:.4g} epochs={int(params['epochs'])} l2={params['l2']:.4g} "  # type: ignore[index]
+		f"({summary['n_evaluated']} trials run, {summary['n_cached']} from cache)")
+
+	model = IdeaRankerModel(backend=backend)
+	model.metadata = {
+		"learning_rate": str(params["lr"]),
+		"epochs": str(int(params["epochs"])),
+		"l2": str(params["l2"]),
+		"data": args.data,
+		"backend": backend,
+		"search_mode": args.mode + ("+halving" if args.halving else ""),
+		"search_metric": args.metric,
+		"search_cv_score": f"{best['metrics'][args.metric]:.6g}",  # type: ignore[index]
+		"search_trials": str(len(summary["trials"])),  # type: ignore[arg-type]
+		"search_best_params": json.dumps(params, sort_keys=True),
+	}
+	model.fit(X, y, lr=params["lr"], epochs=int(params["epochs"]), l2=params["l2"], copy=False)
+	save_model(args.model, model, getattr(args, "format", "auto"))
+	print(f"Saved best model to {args.model}")
+	if args.summary:
+		save_json(args.summary, summary)
+		print(f"Wrote search summary to {args.summary}")
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Grid/random hyperparameter search with k-fold CV, a process pool and an on-disk trial cache")
+	p.add_argument("--data", required=True, help="Path to training CSV")
+	p.add_argument("--model", required=True, help="Output path for the best model (JSON, or the binary format for a .bin path)")
+	p.add_argument("--format", choices=MODEL_FORMATS, default="auto", help="Model file format (auto: binary for a .bin path, JSON otherwise)")
+	p.add_argument("--mode", choices=["grid", "random"], default="grid")
+	p.add_argument("--lr", type=float, nargs="+", default=[0.03, 0.1, 0.3])
+	p.add_argument("--epochs", type=int, nargs="+", default=[100, 300])
+	p.add_argument("--l2", type=float, nargs="+", default=[0.0, 0.01, 0.1])
+	p.add_argument("--n-trials", type=int, default=20, help="Trials to sample in random mode")
+	p.add_argument("--k", type=int, default=5)
+	p.add_argument("--metric", choices=METRICS, default="f1")
+	p.add_argument("--threshold", type=float, default=0.5)
+	p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+	p.add_argument("--cache-dir", default=os.path.join("artifacts", "search_cache"))
+	p.add_argument("--halving", action="store_true", help="Successive halving over epochs (prunes weak configs early)")
+	p.add_argument("--eta", type=int, default=3, help="Halving rate: keep the top 1/eta per rung")
+	p.add_argument("--min-epochs", type=int, default=10, help="Epoch budget of the first halving rung")
+	p.add_argument("--seed", type=int, default=DEFAULT_SEED)
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	p.add_argument("--summary", default="", help="Optional JSON path for the full search summary")
+	p.add_argument("--missing", choices=MISSING_POLICIES, default="zero", help="Empty or absent feature/label cells: read as 0, skip the row, or fail")
+	p.add_argument("--feature-cache", default="", help="Binary file of parsed columns, reused while the CSV is unchanged")
+	add_profile_args(p)
+	args = p.parse_args()
+	if args.halving and args.eta < 2:
+		p.error("--eta must be at least 2")
+	if args.mode == "random" and min(args.lr) <= 0:
+		p.error("--lr values must be positive in random mode (sampled log-uniformly)")
+	run_profiled(run_search, args)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .columnar import FeatureMatrix
+from .data import FEATURE_COLUMNS, build_features, to_float
+from .hashing import SparseRows
+from .pricing import optimize_revenue_batch
+from .profiling import add_profile_args, run_profiled
+from .scorer import PRECISIONS, REFERENCE, Scorer, load_scorer
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class ModelHolder:
+	# Keeps the model resident, compiled at `precision` (scorer.load_scorer); reloads when the
+	# file's mtime changes (checked at most every `interval` s).
+	def __init__(self, path: str, backend: str = "auto", interval: float = 1.0, precision: str = "float64") -> None:
+		self.path = path
+		self.backend = backend
+		self.interval = interval
+		self.precision = precision
+		self.model: Scorer
+		self.mtime = 0.0
+		self._checked = 0.0
+		self.reload()
+
+	def reload(self) -> None:
+		mtime = os.stat(self.path).st_mtime
+		self.model, self.mtime = load_scorer(self.path, self.precision, self.backend), mtime
+
+	def current(self) -> Scorer:
+		now = time.monotonic()
+		if now - self._checked >= self.interval:
+			self._checked = now
+			try:
+				if os.stat(self.path).st_mtime != self.mtime:
+					self.reload()
+					print(f"Reloaded model from {self.path}")
+			except (OSError, ValueError) as e:
+				# Keep serving the previous model (e.g. file mid-write or temporarily missing)
+				print(f"Model reload failed, keeping previous model: {e}")
+		return self.model
+
+
+# A queued request: its ideas, the model that hashed them, their feature columns and hashed rows
+Pending = Tuple[List[Dict[str, Any]], Scorer, FeatureMatrix, Optional[SparseRows], asyncio.Future]
+
+
+class MicroBatcher:
+	# Coalesces concurrent score requests into one predict_proba call over the concatenated
+	# feature columns (and hashed rows) of requests that already parsed.
+	def __init__(self, holder: ModelHolder, max_batch: int = 1024, max_wait_ms: float = 2.0) -> None:
+		self.holder = holder
+		self.max_batch = max_batch
+		self.max_wait = max_wait_ms / 1000.0
+		self.queue: "asyncio.Queue[Pending]" = asyncio.Queue()
+		self.batches = 0
+		self.rows = 0
+
+	async def score(self, ideas: List[Dict[str, Any]]) -> List[float]:
+		# Parsed and hashed before queueing: a bad value fails this request only. The model that
+		# hashed the rows also scores them, so a reload in between cannot mix hash configs.
+		model = self.holder.model
+		X, _ = build_features(ideas)
+		sparse = model.hash_rows(ideas)
+		fut = asyncio.get_running_loop().create_future()
+		await self.queue.put((ideas, model, X, sparse, fut))
+		return await fut
+
+	def _drain(self, batch: List[Pending], n: int) -> int:
+		while n < self.max_batch and not self.queue.empty():
+			item = self.queue.get_nowait()
+			batch.append(item)
+			n += len(item[0])
+		return n
+
+	def _predict(self, batch: List[Pending]) -> List[float]:
+		# Checks for a changed model file (used by requests queued from now on), then scores each
+		# run of requests hashed by the same model in one call
+		self.holder.current()
+		probs: List[float] = []
+		for model, group in itertools.groupby(batch, key=lambda item: item[1]):
+			X = FeatureMatrix.empty(FEATURE_COLUMNS)
+			sparse = SparseRows() if model.hashing is not None else None
+			for _, _, part, part_sparse, _ in group:
+				for col, src in zip(X.columns, part.columns):
+					col.extend(src)  # type: ignore[attr-defined]
+				if sparse is not None:
+					sparse.extend(part_sparse)  # type: ignore[arg-type]
+			probs.extend(model.predict_proba(X, copy=False, sparse=sparse))
+		return probs
+
+	async def run(self) -> None:
+		loop = asyncio.get_running_loop()
+		while True:
+			first = await self.queue.get()
+			batch = [first]
+			n = self._drain(batch, len(first[0]))
+			if n < self.max_batch and self.max_wait > 0:
+				await asyncio.sleep(self.max_wait)
+				n = self._drain(batch, n)
+			try:
+				probs = await loop.run_in_executor(None, self._predict, batch)
+			except Exception as e:
+				for item in batch:
+					if not item[-1].done():
+						item[-1].set_exception(e)
+				continue
+			self.batches += 1
+			self.rows += n
+			i = 0
+			for ideas, _, _, _, fut in batch:
+				if not fut.done():
+					fut.set_result(probs[i:i + len(ideas)])
+				i += len(ideas)
+
+
+def parse_request(body: bytes) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+	# Accepts {"ideas": [...], "unit_cost": ...}, a single idea object, or a bare list of idea objects.
+	payload = json.loads(body.decode("utf-8") or "null")
+	options: Dict[str, Any] = {}
+	if isinstance(payload, dict) and "ideas" in payload:
+		options = payload
+		payload = payload["ideas"]
+	elif isinstance(payload, dict):
+		payload = [payload]
+	if not isinstance(payload, list) or not all(isinstance(r, dict) for r in payload):
+		raise ValueError("expected an idea object, a list of idea objects, or {\"ideas\": [...]}")
+	return payload, options
+
+
+class ScoringServer:
+	def __init__(self, holder: ModelHolder, batcher: MicroBatcher, unit_cost: float = 0.0) -> None:
+		self.holder = holder
+		self.batcher = batcher
+		self.unit_cost = unit_cost
+
+	async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+		path = path.split("?", 1)[0]
+		if path == "/health":
+			return 200, {
+				"status": "ok",
+				"model": self.holder.path,
+				"model_mtime": self.holder.mtime,
+				"batches": self.batcher.batches,
+				"rows": self.batcher.rows,
+			}
+		if path not in ("/score", "/score_price"):
+			return 404, {"error": f"unknown path {path}"}
+		if method != "POST":
+			return 405, {"error": "use POST"}
+		try:
+			ideas, options = parse_request(body)
+			probs = await self.batcher.score(ideas)
+			if path == "/score":
+				return 200, {"results": [{"prob_success": p} for p in probs]}
+			unit_cost = float(options.get("unit_cost", self.unit_cost))
+			users = [to_float(r, "projected_users") for r in ideas]
+			res = optimize_revenue_batch(probs, users, unit_cost=unit_cost)
+			return 200, {"results": [
+				{"prob_success": p, "best_price": bp, "expected_revenue": rev, "expected_profit": prof}
+				for p, bp, rev, prof in zip(probs, res["best_price"], res["expected_revenue"], res["expected_profit"])
+			]}
+		except (ValueError, TypeError, AttributeError) as e:
+			return 400, {"error": str(e)}
+		except Exception as e:
+			return 500, {"error": str(e)}
+
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		# Minimal HTTP/1.1 with keep-alive and Content-Length bodies.
+		try:
+			while True:
+				request_line = await reader.readline()
+				if not request_line:
+					break
+				parts = request_line.decode("latin-1").split()
+				if len(parts) != 3:
+					break
+				method, target, version = parts
+				headers: Dict[str, str] = {}
+				while True:
+					line = await reader.readline()
+					if line in (b"\r\n", b"\n", b""):
+						break
+					key, _, value = line.decode("latin-1").partition(":")
+					headers[key.strip().lower()] = value.strip()
+				body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+				status, payload = await self.dispatch(method, target, body)
+				data = json.dumps(payload).encode("utf-8")
+				connection = headers.get("connection", "").lower()
+				keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+				writer.write(
+					f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+					f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+					f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+				)
+				await writer.drain()
+				if not keep_alive:
+					break
+		except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+			pass
+		finally:
+			writer.close()
+
+
+async def serve(args: argparse.Namespace, ready: Optional[asyncio.Event] = None) -> None:
+	holder = ModelHolder(args.model, backend=args.backend, interval=args.reload_interval, precision=getattr(args, "precision", "float64"))
+	batcher = MicroBatcher(holder, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+	server = ScoringServer(holder, batcher, unit_cost=args.unit_cost)
+	batch_task = asyncio.create_task(batcher.run())
+	srv = await asyncio.start_server(server.handle, args.host, args.port)
+	print(f"Serving {args.model} on http://{args.host}:{args.port} (POST /score, POST /score_price, GET /health)")
+	if ready is not None:
+		ready.set()
+	try:
+		async with srv:
+			await srv.serve_forever()
+	finally:
+		batch_task.cancel()
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Serve IdeaRanker scores over HTTP/JSON with the model held in memory")
+	p.add_argument("--model", required=True, help="Path to model, JSON or binary (reloaded when its mtime changes)")
+	p.add_argument("--host", default="127.0.0.1")
+	p.add_argument("--port", type=int, default=8000)
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	p.add_argument("--unit_cost", type=float, default=0.0, help="Default unit cost for /score_price")
+	p.add_argument("--max-batch", type=int, default=1024, help="Max rows per micro-batch")
+	p.add_argument("--max-wait-ms", type=float, default=2.0, help="How long to wait for more requests before scoring a batch")
+	p.add_argument("--reload-interval", type=float, default=1.0, help="Seconds between model mtime checks")
+	p.add_argument("--precision", choices=PRECISIONS + [REFERENCE], default="float64", help="Compiled scorer precision, or 'reference' for the uncompiled model")
+	add_profile_args(p)
+	args = p.parse_args()
+	try:
+		run_profiled(lambda a: asyncio.run(serve(a)), args)
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == "__main__":
+	main()
@@ -1,43 +1,126 @@
 import argparse
-from typing import Dict, List
+import functools
+from typing import List, Optional
 
-from .data import build_features, load_csv
-from .metrics import accuracy, precision_recall_f1, threshold_predictions
+from .data import MISSING_POLICIES, iter_feature_chunks, read_features, read_hashed_features
+from .hashing import DEFAULT_BUCKETS, DEFAULT_MAX_TOKENS, HashConfig
+from .metrics import THRESHOLD_METRICS, confusion, scores_from_confusion, threshold_predictions
+from .backends import resolve_backend
 from .model import IdeaRankerModel
-from .utils import save_json
+from .modelfile import MODEL_FORMATS, load_model, save_model
+from .pipeline import train_model
+from .profiling import add_profile_args, run_profiled
+from .utils import DEFAULT_SEED
 
 
-def run_train(args: argparse.Namespace) -> None:
-	rows = load_csv(args.data)
-	X, y = build_features(rows)
-	model = IdeaRankerModel()
+def run_train_stream(args: argparse.Namespace) -> None:
+	# Out-of-core: the CSV is re-streamed in chunks for the scaler pass, every epoch and evaluation.
+	if getattr(args, "val_ratio", 0.0) > 0:
+		raise ValueError("--val-ratio is not supported with --stream")
+	if getattr(args, "optimize_threshold", None):
+		raise ValueError("--optimize-threshold is not supported with --stream")
+	chunk_size = args.chunk_size
+	chunks = functools.partial(iter_feature_chunks, args.data, chunk_size, getattr(args, "missing", "zero"))
+	model = IdeaRankerModel(backend=resolve_backend(getattr(args, "backend", "auto")))
 	model.metadata = {
 		"learning_rate": str(args.lr),
 		"epochs": str(args.epochs),
 		"l2": str(args.l2),
 		"data": args.data,
+		"backend": model.backend,
+		"stream_chunk_size": str(chunk_size),
 	}
-	model.fit(X, y, lr=args.lr, epochs=args.epochs, l2=args.l2)
-	probs = model.predict_proba(X)
-	y_pred = threshold_predictions(probs, args.threshold)
-	acc = accuracy(y, y_pred)
-	p, r, f1 = precision_recall_f1(y, y_pred)
+	model.fit_stream(
+		chunks, lr=args.lr, epochs=args.epochs, l2=args.l2,
+		batch_size=getattr(args, "batch_size", 0),
+		optimizer=getattr(args, "optimizer", "gd"),
+		seed=getattr(args, "seed", DEFAULT_SEED),
+	)
+	counts = [0, 0, 0, 0]
+	for X, y in chunks():
+		y_pred = threshold_predictions(model.predict_proba(X, copy=False), args.threshold)
+		counts = [a + b for a, b in zip(counts, confusion(y, y_pred))]
+	acc, p, r, f1 = scores_from_confusion(*counts)
 	print(f"Train metrics | acc={acc:.3f} p={p:.3f} r={r:.3f} f1={f1:.3f}")
-	payload: Dict[str, object] = model.to_dict()
-	save_json(args.model, payload)
+	save_model(args.model, model, getattr(args, "format", "auto"))
+	print(f"Saved model to {args.model}")
+
+
+def hash_config(args: argparse.Namespace) -> Optional[HashConfig]:
+	specs = getattr(args, "hash_columns", None)
+	if not specs:
+		return None
+	return HashConfig.from_specs(
+		specs, getattr(args, "hash_buckets", DEFAULT_BUCKETS), getattr(args, "hash_seed", 0), getattr(args, "hash_max_tokens", DEFAULT_MAX_TOKENS),
+	)
+
+
+def run_train(args: argparse.Namespace) -> None:
+	warm_start = getattr(args, "warm_start", "")
+	hashing = hash_config(args)
+	if getattr(args, "stream", False):
+		if warm_start:
+			raise ValueError("--warm-start is not supported with --stream")
+		if hashing is not None:
+			raise ValueError("--hash-columns is not supported with --stream")
+		run_train_stream(args)
+		return
+	base = None
+	if warm_start:
+		# --data is only the new batch; the scaler and weights continue from the saved model
+		base = load_model(warm_start)
+		if not base.weights:
+			raise ValueError(f"{warm_start}: model has no weights to warm-start from")
+		if base.scaler.count == 0 or not base.scaler.m2:
+			print(f"Warning: {warm_start} has no saved scaler moments (saved before warm starts); scaler statistics restart from this batch")
+		base.metadata["warm_start_from"] = warm_start
+		# The batch is hashed exactly like the data the model was trained on
+		if hashing is not None and hashing != base.hashing:
+			raise ValueError(f"--hash-columns differ from the hash config saved in {warm_start}")
+		hashing = base.hashing
+	missing = getattr(args, "missing", "zero")
+	if hashing is not None:
+		if getattr(args, "feature_cache", None):
+			raise ValueError("--feature-cache is not supported with hashed columns")
+		X, y, sparse = read_hashed_features(args.data, hashing, missing)
+		print(f"Hashed columns: {', '.join(hashing.names)} -> {hashing.n_buckets} buckets ({sparse.nnz / max(1, len(sparse)):.1f} tokens/row)")
+		model = train_model(X, y, args, base, sparse, hashing)
+	else:
+		X, y = read_features(args.data, missing, getattr(args, "feature_cache", None) or None)
+		model = train_model(X, y, args, base)
+	save_model(args.model, model, getattr(args, "format", "auto"))
 	print(f"Saved model to {args.model}")
 
 
 def main() -> None:
 	parser = argparse.ArgumentParser(description="Train IdeaRanker model (pure Python)")
 	parser.add_argument("--data", required=True, help="Path to training CSV")
-	parser.add_argument("--model", required=True, help="Output path for model JSON")
+	parser.add_argument("--model", required=True, help="Output path for the model (JSON, or the binary format for a .bin path)")
+	parser.add_argument("--format", choices=MODEL_FORMATS, default="auto", help="Model file format (auto: binary for a .bin path, JSON otherwise)")
 	parser.add_argument("--lr", type=float, default=0.1)
 	parser.add_argument("--epochs", type=int, default=300)
 	parser.add_argument("--l2", type=float, default=0.0)
-	parser.add_argument("--threshold", type=float, default=0.5)
+	parser.add_argument("--threshold", type=float, default=0.5, help="Decision threshold for the reported metrics")
+	parser.add_argument("--optimize-threshold", choices=THRESHOLD_METRICS, default=None, help="Instead of --threshold, use the one maximizing this metric on the validation split (or training data); saved in the model metadata")
+	parser.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto", help="Compute backend (auto uses numpy when installed)")
+	parser.add_argument("--batch-size", type=int, default=0, help="Mini-batch size (0 = full-batch gradient descent)")
+	parser.add_argument("--optimizer", choices=["gd", "momentum", "adam"], default="gd")
+	parser.add_argument("--val-ratio", type=float, default=0.0, help="Hold out this fraction for validation / early stopping")
+	parser.add_argument("--patience", type=int, default=0, help="Stop after this many epochs without val-loss improvement (0 = off)")
+	parser.add_argument("--min-delta", type=float, default=1e-4, help="Minimum val-loss improvement that resets patience")
+	parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+	parser.add_argument("--stream", action="store_true", help="Out-of-core training: re-stream the CSV in chunks instead of loading it")
+	parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per chunk in --stream mode")
+	parser.add_argument("--missing", choices=MISSING_POLICIES, default="zero", help="Empty or absent feature/label cells: read as 0, skip the row, or fail")
+	parser.add_argument("--warm-start", default="", help="Update this saved model with --data as a new batch (merged scaler moments, --epochs passes over the batch only) instead of training from scratch")
+	parser.add_argument("--feature-cache", default="", help="Binary file of parsed columns, reused while the CSV is unchanged (not with --stream)")
+	parser.add_argument("--hash-columns", nargs="+", default=None, metavar="SPEC", help="Categorical columns to hash into sparse features: NAME (one token per cell) or NAME:SEP for multi-valued cells, e.g. team tags:| (optimizer gd only)")
+	parser.add_argument("--hash-buckets", type=int, default=DEFAULT_BUCKETS, help="Size of the hashed feature space (weights added to the model)")
+	parser.add_argument("--hash-seed", type=int, default=0, help="Hash seed (saved with the model)")
+	parser.add_argument("--hash-max-tokens", type=int, default=DEFAULT_MAX_TOKENS, help="Tokens kept per row across all hashed columns")
+	add_profile_args(parser)
 	args = parser.parse_args()
-	run_train(args)
+	run_profiled(run_train, args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+from array import array
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+class FeatureMatrix:
+	# Column-major feature store: one contiguous float64 buffer per feature.
+	# Columns may be array('d') or any writable buffer of doubles (e.g. memoryview.cast("d")).
+	def __init__(self, columns: Sequence[Sequence[float]], names: Optional[Sequence[str]] = None) -> None:
+		self.columns: List[Sequence[float]] = [c if isinstance(c, (array, memoryview)) else array("d", c) for c in columns]
+		self.names: List[str] = list(names) if names is not None else [f"f{j}" for j in range(len(self.columns))]
+		lengths = {len(c) for c in self.columns}
+		if len(lengths) > 1:
+			raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+
+	@classmethod
+	def empty(cls, names: Sequence[str]) -> "FeatureMatrix":
+		return cls([array("d") for _ in names], names)
+
+	@classmethod
+	def from_rows(cls, rows: Iterable[Sequence[float]], names: Optional[Sequence[str]] = None) -> "FeatureMatrix":
+		columns: List[array] = []
+		for row in rows:
+			if not columns:
+				columns = [array("d") for _ in row]
+			for col, v in zip(columns, row):
+				col.append(v)
+		if not columns and names is not None:
+			columns = [array("d") for _ in names]
+		return cls(columns, names)
+
+	@property
+	def n_features(self) -> int:
+		return len(self.columns)
+
+	@property
+	def nbytes(self) -> int:
+		return sum(len(c) * 8 for c in self.columns)
+
+	def __len__(self) -> int:
+		return len(self.columns[0]) if self.columns else 0
+
+	def __getitem__(self, i: int) -> List[float]:
+		# Row access for compatibility with List[List[float]] callers; allocates a list.
+		return [col[i] for col in self.columns]
+
+	def __iter__(self) -> Iterator[List[float]]:
+		for vals in zip(*self.columns):
+			yield list(vals)
+
+	def append_row(self, values: Sequence[float]) -> None:
+		for col, v in zip(self.columns, values):
+			col.append(v)  # type: ignore[attr-defined]
+
+	def copy(self) -> "FeatureMatrix":
+		return FeatureMatrix([array("d", c) for c in self.columns], self.names)
+
+	def take(self, indices: Sequence[int]) -> "FeatureMatrix":
+		return FeatureMatrix([array("d", [col[i] for i in indices]) for col in self.columns], self.names)
+
+	def to_rows(self) -> List[List[float]]:
+		return [list(vals) for vals in zip(*self.columns)]
+
+
+Matrix = Union[FeatureMatrix, List[List[float]]]
+
+
+def as_feature_matrix(X: Matrix) -> FeatureMatrix:
+	if isinstance(X, FeatureMatrix):
+		return X
+	return FeatureMatrix.from_rows(X)
+
+
+def share_matrix(X: FeatureMatrix, y: Sequence[int]) -> shared_memory.SharedMemory:
+	# Copies X (column-major float64) followed by y (int8) into one shared-memory block that
+	# worker processes can attach to by name without pickling the data.
+	n = len(X)
+	if len(y) != n:
+		raise ValueError(f"{n} feature rows but {len(y)} labels")
+	shm = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes + n))
+	try:
+		buf = shm.buf[:X.nbytes].cast("d")
+		try:
+			for j, col in enumerate(X.columns):
+				buf[j * n:(j + 1) * n] = col if isinstance(col, array) else array("d", col)
+		finally:
+			buf.release()
+		shm.buf[X.nbytes:X.nbytes + n] = array("b", y).tobytes()
+	except BaseException:
+		# Nobody else knows the block's name yet: free it here
+		shm.close()
+		shm.unlink()
+		raise
+	return shm
+
+
+def attach_matrix(shm: shared_memory.SharedMemory, n_rows: int, names: Sequence[str]) -> Tuple[FeatureMatrix, memoryview]:
+	# Zero-copy views over a block written by share_matrix.
+	nbytes = n_rows * len(names) * 8
+	buf = shm.buf[:nbytes].cast("d")
+	X = FeatureMatrix([buf[j * n_rows:(j + 1) * n_rows] for j in range(len(names))], names)
+	y = shm.buf[nbytes:nbytes + n_rows].cast("b")
+	return X, y
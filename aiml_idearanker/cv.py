@@ -1,6 +1,12 @@
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
-from .metrics import accuracy, precision_recall_f1, threshold_predictions
+from .columnar import FeatureMatrix, attach_matrix, share_matrix
+from .data import LABEL_COLUMN, take
+from .metrics import best_threshold, evaluate_probs, threshold_table
+from .model import IdeaRankerModel
 from .utils import set_global_seed
 
 
@@ -23,21 +29,126 @@ def k_fold_indices(n: int, k: int, seed: int = 42) -> List[Tuple[List[int], List
 	return pairs
 
 
-def evaluate_folds(probs_per_fold: List[List[float]], y_true_per_fold: List[List[int]], threshold: float = 0.5) -> Dict[str, float]:
-	accs: List[float] = []
-	ps: List[float] = []
-	rs: List[float] = []
-	f1s: List[float] = []
-	for probs, y_true in zip(probs_per_fold, y_true_per_fold):
-		y_pred = threshold_predictions(probs, threshold)
-		accs.append(accuracy(y_true, y_pred))
-		p, r, f1 = precision_recall_f1(y_true, y_pred)
-		ps.append(p)
-		rs.append(r)
-		f1s.append(f1)
-	return {
-		"accuracy": sum(accs) / max(1, len(accs)),
-		"precision": sum(ps) / max(1, len(ps)),
-		"recall": sum(rs) / max(1, len(rs)),
-		"f1": sum(f1s) / max(1, len(f1s)),
+def evaluate_folds(
+	probs_per_fold: List[List[float]],
+	y_true_per_fold: List[List[int]],
+	threshold: float = 0.5,
+	thresholds: Optional[List[float]] = None,
+	backend: str = "auto",
+) -> Dict[str, float]:
+	# Mean over folds of metrics.evaluate_probs, each fold at `threshold` or at its own entry of
+	# `thresholds` (tuned without that fold's labels, see run_cv); "threshold" is then their mean.
+	per_fold_thresholds = thresholds if thresholds is not None else [threshold] * len(probs_per_fold)
+	per_fold = [
+		evaluate_probs(y_true, probs, t, backend=backend)
+		for probs, y_true, t in zip(probs_per_fold, y_true_per_fold, per_fold_thresholds)
+	]
+	keys = ["accuracy", "precision", "recall", "f1", "auc", "pr_auc", "log_loss"]
+	metrics = {k: sum(m[k] for m in per_fold) / max(1, len(per_fold)) for k in keys}
+	metrics["threshold"] = sum(per_fold_thresholds) / max(1, len(per_fold_thresholds))
+	return metrics
+
+
+# Parallel CV driver. The feature matrix is copied once into shared memory; each worker attaches
+# to it in its initializer and recomputes its fold split from (n, k, seed), so a task is just a fold id.
+
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(shm_name: str, n_rows: int, names: List[str]) -> None:
+	shm = shared_memory.SharedMemory(name=shm_name)
+	X, y = attach_matrix(shm, n_rows, names)
+	_WORKER.update(shm=shm, X=X, y=y)
+
+
+def worker_data() -> Tuple[FeatureMatrix, Sequence[int]]:
+	# (X, y) attached in this worker process by shared_pool
+	return _WORKER["X"], _WORKER["y"]  # type: ignore[return-value]
+
+
+def check_labels(X: FeatureMatrix, y: Sequence[int]) -> None:
+	# Up front, so an unlabeled CSV fails with this rather than deep inside a fold or a worker
+	if len(y) != len(X):
+		raise ValueError(f"{len(X)} feature rows but {len(y)} labels (is the '{LABEL_COLUMN}' column missing?)")
+
+
+@contextmanager
+def shared_pool(X: FeatureMatrix, y: Sequence[int], workers: int) -> Iterator[ProcessPoolExecutor]:
+	# Process pool whose workers see (X, y) through worker_data() without per-task pickling.
+	check_labels(X, y)
+	shm = share_matrix(X, y)
+	try:
+		with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shm.name, len(X), X.names)) as pool:
+			yield pool
+	finally:
+		shm.close()
+		shm.unlink()
+
+
+def _fit_fold(
+	X: FeatureMatrix,
+	y: Sequence[int],
+	train_idx: List[int],
+	val_idx: List[int],
+	backend: str,
+	fit_options: Dict[str, object],
+	optimize: Optional[str] = None,
+) -> Tuple[List[float], List[int], List[float], Optional[float]]:
+	# With optimize, the threshold is tuned on the fold's own training predictions, so the
+	# held-out fold scores it like unseen data would
+	model = IdeaRankerModel(backend=backend)
+	X_train, y_train = X.take(train_idx), take(y, train_idx)
+	model.fit(X_train, y_train, copy=False, **fit_options)  # type: ignore[arg-type]
+	probs = model.predict_proba(X.take(val_idx), copy=False)
+	threshold = None
+	if optimize:
+		train_probs = model.predict_proba(X_train, copy=False)
+		threshold, _ = best_threshold(threshold_table(y_train, train_probs, backend), optimize)
+	return probs, [y[i] for i in val_idx], model.weights, threshold
+
+
+def _run_fold(fold: int, k: int, seed: int, backend: str, fit_options: Dict[str, object], optimize: Optional[str] = None) -> Tuple[int, List[float], List[int], List[float], Optional[float]]:
+	X, y = worker_data()
+	train_idx, val_idx = k_fold_indices(len(X), k, seed)[fold]
+	return (fold,) + _fit_fold(X, y, train_idx, val_idx, backend, fit_options, optimize)  # type: ignore[return-value]
+
+
+def run_cv(
+	X: FeatureMatrix,
+	y: Sequence[int],
+	k: int = 5,
+	seed: int = 42,
+	workers: int = 1,
+	threshold: float = 0.5,
+	backend: str = "auto",
+	optimize_threshold: Optional[str] = None,
+	**fit_options: object,
+) -> Dict[str, object]:
+	# Trains one IdeaRankerModel per fold (in a process pool when workers > 1) and aggregates
+	# validation metrics with evaluate_folds. fit_options are passed to IdeaRankerModel.fit.
+	# optimize_threshold tunes a threshold per fold on its training split (not the held-out rows
+	# it is scored on); the metrics use each fold's own and report their mean.
+	check_labels(X, y)
+	probs_per_fold: List[List[float]] = [[] for _ in range(k)]
+	y_per_fold: List[List[int]] = [[] for _ in range(k)]
+	weights_per_fold: List[List[float]] = [[] for _ in range(k)]
+	thresholds: List[Optional[float]] = [None] * k
+	if workers <= 1:
+		for fold, (train_idx, val_idx) in enumerate(k_fold_indices(len(X), k, seed)):
+			probs_per_fold[fold], y_per_fold[fold], weights_per_fold[fold], thresholds[fold] = _fit_fold(
+				X, y, train_idx, val_idx, backend, fit_options, optimize_threshold,
+			)
+	else:
+		with shared_pool(X, y, min(workers, k)) as pool:
+			futures = [pool.submit(_run_fold, fold, k, seed, backend, fit_options, optimize_threshold) for fold in range(k)]
+			for fut in futures:
+				fold, probs, y_val, weights, fold_threshold = fut.result()
+				probs_per_fold[fold], y_per_fold[fold], weights_per_fold[fold], thresholds[fold] = probs, y_val, weights, fold_threshold
+	tuned = [float(t) for t in thresholds if t is not None] if optimize_threshold else None
+	result: Dict[str, object] = {
+		"metrics": evaluate_folds(probs_per_fold, y_per_fold, threshold=threshold, thresholds=tuned, backend=backend),
+		"fold_weights": weights_per_fold,
 	}
+	if tuned is not None:
+		result["fold_thresholds"] = tuned
+	return result
@@ -1,6 +1,15 @@
 import csv
-from typing import Dict, List, Tuple
+import json
+import os
+import struct
+from array import array
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
 
+from .columnar import FeatureMatrix, Matrix
+from .hashing import HashConfig, SparseRows
+from .profiling import profiled
 from .utils import set_global_seed
 
 
@@ -12,8 +21,17 @@ FEATURE_COLUMNS = [
 	"prior_similar_success_rate",
 ]
 LABEL_COLUMN = "label"
+# Columns parsed as int(float(value)) like to_int; the rest like to_float
+INT_COLUMNS = {"projected_users", "est_dev_weeks"}
+# Empty cells and columns absent from the file: "zero" reads them as 0 (the DictReader behavior),
+# "skip" drops the row, "error" raises
+MISSING_POLICIES = ["zero", "skip", "error"]
+BLOCK_ROWS = 8192
+CACHE_MAGIC = b"IRFC"
+CACHE_VERSION = 1
 
 
+@profiled("load_csv", rows=len)
 def load_csv(path: str) -> List[Dict[str, str]]:
 	rows: List[Dict[str, str]] = []
 	with open(path, "r", encoding="utf-8", newline="") as f:
@@ -23,34 +41,243 @@ def load_csv(path: str) -> List[Dict[str, str]]:
 	return rows
 
 
+def iter_csv_chunks(path: str, chunk_size: int) -> Iterator[List[Dict[str, str]]]:
+	# Yields lists of at most chunk_size rows; only one chunk is alive at a time.
+	if chunk_size <= 0:
+		raise ValueError("chunk_size must be positive")
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		reader = csv.DictReader(f)
+		chunk: List[Dict[str, str]] = []
+		for row in reader:
+			chunk.append(row)
+			if len(chunk) >= chunk_size:
+				yield chunk
+				chunk = []
+		if chunk:
+			yield chunk
+
+
 def to_float(row: Dict[str, str], key: str) -> float:
-	value = row.get(key, "0").strip()
+	value = row.get(key, "0")
+	if not isinstance(value, str):
+		# Already-typed values (JSON payloads, DataFrame cells)
+		return float(value) if value is not None else 0.0
+	value = value.strip()
 	return float(value) if value else 0.0
 
 
 def to_int(row: Dict[str, str], key: str) -> int:
-	value = row.get(key, "0").strip()
+	value = row.get(key, "0")
+	if not isinstance(value, str):
+		return int(float(value)) if value is not None else 0
+	value = value.strip()
 	return int(float(value)) if value else 0
 
 
-def build_features(rows: List[Dict[str, str]]) -> Tuple[List[List[float]], List[int]]:
-	X: List[List[float]] = []
-	y: List[int] = []
+@profiled("build_features", rows=lambda r: len(r[0]))
+def build_features(rows: Iterable[Dict[str, str]]) -> Tuple[FeatureMatrix, array]:
+	# Parses straight into one float64 column per feature; no per-row lists are kept.
+	X = FeatureMatrix.empty(FEATURE_COLUMNS)
+	novelty, feasibility, users, weeks, prior = X.columns
+	y = array("b")
 	for r in rows:
-		features = [
-			to_float(r, "novelty_score"),
-			to_float(r, "feasibility_score"),
-			float(to_int(r, "projected_users")),
-			float(to_int(r, "est_dev_weeks")),
-			to_float(r, "prior_similar_success_rate"),
-		]
-		X.append(features)
+		novelty.append(to_float(r, "novelty_score"))  # type: ignore[attr-defined]
+		feasibility.append(to_float(r, "feasibility_score"))  # type: ignore[attr-defined]
+		users.append(float(to_int(r, "projected_users")))  # type: ignore[attr-defined]
+		weeks.append(float(to_int(r, "est_dev_weeks")))  # type: ignore[attr-defined]
+		prior.append(to_float(r, "prior_similar_success_rate"))  # type: ignore[attr-defined]
 		if LABEL_COLUMN in r:
 			y.append(1 if to_int(r, LABEL_COLUMN) > 0 else 0)
 	return X, y
 
 
-def train_val_split(X: List[List[float]], y: List[int], val_ratio: float = 0.2, seed: int = 42) -> Tuple[List[List[float]], List[int], List[List[float]], List[int]]:
+def _parse_int(cell: str) -> int:
+	try:
+		return int(cell)
+	except ValueError:
+		return int(float(cell))
+
+
+def _parse_cell(cell: Optional[str], name: str, missing: str, where: str) -> Optional[float]:
+	# Slow path for one cell; None means "drop the row"
+	if cell is None or not cell.strip():
+		if missing == "error":
+			raise ValueError(f"{where}: missing value for '{name}'")
+		return None if missing == "skip" else 0.0
+	try:
+		if name == LABEL_COLUMN:
+			return 1 if _parse_int(cell) > 0 else 0
+		return float(_parse_int(cell)) if name in INT_COLUMNS else float(cell)
+	except ValueError:
+		raise ValueError(f"{where}: invalid number {cell!r} for '{name}'") from None
+
+
+def iter_typed_chunks(path: str, chunk_size: int = BLOCK_ROWS, missing: str = "zero") -> Iterator[Tuple[FeatureMatrix, array]]:
+	# Typed replacement for build_features(iter_csv_chunks(...)): csv.reader plus a header index,
+	# so only the feature and label cells are touched and no dict is built per row. Each block is
+	# converted a column at a time with map(float / int); a block with an empty, short or
+	# non-integer cell falls back to the per-cell path, which applies the missing-value policy.
+	for X, y, _, _ in _iter_typed_blocks(path, chunk_size, missing):
+		yield X, y
+
+
+def iter_hashed_chunks(path: str, config: HashConfig, chunk_size: int = BLOCK_ROWS, missing: str = "zero") -> Iterator[Tuple[FeatureMatrix, array, SparseRows]]:
+	# iter_typed_chunks plus the hashed columns of the same (kept) rows
+	for X, y, rows, header in _iter_typed_blocks(path, chunk_size, missing):
+		yield X, y, config.encode_rows(rows, header)
+
+
+@profiled("read_hashed_features", rows=lambda r: len(r[0]))
+def read_hashed_features(path: str, config: HashConfig, missing: str = "zero") -> Tuple[FeatureMatrix, array, SparseRows]:
+	X = FeatureMatrix.empty(FEATURE_COLUMNS)
+	y = array("b")
+	S = SparseRows()
+	for Xc, yc, Sc in iter_hashed_chunks(path, config, BLOCK_ROWS, missing):
+		for col, part in zip(X.columns, Xc.columns):
+			col.extend(part)  # type: ignore[attr-defined]
+		y.extend(yc)
+		S.extend(Sc)
+	return X, y, S
+
+
+def _iter_typed_blocks(path: str, chunk_size: int, missing: str) -> Iterator[Tuple[FeatureMatrix, array, List[List[str]], List[str]]]:
+	# (X, y, the raw rows that were kept, header) per block
+	if missing not in MISSING_POLICIES:
+		raise ValueError(f"Unknown missing-value policy '{missing}'. Choose from: {', '.join(MISSING_POLICIES)}")
+	if chunk_size <= 0:
+		raise ValueError("chunk_size must be positive")
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		reader = csv.reader(f)
+		header = next(reader, [])
+		has_label = LABEL_COLUMN in header
+		names = FEATURE_COLUMNS + ([LABEL_COLUMN] if has_label else [])
+		absent = [c for c in names if c not in header]
+		if absent and missing != "zero":
+			raise ValueError(f"{path}: missing columns {absent}")
+		# Absent columns read as "" (a missing cell) through an index one past the end of the row
+		idx = [header.index(c) if c in header else len(header) for c in names]
+		rows = filter(None, reader)  # blank lines are skipped, as DictReader does
+		line = 1
+		while True:
+			block = list(islice(rows, chunk_size))
+			if not block:
+				break
+			X = FeatureMatrix.empty(FEATURE_COLUMNS)
+			y = array("b")
+			kept = block
+			try:
+				if absent:
+					raise IndexError
+				for j, (k, name) in enumerate(zip(idx, FEATURE_COLUMNS)):
+					cells = map(itemgetter(k), block)
+					X.columns[j].extend(map(float, map(int, cells) if name in INT_COLUMNS else cells))  # type: ignore[attr-defined]
+				if has_label:
+					y.extend(int(v) > 0 for v in map(itemgetter(idx[-1]), block))
+			except (ValueError, IndexError):
+				X = FeatureMatrix.empty(FEATURE_COLUMNS)
+				y = array("b")
+				kept = []
+				for i, row in enumerate(block):
+					where = f"{path}: row {line + i}"
+					vals = [_parse_cell(row[k] if k < len(row) else None, name, missing, where) for k, name in zip(idx, names)]
+					if None in vals:
+						continue
+					X.append_row(vals[:len(FEATURE_COLUMNS)])  # type: ignore[arg-type]
+					if has_label:
+						y.append(int(vals[-1]))  # type: ignore[arg-type]
+					kept.append(row)
+			line += len(block)
+			if len(X):
+				yield X, y, kept, header
+
+
+def _source_stamp(path: str, missing: str) -> Dict[str, object]:
+	st = os.stat(path)
+	return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "missing": missing, "columns": FEATURE_COLUMNS}
+
+
+def save_feature_cache(cache_path: str, source: Dict[str, object], X: FeatureMatrix, y: array) -> None:
+	# Layout: magic, version, meta length, meta JSON (source stamp, rows, labels), padding to 8 bytes,
+	# then each feature column as float64 and the labels as int8
+	meta = json.dumps({"source": source, "rows": len(X), "labels": len(y)}, sort_keys=True).encode("utf-8")
+	head = struct.pack("<4sHI", CACHE_MAGIC, CACHE_VERSION, len(meta)) + meta
+	head += b"\0" * (-len(head) % 8)
+	tmp = cache_path + ".tmp"
+	with open(tmp, "wb") as f:
+		f.write(head)
+		for col in X.columns:
+			f.write(array("d", col).tobytes())
+		f.write(y.tobytes())
+	os.replace(tmp, cache_path)
+
+
+def load_feature_cache(cache_path: str, source: Dict[str, object]) -> Optional[Tuple[FeatureMatrix, array]]:
+	# None when the cache is missing, unreadable or was built from a different file or policy
+	try:
+		with open(cache_path, "rb") as f:
+			data = f.read()
+		magic, version, meta_len = struct.unpack_from("<4sHI", data)
+		if magic != CACHE_MAGIC or version != CACHE_VERSION:
+			return None
+		offset = struct.calcsize("<4sHI")
+		meta = json.loads(data[offset:offset + meta_len].decode("utf-8"))
+	except (OSError, ValueError, struct.error):
+		return None
+	if meta.get("source") != source:
+		return None
+	n, n_labels = meta["rows"], meta["labels"]
+	offset += meta_len
+	offset += -offset % 8
+	if len(data) != offset + 8 * n * len(FEATURE_COLUMNS) + n_labels:
+		return None
+	columns = []
+	for _ in FEATURE_COLUMNS:
+		col = array("d")
+		col.frombytes(data[offset:offset + 8 * n])
+		columns.append(col)
+		offset += 8 * n
+	y = array("b")
+	y.frombytes(data[offset:offset + n_labels])
+	return FeatureMatrix(columns, FEATURE_COLUMNS), y
+
+
+@profiled("read_features", rows=lambda r: len(r[0]))
+def read_features(path: str, missing: str = "zero", cache_path: Optional[str] = None) -> Tuple[FeatureMatrix, array]:
+	# Whole-file typed read; same values as build_features(load_csv(path)) under missing="zero".
+	# With cache_path, the parsed columns are stored in a binary file that later calls load
+	# directly (no text parsing) as long as the CSV's size/mtime and the policy are unchanged.
+	source = _source_stamp(path, missing) if cache_path else {}
+	if cache_path:
+		cached = load_feature_cache(cache_path, source)
+		if cached is not None:
+			return cached
+	X = FeatureMatrix.empty(FEATURE_COLUMNS)
+	y = array("b")
+	for Xc, yc in iter_typed_chunks(path, BLOCK_ROWS, missing):
+		for col, part in zip(X.columns, Xc.columns):
+			col.extend(part)  # type: ignore[attr-defined]
+		y.extend(yc)
+	if cache_path:
+		save_feature_cache(cache_path, source, X, y)
+	return X, y
+
+
+def iter_feature_chunks(path: str, chunk_size: int, missing: str = "zero") -> Iterator[Tuple[FeatureMatrix, array]]:
+	yield from iter_typed_chunks(path, chunk_size, missing)
+
+
+T = TypeVar("T")
+
+
+def take(values: Sequence[T], indices: Sequence[int]) -> Sequence[T]:
+	if isinstance(values, (FeatureMatrix, SparseRows)):
+		return values.take(indices)  # type: ignore[return-value]
+	if isinstance(values, array):
+		return array(values.typecode, [values[i] for i in indices])  # type: ignore[return-value]
+	return [values[i] for i in indices]
+
+
+def train_val_split(X: Matrix, y: Sequence[int], val_ratio: float = 0.2, seed: int = 42) -> Tuple[Matrix, Sequence[int], Matrix, Sequence[int]]:
 	set_global_seed(seed)
 	indices = list(range(len(X)))
 	# Simple shuffle using random from utils seed
@@ -59,8 +286,8 @@ def train_val_split(X: List[List[float]], y: List[int], val_ratio: float = 0.2,
 	cut = int(len(indices) * (1.0 - val_ratio))
 	train_idx = indices[:cut]
 	val_idx = indices[cut:]
-	X_train = [X[i] for i in train_idx]
-	y_train = [y[i] for i in train_idx]
-	X_val = [X[i] for i in val_idx]
-	y_val = [y[i] for i in val_idx]
-	return X_train, y_train, X_val, y_val
+	X_train = take(X, train_idx)
+	y_train = take(y, train_idx)
+	X_val = take(X, val_idx)
+	y_val = take(y, val_idx)
+	return X_train, y_train, X_val, y_val  # type: ignore[return-value]
@@ -0,0 +1,244 @@
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .backends import _numpy
+
+
+# Hashing trick for categorical and multi-valued text columns (team, product area, tags): every
+# token is hashed with CRC-32 into one of n_buckets weights, with a sign taken from the hash so
+# collisions cancel out on average instead of piling up. Nothing depends on the vocabulary: the
+# model holds n_buckets extra weights, and a row costs O(its tokens) to encode, score and update.
+# Rows are stored CSR-style (SparseRows) and training only touches the weights of tokens present
+# in the current batch. The configuration is saved with the model so scoring hashes identically.
+
+DEFAULT_BUCKETS = 1 << 18
+MAX_BUCKETS = 1 << 24
+DEFAULT_MAX_TOKENS = 64
+
+
+class SparseRows:
+	# CSR rows: row i is indices[indptr[i]:indptr[i + 1]] with the matching values
+	def __init__(self) -> None:
+		self.indptr = array("q", [0])
+		self.indices = array("q")
+		self.values = array("d")
+
+	def __len__(self) -> int:
+		return len(self.indptr) - 1
+
+	@property
+	def nnz(self) -> int:
+		return len(self.indices)
+
+	@property
+	def nbytes(self) -> int:
+		return self.indptr.itemsize * len(self.indptr) + self.indices.itemsize * len(self.indices) + 8 * len(self.values)
+
+	def append(self, indices: Sequence[int], values: Sequence[float]) -> None:
+		self.indices.extend(indices)
+		self.values.extend(values)
+		self.indptr.append(len(self.indices))
+
+	def extend(self, other: "SparseRows") -> None:
+		base = self.indptr[-1]
+		self.indices.extend(other.indices)
+		self.values.extend(other.values)
+		self.indptr.extend(base + p for p in other.indptr[1:])
+
+	def row(self, i: int) -> Tuple[Sequence[int], Sequence[float]]:
+		a, b = self.indptr[i], self.indptr[i + 1]
+		return self.indices[a:b], self.values[a:b]
+
+	def take(self, order: Iterable[int]) -> "SparseRows":
+		out = SparseRows()
+		indptr, indices, values = self.indptr, self.indices, self.values
+		for i in order:
+			a, b = indptr[i], indptr[i + 1]
+			out.indices.extend(indices[a:b])
+			out.values.extend(values[a:b])
+			out.indptr.append(len(out.indices))
+		return out
+
+	@classmethod
+	def empty_rows(cls, n: int) -> "SparseRows":
+		out = cls()
+		out.indptr = array("q", [0] * (n + 1))
+		return out
+
+
+def parse_column_spec(spec: str) -> Tuple[str, str]:
+	# "team" (one token per cell) or "tags:|" (cell split on the separator after the colon)
+	name, _, sep = spec.partition(":")
+	if not name:
+		raise ValueError(f"Invalid hashed column spec '{spec}'")
+	return name, sep
+
+
+class HashConfig:
+	def __init__(self, columns: Sequence[Tuple[str, str]], n_buckets: int = DEFAULT_BUCKETS, seed: int = 0, max_tokens: int = DEFAULT_MAX_TOKENS) -> None:
+		if not columns:
+			raise ValueError("At least one hashed column is required")
+		if not 1 <= n_buckets <= MAX_BUCKETS:
+			raise ValueError(f"n_buckets must be between 1 and {MAX_BUCKETS}")
+		self.columns = [(name, sep) for name, sep in columns]
+		self.n_buckets = n_buckets
+		self.seed = seed
+		self.max_tokens = max_tokens
+		# Per-column CRC start value, so the same token in two columns lands in different buckets
+		self._salts = [zlib.crc32(f"{seed}:{name}".encode("utf-8")) for name, _ in self.columns]
+
+	@classmethod
+	def from_specs(cls, specs: Sequence[str], n_buckets: int = DEFAULT_BUCKETS, seed: int = 0, max_tokens: int = DEFAULT_MAX_TOKENS) -> "HashConfig":
+		return cls([parse_column_spec(s) for s in specs], n_buckets, seed, max_tokens)
+
+	def to_dict(self) -> Dict[str, object]:
+		return {
+			"columns": [{"name": name, "separator": sep} for name, sep in self.columns],
+			"n_buckets": self.n_buckets,
+			"seed": self.seed,
+			"max_tokens": self.max_tokens,
+			"hash": "crc32",
+		}
+
+	@classmethod
+	def from_dict(cls, payload: Mapping[str, Any]) -> "HashConfig":
+		if payload.get("hash", "crc32") != "crc32":
+			raise ValueError(f"Unsupported feature hash '{payload.get('hash')}'")
+		columns = [(c["name"], c.get("separator", "")) for c in payload["columns"]]
+		return cls(columns, int(payload["n_buckets"]), int(payload.get("seed", 0)), int(payload.get("max_tokens", DEFAULT_MAX_TOKENS)))
+
+	def __eq__(self, other: object) -> bool:
+		return isinstance(other, HashConfig) and self.to_dict() == other.to_dict()
+
+	@property
+	def names(self) -> List[str]:
+		return [name for name, _ in self.columns]
+
+	def encode(self, cells: Sequence[Any], out: SparseRows) -> None:
+		# cells in column order: a string (split on the column's separator), a list of tokens, or
+		# None / "" for no tokens. At most max_tokens per row.
+		indices: List[int] = []
+		values: List[float] = []
+		n = self.n_buckets
+		for cell, (_, sep), salt in zip(cells, self.columns, self._salts):
+			if not cell:
+				continue
+			tokens = cell if isinstance(cell, list) else cell.split(sep) if sep else (cell,)
+			for token in tokens:
+				token = str(token).strip()
+				if not token or len(indices) >= self.max_tokens:
+					continue
+				h = zlib.crc32(token.encode("utf-8"), salt)
+				indices.append(h % n)
+				values.append(1.0 if h & 0x80000000 else -1.0)
+		out.append(indices, values)
+
+	def encode_rows(self, rows: Iterable[Sequence[str]], header: Sequence[str]) -> SparseRows:
+		# csv.reader rows with the given header; absent columns and short rows have no tokens
+		idx = [header.index(name) if name in header else -1 for name in self.names]
+		out = SparseRows()
+		for row in rows:
+			self.encode([row[k] if 0 <= k < len(row) else None for k in idx], out)
+		return out
+
+	def encode_dicts(self, rows: Iterable[Mapping[str, Any]]) -> SparseRows:
+		# DictReader rows or JSON records
+		out = SparseRows()
+		names = self.names
+		for row in rows:
+			self.encode([_cell(row.get(name)) for name in names], out)
+		return out
+
+
+def _cell(value: Any) -> Any:
+	if value is None:
+		return None
+	if isinstance(value, (list, tuple)):
+		return list(value)  # JSON arrays of tags
+	if isinstance(value, float) and value != value:
+		return None  # NaN cells from pandas
+	return str(value)
+
+
+class SparseOps:
+	# Margins and gradients of the hashed weights over rows[start:stop]. Only weights of tokens
+	# present in those rows are read or returned, so the cost is O(nnz), not O(n_buckets).
+	def __init__(self, rows: SparseRows, backend: str = "python") -> None:
+		self.rows = rows
+		self.np = _numpy() if backend == "numpy" else None
+
+	def permute(self, order: Sequence[int]) -> None:
+		np = self.np
+		if np is None:
+			self.rows = self.rows.take(order)
+			return
+		# Vectorized take: position k of the new row i reads old position indptr[order[i]] + k
+		rows, idx = self.rows, np.asarray(order, dtype=np.int64)
+		indptr = np.frombuffer(rows.indptr, dtype=np.int64)
+		counts = np.diff(indptr)[idx]
+		new_indptr = np.concatenate(([0], np.cumsum(counts)))
+		gather = np.repeat(indptr[idx] - new_indptr[:-1], counts) + np.arange(new_indptr[-1])
+		out = SparseRows()
+		out.indptr = array("q", new_indptr.tobytes())
+		out.indices = array("q", np.frombuffer(rows.indices, dtype=np.int64)[gather].tobytes())
+		out.values = array("d", np.frombuffer(rows.values, dtype=np.float64)[gather].tobytes())
+		self.rows = out
+
+	def to_list(self, w: Any) -> List[float]:
+		return w.tolist() if self.np is not None else list(w)
+
+	def weights(self, values: Sequence[float]) -> Any:
+		# Working copy of the hashed weights: an ndarray for fancy indexing under numpy
+		return self.np.array(values, dtype=self.np.float64) if self.np is not None else list(values)
+
+	def margins(self, w: Any, start: int = 0, stop: Optional[int] = None, base: int = 0) -> Any:
+		# Bucket j is read from w[base + j], so a full model weight vector can be passed as is
+		rows = self.rows
+		stop = len(rows) if stop is None else stop
+		np = self.np
+		if np is not None:
+			a, b = rows.indptr[start], rows.indptr[stop]
+			idx = np.frombuffer(rows.indices, dtype=np.int64)[a:b]
+			contrib = np.frombuffer(rows.values, dtype=np.float64)[a:b] * w[idx + base if base else idx]
+			counts = np.diff(np.frombuffer(rows.indptr, dtype=np.int64)[start:stop + 1])
+			return np.bincount(np.repeat(np.arange(stop - start), counts), weights=contrib, minlength=stop - start)
+		indptr, indices, values = rows.indptr, rows.indices, rows.values
+		out = []
+		for i in range(start, stop):
+			z = 0.0
+			for k in range(indptr[i], indptr[i + 1]):
+				z += values[k] * w[base + indices[k]]
+			out.append(z)
+		return out
+
+	def gradient(self, err: Sequence[float], start: int = 0, stop: Optional[int] = None) -> Tuple[Any, Any]:
+		# (bucket indices, summed err * value per bucket) for buckets present in rows[start:stop]
+		rows = self.rows
+		stop = len(rows) if stop is None else stop
+		np = self.np
+		if np is not None:
+			a, b = rows.indptr[start], rows.indptr[stop]
+			idx = np.frombuffer(rows.indices, dtype=np.int64)[a:b]
+			counts = np.diff(np.frombuffer(rows.indptr, dtype=np.int64)[start:stop + 1])
+			contrib = np.frombuffer(rows.values, dtype=np.float64)[a:b] * np.repeat(np.asarray(err, dtype=np.float64), counts)
+			buckets, inverse = np.unique(idx, return_inverse=True)
+			return buckets, np.bincount(inverse, weights=contrib, minlength=len(buckets))
+		indptr, indices, values = rows.indptr, rows.indices, rows.values
+		grad: Dict[int, float] = {}
+		for i, e in zip(range(start, stop), err):
+			for k in range(indptr[i], indptr[i + 1]):
+				j = indices[k]
+				grad[j] = grad.get(j, 0.0) + e * values[k]
+		return list(grad), list(grad.values())
+
+	def step(self, w: Any, err: Sequence[float], start: int, stop: int, lr: float, n: int, l2: float) -> None:
+		# Gradient step on the buckets present in rows[start:stop]. L2 is applied lazily, to those
+		# buckets only, scaled like _apply_step so the full-batch objective is the same.
+		b = stop - start
+		idx, grad = self.gradient(err, start, stop)
+		if self.np is not None:
+			w[idx] -= lr * (grad / b + l2 * w[idx] / n)
+			return
+		for j, g in zip(idx, grad):
+			w[j] -= lr * (g / b + l2 * w[j] / n)
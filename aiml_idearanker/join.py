@@ -0,0 +1,194 @@
+import csv
+import math
+import os
+import tempfile
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Key-based inner join of two CSV files, streaming so memory stays bounded on files larger than RAM:
+# - "merge": sort-merge join when both files are sorted by the key (O(1) memory per distinct key)
+# - "hash": the smaller file is loaded into a dict and the larger one streamed past it; when the
+#   build side would exceed the memory budget, both files are first partitioned by key hash into
+#   temporary files (Grace hash join) and the partitions are joined one at a time.
+
+METHODS = ["auto", "merge", "hash"]
+KEY_TYPES: Dict[str, Callable[[str], object]] = {"str": str, "int": int}
+# Rough in-memory size of a dict entry relative to its CSV bytes (str objects, lists, dict slots)
+MEMORY_OVERHEAD = 8
+MAX_PARTITIONS = 512  # bounded by open file handles during partitioning
+
+Joined = Tuple[str, List[str], List[str]]
+
+
+def read_header(path: str) -> List[str]:
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		return next(csv.reader(f), [])
+
+
+def iter_keyed(path: str, key: str, columns: Sequence[str]) -> Iterator[Tuple[str, List[str]]]:
+	# Streams (key, [values of columns]) with a header-index lookup instead of a dict per row.
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		reader = csv.reader(f)
+		header = next(reader, [])
+		if key not in header:
+			raise ValueError(f"{path}: missing key column '{key}'")
+		missing = [c for c in columns if c not in header]
+		if missing:
+			raise ValueError(f"{path}: missing columns {missing}")
+		k = header.index(key)
+		idx = [header.index(c) for c in columns]
+		for row in reader:
+			if not row:
+				continue
+			yield row[k], [row[i] if i < len(row) else "" for i in idx]
+
+
+def is_sorted(path: str, key: str, key_type: str = "str") -> bool:
+	parse = KEY_TYPES[key_type]
+	prev = None
+	for k, _ in iter_keyed(path, key, []):
+		cur = parse(k)
+		if prev is not None and cur < prev:  # type: ignore[operator]
+			return False
+		prev = cur
+	return True
+
+
+def merge_join(left: Iterator[Tuple[str, List[str]]], right: Iterator[Tuple[str, List[str]]], key_type: str = "str", stats: Optional[Dict[str, int]] = None) -> Iterator[Joined]:
+	# Both inputs ascending by key; duplicate keys on either side are cross-joined.
+	parse = KEY_TYPES[key_type]
+	counts = stats if stats is not None else {}
+	counts.setdefault("left_unmatched", 0)
+	counts.setdefault("right_unmatched", 0)
+
+	def groups(it: Iterator[Tuple[str, List[str]]], side: str) -> Iterator[Tuple[object, str, List[List[str]]]]:
+		cur_key: object = None
+		raw = ""
+		vals: List[List[str]] = []
+		for k, v in it:
+			pk = parse(k)
+			if vals and pk == cur_key:
+				vals.append(v)
+				continue
+			if vals:
+				if pk < cur_key:  # type: ignore[operator]
+					raise ValueError(f"{side} input is not sorted by key: '{k}' after '{raw}'")
+				yield cur_key, raw, vals
+			cur_key, raw, vals = pk, k, [v]
+		if vals:
+			yield cur_key, raw, vals
+
+	lg = groups(left, "left")
+	rg = groups(right, "right")
+	lcur = next(lg, None)
+	rcur = next(rg, None)
+	while lcur is not None and rcur is not None:
+		if lcur[0] < rcur[0]:  # type: ignore[operator]
+			counts["left_unmatched"] += len(lcur[2])
+			lcur = next(lg, None)
+		elif rcur[0] < lcur[0]:  # type: ignore[operator]
+			counts["right_unmatched"] += len(rcur[2])
+			rcur = next(rg, None)
+		else:
+			for lv in lcur[2]:
+				for rv in rcur[2]:
+					yield lcur[1], lv, rv
+			lcur = next(lg, None)
+			rcur = next(rg, None)
+	while lcur is not None:
+		counts["left_unmatched"] += len(lcur[2])
+		lcur = next(lg, None)
+	while rcur is not None:
+		counts["right_unmatched"] += len(rcur[2])
+		rcur = next(rg, None)
+
+
+def hash_join(build: Iterator[Tuple[str, List[str]]], probe: Iterator[Tuple[str, List[str]]], key_type: str = "str", build_is_left: bool = True, stats: Optional[Dict[str, int]] = None) -> Iterator[Joined]:
+	# In-memory: build side goes into a dict, probe side is streamed; output follows probe order.
+	parse = KEY_TYPES[key_type]
+	counts = stats if stats is not None else {}
+	counts.setdefault("left_unmatched", 0)
+	counts.setdefault("right_unmatched", 0)
+	table: Dict[object, List[List[str]]] = {}
+	for k, v in build:
+		table.setdefault(parse(k), []).append(v)
+	matched = set()
+	probe_unmatched = 0
+	for k, v in probe:
+		pk = parse(k)
+		hits = table.get(pk)
+		if hits is None:
+			probe_unmatched += 1
+			continue
+		matched.add(pk)
+		for b in hits:
+			yield (k, b, v) if build_is_left else (k, v, b)
+	build_unmatched = sum(len(vals) for pk, vals in table.items() if pk not in matched)
+	counts["left_unmatched" if build_is_left else "right_unmatched"] += build_unmatched
+	counts["right_unmatched" if build_is_left else "left_unmatched"] += probe_unmatched
+
+
+def partition(rows: Iterator[Tuple[str, List[str]]], n_parts: int, directory: str, prefix: str, key_type: str = "str") -> List[str]:
+	# Spills rows to n_parts CSV files by crc32 of the normalized key; equal keys share a partition.
+	parse = KEY_TYPES[key_type]
+	paths = [os.path.join(directory, f"{prefix}-{i}.csv") for i in range(n_parts)]
+	files = [open(p, "w", encoding="utf-8", newline="") for p in paths]
+	try:
+		writers = [csv.writer(f) for f in files]
+		for k, v in rows:
+			writers[zlib.crc32(str(parse(k)).encode("utf-8")) % n_parts].writerow([k, *v])
+	finally:
+		for f in files:
+			f.close()
+	return paths
+
+
+def _iter_partition(path: str) -> Iterator[Tuple[str, List[str]]]:
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		for row in csv.reader(f):
+			yield row[0], row[1:]
+
+
+def join_files(
+	left: str,
+	right: str,
+	key: str,
+	left_columns: Sequence[str],
+	right_columns: Sequence[str],
+	method: str = "auto",
+	key_type: str = "str",
+	memory_mb: float = 256.0,
+	tmp_dir: Optional[str] = None,
+	stats: Optional[Dict[str, object]] = None,
+) -> Iterator[Joined]:
+	# Yields (key, left values, right values) for every pair of rows with equal keys.
+	# method="auto" scans both files once to check sort order and uses "merge" when both are sorted.
+	if method not in METHODS:
+		raise ValueError(f"Unknown join method '{method}'. Choose from: {', '.join(METHODS)}")
+	if key_type not in KEY_TYPES:
+		raise ValueError(f"Unknown key type '{key_type}'. Choose from: {', '.join(KEY_TYPES)}")
+	info: Dict[str, object] = stats if stats is not None else {}
+	counts: Dict[str, int] = {}
+	if method == "auto":
+		method = "merge" if is_sorted(left, key, key_type) and is_sorted(right, key, key_type) else "hash"
+	info["method"] = method
+	info["partitions"] = 0
+	if method == "merge":
+		yield from merge_join(iter_keyed(left, key, left_columns), iter_keyed(right, key, right_columns), key_type, counts)
+	else:
+		build_is_left = os.path.getsize(left) <= os.path.getsize(right)
+		build_path, probe_path = (left, right) if build_is_left else (right, left)
+		build_cols, probe_cols = (left_columns, right_columns) if build_is_left else (right_columns, left_columns)
+		budget = max(memory_mb, 1e-3) * (1 << 20)
+		n_parts = min(MAX_PARTITIONS, max(1, math.ceil(os.path.getsize(build_path) * MEMORY_OVERHEAD / budget)))
+		info["partitions"] = n_parts
+		if n_parts == 1:
+			yield from hash_join(iter_keyed(build_path, key, build_cols), iter_keyed(probe_path, key, probe_cols), key_type, build_is_left, counts)
+		else:
+			with tempfile.TemporaryDirectory(prefix="idearanker-join-", dir=tmp_dir) as tmp:
+				build_parts = partition(iter_keyed(build_path, key, build_cols), n_parts, tmp, "build", key_type)
+				probe_parts = partition(iter_keyed(probe_path, key, probe_cols), n_parts, tmp, "probe", key_type)
+				for bp, pp in zip(build_parts, probe_parts):
+					yield from hash_join(_iter_partition(bp), _iter_partition(pp), key_type, build_is_left, counts)
+	info.update(counts)
@@ -1,4 +1,5 @@
-from typing import List, Tuple
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
 def threshold_predictions(probs: List[float], threshold: float = 0.5) -> List[int]:
@@ -33,3 +34,203 @@ def precision_recall_f1(y_true: List[int], y_pred: List[int]) -> Tuple[float, fl
 	else:
 		f1 = 2 * precision * recall / (precision + recall)
 	return precision, recall, f1
+
+
+def scores_from_confusion(tp: int, fp: int, tn: int, fn: int) -> Tuple[float, float, float, float]:
+	# accuracy, precision, recall, f1 from (possibly accumulated) confusion counts
+	acc = (tp + tn) / max(1, tp + fp + tn + fn)
+	precision = tp / max(1, (tp + fp))
+	recall = tp / max(1, (tp + fn))
+	f1 = 0.0 if precision + recall == 0 else 2 * precision * recall / (precision + recall)
+	return acc, precision, recall, f1
+
+
+def log_loss(y_true: Sequence[int], probs: Sequence[float], eps: float = 1e-15) -> float:
+	total = 0.0
+	for t, p in zip(y_true, probs):
+		p = min(max(p, eps), 1.0 - eps)
+		total -= math.log(p) if t == 1 else math.log(1.0 - p)
+	return total / max(1, len(y_true))
+
+
+# Threshold sweep: one sort of the probabilities gives the confusion counts of every threshold,
+# from which ROC / PR curves, AUCs and the best threshold follow in O(n log n) instead of
+# re-thresholding the whole set per candidate. With the numpy backend (default when installed)
+# the table holds numpy arrays and every step below is vectorized, so 10M-row sets take seconds.
+
+THRESHOLD_METRICS = ["f1", "accuracy", "youden"]
+
+
+def threshold_table(y_true: Sequence[int], probs: Sequence[float], backend: str = "auto") -> Dict[str, Any]:
+	# For each distinct probability t, descending: tp / fp count positives / negatives with p >= t,
+	# i.e. the confusion of threshold_predictions(probs, t).
+	from .backends import resolve_backend
+	if len(y_true) != len(probs):
+		raise ValueError(f"{len(y_true)} labels vs {len(probs)} probabilities")
+	n = len(probs)
+	if resolve_backend(backend) == "numpy":
+		import numpy as np
+		p = np.asarray(probs, dtype=np.float64)
+		pos = np.asarray(y_true) == 1
+		order = np.argsort(-p)  # tie order is irrelevant: equal probabilities form one threshold
+		ps = p[order]
+		ends = np.append(np.flatnonzero(ps[1:] != ps[:-1]), n - 1) if n else np.zeros(0, dtype=np.intp)
+		tp = np.cumsum(pos[order], dtype=np.int64)[ends]
+		n_pos = int(tp[-1]) if n else 0
+		return {"threshold": ps[ends], "tp": tp, "fp": ends + 1 - tp, "positives": n_pos, "negatives": n - n_pos, "numpy": True}
+	order = sorted(range(n), key=probs.__getitem__, reverse=True)
+	thresholds: List[float] = []
+	tps: List[int] = []
+	fps: List[int] = []
+	tp = fp = 0
+	for rank, i in enumerate(order):
+		if y_true[i] == 1:
+			tp += 1
+		else:
+			fp += 1
+		if rank + 1 == n or probs[order[rank + 1]] != probs[i]:
+			thresholds.append(probs[i])
+			tps.append(tp)
+			fps.append(fp)
+	return {"threshold": thresholds, "tp": tps, "fp": fps, "positives": tp, "negatives": fp, "numpy": False}
+
+
+def confusion_at(table: Dict[str, Any], threshold: float) -> Tuple[int, int, int, int]:
+	# (tp, fp, tn, fn) of predicting p >= threshold, by binary search over the descending thresholds
+	thr = table["threshold"]
+	lo, hi = 0, len(thr)
+	while lo < hi:
+		mid = (lo + hi) // 2
+		if thr[mid] >= threshold:
+			lo = mid + 1
+		else:
+			hi = mid
+	tp, fp = (int(table["tp"][lo - 1]), int(table["fp"][lo - 1])) if lo else (0, 0)
+	return tp, fp, table["negatives"] - fp, table["positives"] - tp
+
+
+def roc_curve(table: Dict[str, Any]) -> Tuple[List[float], List[float], List[float]]:
+	# (fpr, tpr, thresholds), starting at (0, 0) for a threshold above every probability
+	P, N = max(1, table["positives"]), max(1, table["negatives"])
+	fpr = [0.0] + [fp / N for fp in _as_list(table["fp"])]
+	tpr = [0.0] + [tp / P for tp in _as_list(table["tp"])]
+	return fpr, tpr, [math.inf] + _as_list(table["threshold"])
+
+
+def pr_curve(table: Dict[str, Any]) -> Tuple[List[float], List[float], List[float]]:
+	# (precision, recall, thresholds), one point per distinct probability
+	P = max(1, table["positives"])
+	tps, fps = _as_list(table["tp"]), _as_list(table["fp"])
+	precision = [tp / max(1, tp + fp) for tp, fp in zip(tps, fps)]
+	recall = [tp / P for tp in tps]
+	return precision, recall, _as_list(table["threshold"])
+
+
+def roc_auc(table: Dict[str, Any]) -> float:
+	# Trapezoidal area under the ROC curve (tied probabilities count half, as in Mann-Whitney U)
+	P, N = table["positives"], table["negatives"]
+	if P == 0 or N == 0:
+		return 0.5
+	if table["numpy"]:
+		import numpy as np
+		tp = np.concatenate(([0], table["tp"])).astype(np.float64)
+		fp = np.concatenate(([0], table["fp"])).astype(np.float64)
+		return float(np.sum(np.diff(fp) * (tp[1:] + tp[:-1])) / (2.0 * P * N))
+	area = 0
+	prev_tp = prev_fp = 0
+	for tp, fp in zip(table["tp"], table["fp"]):
+		area += (fp - prev_fp) * (tp + prev_tp)
+		prev_tp, prev_fp = tp, fp
+	return area / (2.0 * P * N)
+
+
+def average_precision(table: Dict[str, Any]) -> float:
+	# Area under the PR curve as the recall-weighted mean of precision (step interpolation)
+	P = table["positives"]
+	if P == 0:
+		return 0.0
+	if table["numpy"]:
+		import numpy as np
+		tp = table["tp"].astype(np.float64)
+		precision = tp / (tp + table["fp"])
+		return float(np.sum(np.diff(np.concatenate(([0.0], tp))) * precision) / P)
+	total = 0.0
+	prev_tp = 0
+	for tp, fp in zip(table["tp"], table["fp"]):
+		total += (tp - prev_tp) * tp / (tp + fp)
+		prev_tp = tp
+	return total / P
+
+
+def best_threshold(table: Dict[str, Any], metric: str = "f1") -> Tuple[float, float]:
+	# (threshold, score) maximizing metric over all distinct thresholds and one just above the
+	# highest probability (predict no positives); ties keep the higher threshold
+	if metric not in THRESHOLD_METRICS:
+		raise ValueError(f"Unknown threshold metric '{metric}'. Choose from: {', '.join(THRESHOLD_METRICS)}")
+	if len(table["threshold"]) == 0:
+		return 0.5, 0.0
+	P, N = table["positives"], table["negatives"]
+	# Scores of the above-max point, tp = fp = 0, like roc_curve's inf but finite so it can be saved
+	above = math.nextafter(float(table["threshold"][0]), math.inf)
+	none = (N / (P + N)) if metric == "accuracy" else 0.0
+	if table["numpy"]:
+		import numpy as np
+		tp = table["tp"].astype(np.float64)
+		fp = table["fp"].astype(np.float64)
+		if metric == "f1":
+			scores = 2 * tp / (tp + fp + P) if P else np.zeros_like(tp)
+		elif metric == "accuracy":
+			scores = (tp + N - fp) / (P + N)
+		else:
+			scores = tp / max(1, P) - fp / max(1, N)
+		i = int(np.argmax(scores))
+		if none >= scores[i]:
+			return above, none
+		return float(table["threshold"][i]), float(scores[i])
+	best_t, best = above, none
+	for t, tp, fp in zip(table["threshold"], table["tp"], table["fp"]):
+		if metric == "f1":
+			score = 2 * tp / (tp + fp + P) if P else 0.0
+		elif metric == "accuracy":
+			score = (tp + N - fp) / (P + N)
+		else:
+			score = tp / max(1, P) - fp / max(1, N)
+		if score > best:
+			best_t, best = t, score
+	return float(best_t), best
+
+
+def evaluate_probs(
+	y_true: Sequence[int],
+	probs: Sequence[float],
+	threshold: float = 0.5,
+	optimize: Optional[str] = None,
+	backend: str = "auto",
+) -> Dict[str, float]:
+	# accuracy / precision / recall / f1 at `threshold` (or at the best threshold for `optimize`),
+	# plus threshold-free auc, pr_auc and log_loss, all from one threshold_table.
+	table = threshold_table(y_true, probs, backend)
+	if optimize:
+		threshold, _ = best_threshold(table, optimize)
+	acc, precision, recall, f1 = scores_from_confusion(*confusion_at(table, threshold))
+	if table["numpy"]:
+		import numpy as np
+		p = np.clip(np.asarray(probs, dtype=np.float64), 1e-15, 1.0 - 1e-15)
+		pos = np.asarray(y_true) == 1
+		loss = float(-np.sum(np.log(np.where(pos, p, 1.0 - p))) / max(1, len(p)))
+	else:
+		loss = log_loss(y_true, probs)
+	return {
+		"accuracy": acc,
+		"precision": precision,
+		"recall": recall,
+		"f1": f1,
+		"threshold": threshold,
+		"auc": roc_auc(table),
+		"pr_auc": average_precision(table),
+		"log_loss": loss,
+	}
+
+
+def _as_list(values: Any) -> List[Any]:
+	return values.tolist() if hasattr(values, "tolist") else list(values)
@@ -1,39 +1,79 @@
-from typing import Dict, List, Tuple
+import random
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from .utils import sigmoid, standardize_column, apply_standardize
+from .backends import make_kernels, resolve_backend
+from .columnar import FeatureMatrix, Matrix, as_feature_matrix
+from .hashing import HashConfig, SparseOps, SparseRows
+from .optim import make_optimizer
+from .profiling import profiled, span
+from .utils import (
+	DEFAULT_SEED,
+	apply_standardize_inplace,
+	merge_moments,
+	moments,
+	set_global_seed,
+	sigmoid,
+	standardize_column,
+	std_from_moments,
+)
 
 
 class StandardScaler:
 	def __init__(self) -> None:
 		self.means: List[float] = []
 		self.stds: List[float] = []
+		# Running moments so the scaler can be fit incrementally (one streaming pass)
+		self.count = 0
+		self.m2: List[float] = []
 
-	def fit(self, X: List[List[float]]) -> None:
+	def reset(self) -> None:
+		self.means, self.stds, self.count, self.m2 = [], [], 0, []
+
+	def fit(self, X: Matrix) -> None:
+		self.reset()
 		if not X:
-			self.means, self.stds = [], []
 			return
-		n_features = len(X[0])
-		self.means = []
-		self.stds = []
-		for j in range(n_features):
-			col = [row[j] for row in X]
-			_, m, s = self.transform_single_column(col)
-			self.means.append(m)
-			self.stds.append(s)
+		self.partial_fit(X)
+
+	def partial_fit(self, X: Matrix) -> None:
+		Xc = as_feature_matrix(X)
+		if not Xc:
+			return
+		if self.m2 and self.count > 0 and len(self.m2) == Xc.n_features:
+			# Continue the running moments (lists: a loaded model's may be read-only views)
+			self.means, self.m2 = list(self.means), list(self.m2)
+		else:
+			# Fresh, or saved without M2: the stds cannot stand in for it, as a constant column's
+			# std is saved as 1
+			self.means = [0.0 for _ in Xc.columns]
+			self.m2 = [0.0 for _ in Xc.columns]
+			self.count = 0
+		for j, col in enumerate(Xc.columns):
+			_, self.means[j], self.m2[j] = merge_moments((self.count, self.means[j], self.m2[j]), moments(col))  # type: ignore[arg-type]
+		self.count += len(Xc)
+		self.stds = [std_from_moments(self.count, m2) for m2 in self.m2]
 
 	def transform_single_column(self, col: List[float]) -> Tuple[List[float], float, float]:
 		col_z, m, s = standardize_column(col)
 		return col_z, m, s
 
-	def transform(self, X: List[List[float]]) -> List[List[float]]:
+	@profiled("scaler.transform", rows=len)
+	def transform(self, X: Matrix, inplace: bool = False) -> Matrix:
 		if not X:
-			return []
+			return X if isinstance(X, FeatureMatrix) else []
 		if not self.means:
 			return X
-		Xz: List[List[float]] = []
-		for row in X:
-			Xz.append([apply_standardize([row[j]], self.means[j], self.stds[j])[0] for j in range(len(row))])
-		return Xz
+		if isinstance(X, FeatureMatrix):
+			Xz = X if inplace else X.copy()
+			for col, m, s in zip(Xz.columns, self.means, self.stds):
+				apply_standardize_inplace(col, m, s)  # type: ignore[arg-type]
+			return Xz
+		if inplace:
+			for row in X:
+				for j, (m, s) in enumerate(zip(self.means, self.stds)):
+					row[j] = (row[j] - m) / s if s != 0 else 0.0
+			return X
+		return [[(v - m) / s if s != 0 else 0.0 for v, m, s in zip(row, self.means, self.stds)] for row in X]
 
 
 def initialize_weights(n_features: int) -> List[float]:
@@ -41,6 +81,17 @@ def initialize_weights(n_features: int) -> List[float]:
 	return [0.0 for _ in range(n_features + 1)]
 
 
+def refold_weights(weights: Sequence[float], old_means: Sequence[float], old_stds: Sequence[float], new_means: Sequence[float], new_stds: Sequence[float]) -> List[float]:
+	# Same decision function b + sum w_j (x_j - m_j) / s_j, re-expressed for a new scaler:
+	# w'_j = w_j s'_j / s_j and b' = b + sum w_j (m'_j - m_j) / s_j. Hashed weights (after the
+	# dense ones) see unscaled inputs and are carried over unchanged.
+	w = list(weights)
+	for j, (wj, m, s, new_m, new_s) in enumerate(zip(weights[1:], old_means, old_stds, new_means, new_stds), start=1):
+		w[j] = wj * new_s / s
+		w[0] += wj * (new_m - m) / s
+	return w
+
+
 def predict_proba_row(weights: List[float], row: List[float]) -> float:
 	z = weights[0]  # bias
 	for j, x in enumerate(row, start=1):
@@ -48,61 +99,326 @@ def predict_proba_row(weights: List[float], row: List[float]) -> float:
 	return sigmoid(z)
 
 
-def predict_proba(weights: List[float], X: List[List[float]]) -> List[float]:
+def predict_proba(weights: List[float], X: Matrix, backend: str = "python", sparse: Optional[SparseRows] = None) -> List[float]:
+	# sparse: hashed columns of the same rows, scored by the weights after the dense ones
+	if sparse is not None:
+		Xc = as_feature_matrix(X)
+		if len(sparse) != len(Xc):
+			raise ValueError(f"Hashed rows ({len(sparse)}) do not match feature rows ({len(Xc)})")
+		if not Xc:
+			return []
+		n_dense = Xc.n_features + 1
+		offset = SparseOps(sparse).margins(weights, base=n_dense)
+		return make_kernels(backend, Xc).predict(list(weights[:n_dense]), offset)
+	if isinstance(X, FeatureMatrix):
+		if not X:
+			return []
+		return make_kernels(backend, X).predict(weights)
 	return [predict_proba_row(weights, row) for row in X]
 
 
+def _apply_step(opt: object, w: List[float], grad: List[float], b: int, n: int, l2: float) -> None:
+	# L2 regularization (excluding bias), scaled so the full-data objective is unchanged
+	for j in range(1, len(w)):
+		grad[j] += l2 * w[j] * (b / n)
+	# update
+	opt.step(w, [g / b for g in grad])  # type: ignore[attr-defined]
+
+
 def train_logistic_regression(
-	X: List[List[float]],
-	y: List[int],
+	X: Matrix,
+	y: Sequence[int],
 	lr: float = 0.1,
 	epochs: int = 200,
 	l2: float = 0.0,
+	backend: str = "python",
+	batch_size: int = 0,
+	optimizer: str = "gd",
+	seed: int = DEFAULT_SEED,
+	X_val: Optional[Matrix] = None,
+	y_val: Optional[Sequence[int]] = None,
+	patience: int = 0,
+	min_delta: float = 1e-4,
+	info: Optional[Dict[str, float]] = None,
+	initial_weights: Optional[Sequence[float]] = None,
+	sparse: Optional[SparseRows] = None,
+	sparse_val: Optional[SparseRows] = None,
+	n_buckets: int = 0,
 ) -> List[float]:
+	# batch_size <= 0 (or >= n) is full-batch; otherwise rows are reshuffled every epoch.
+	# With validation data and patience > 0, stops once val log-loss fails to improve by
+	# min_delta for `patience` epochs and returns the best weights seen.
+	# initial_weights (bias first) warm-starts from an earlier model instead of zeros.
+	# sparse adds hashed columns (n_buckets weights after the dense ones); each step only reads
+	# and updates the buckets present in its batch, with plain gradient steps.
 	if not X:
 		return []
-	n_features = len(X[0])
+	Xc = as_feature_matrix(X)
+	n_features = Xc.n_features
+	n = max(1, len(Xc))
+	kernels = make_kernels(backend, Xc, y)
+	val_kernels = make_kernels(backend, as_feature_matrix(X_val), y_val) if X_val is not None and len(X_val) else None
+	hashed = val_hashed = None
+	if sparse is not None:
+		if len(sparse) != len(Xc):
+			raise ValueError(f"Hashed rows ({len(sparse)}) do not match feature rows ({len(Xc)})")
+		if optimizer != "gd":
+			raise ValueError("Hashed columns are only supported with optimizer 'gd'")
+		hashed = SparseOps(sparse, resolve_backend(backend))
+		if val_kernels is not None:
+			val_hashed = SparseOps(sparse_val or SparseRows.empty_rows(len(X_val)), resolve_backend(backend))  # type: ignore[arg-type]
+	else:
+		n_buckets = 0
+	if batch_size <= 0 or batch_size >= n:
+		batch_size = n
+	order = list(range(n))
+	if batch_size < n:
+		set_global_seed(seed)
+	n_params = n_features + 1 + n_buckets
+	if initial_weights is not None and len(initial_weights) != n_params:
+		raise ValueError(f"initial_weights has {len(initial_weights)} values, expected {n_params}")
+	w0 = list(initial_weights) if initial_weights is not None else initialize_weights(n_params - 1)
+	w = w0[:n_features + 1]
+	wh = hashed.weights(w0[n_features + 1:]) if hashed is not None else []
+	opt = make_optimizer(optimizer, lr, n_features + 1)
+
+	def loss(k: object, h: Optional[SparseOps]) -> float:
+		return k.loss(w, h.margins(wh) if h is not None else None)  # type: ignore[attr-defined]
+
+	to_list = hashed.to_list if hashed is not None else list
+	best_w, best_wh = list(w), to_list(wh)
+	best_loss = float("inf")
+	best_epoch = 0
+	wait = 0
+	epochs_run = 0
+	for epoch in range(1, epochs + 1):
+		with span("train.epoch", rows=n):
+			if batch_size < n:
+				random.shuffle(order)
+				kernels.permute(order)
+				if hashed is not None:
+					hashed.permute(order)
+			for start in range(0, n, batch_size):
+				stop = min(n, start + batch_size)
+				b = stop - start
+				# gradients: bias + weights
+				if hashed is None:
+					grad = kernels.gradient(w, start, stop if stop < n else None)
+				else:
+					err = kernels.errors(w, start, stop if stop < n else None, hashed.margins(wh, start, stop))
+					grad = kernels.error_gradient(err, start, stop if stop < n else None)
+					hashed.step(wh, err, start, stop, lr, n, l2)
+				_apply_step(opt, w, grad, b, n, l2)
+			epochs_run = epoch
+		if val_kernels is not None:
+			val_loss = loss(val_kernels, val_hashed)
+			if val_loss < best_loss - min_delta:
+				best_loss, best_w, best_wh, best_epoch, wait = val_loss, list(w), to_list(wh), epoch, 0
+			else:
+				wait += 1
+				if patience > 0 and wait >= patience:
+					break
+	if val_kernels is not None and patience > 0:
+		w = best_w
+		wh = hashed.weights(best_wh) if hashed is not None else []
+	if info is not None:
+		info["epochs_run"] = epochs_run
+		info["train_loss"] = loss(kernels, hashed)
+		if val_kernels is not None:
+			info["best_epoch"] = best_epoch
+			info["val_loss"] = loss(val_kernels, val_hashed)
+			info["stopped_early"] = float(epochs_run < epochs)
+	return w + to_list(wh)
+
+
+def train_logistic_regression_stream(
+	chunks: Callable[[], Iterable[Tuple[FeatureMatrix, Sequence[int]]]],
+	n_rows: int,
+	n_features: int,
+	lr: float = 0.1,
+	epochs: int = 200,
+	l2: float = 0.0,
+	backend: str = "python",
+	batch_size: int = 0,
+	optimizer: str = "gd",
+	seed: int = DEFAULT_SEED,
+	info: Optional[Dict[str, float]] = None,
+) -> List[float]:
+	# Out-of-core variant: chunks() re-streams standardized (X, y) chunks for every epoch, so
+	# memory is O(chunk). Full-batch mode sums chunk gradients before one update and matches the
+	# in-memory result; mini-batches are shuffled within each chunk only.
+	n = max(1, n_rows)
 	w = initialize_weights(n_features)
+	opt = make_optimizer(optimizer, lr, n_features + 1)
+	if batch_size > 0:
+		set_global_seed(seed)
 	for _ in range(epochs):
-		# gradients: bias + weights
-		grad = [0.0 for _ in range(n_features + 1)]
-		for row, t in zip(X, y):
-			p = predict_proba_row(w, row)
-			err = p - t
-			grad[0] += err
-			for j, x in enumerate(row, start=1):
-				grad[j] += err * x
-		# L2 regularization (excluding bias)
-		for j in range(1, n_features + 1):
-			grad[j] += l2 * w[j]
-		# update
-		for j in range(n_features + 1):
-			w[j] -= lr * (grad[j] / max(1, len(X)))
+		with span("train.epoch", rows=n_rows):
+			total = [0.0 for _ in range(n_features + 1)]
+			for X, y in chunks():
+				kernels = make_kernels(backend, X, y)
+				m = len(X)
+				if batch_size <= 0:
+					total = [a + g for a, g in zip(total, kernels.gradient(w))]
+					continue
+				order = list(range(m))
+				random.shuffle(order)
+				kernels.permute(order)
+				for start in range(0, m, batch_size):
+					stop = min(m, start + batch_size)
+					_apply_step(opt, w, kernels.gradient(w, start, stop if stop < m else None), stop - start, n, l2)
+			if batch_size <= 0:
+				_apply_step(opt, w, total, n, n, l2)
+	if info is not None:
+		info["epochs_run"] = epochs
+		info["train_loss"] = sum(make_kernels(backend, X, y).loss(w) * len(X) for X, y in chunks()) / n
 	return w
 
 
 class IdeaRankerModel:
-	def __init__(self) -> None:
+	def __init__(self, backend: str = "auto") -> None:
+		# backend: "auto" uses numpy when importable, else the pure-Python kernels
 		self.scaler = StandardScaler()
 		self.weights: List[float] = []
 		self.metadata: Dict[str, str] = {}
+		self.backend = backend
+		# Hashed categorical columns (see hashing.py); their weights follow the dense ones
+		self.hashing: Optional[HashConfig] = None
+
+	def _hashed(self, sparse: Optional[SparseRows], what: str = "X") -> Dict[str, object]:
+		# Training kwargs for the hashed columns; a hashed model needs their rows and vice versa
+		if self.hashing is None:
+			if sparse is not None:
+				raise ValueError("Hashed rows given but the model has no hash config")
+			return {}
+		if sparse is None:
+			raise ValueError(f"Model hashes {', '.join(self.hashing.names)}; pass their rows for {what} (sparse=...)")
+		return {"sparse": sparse, "n_buckets": self.hashing.n_buckets}
+
+	def fit(
+		self,
+		X: Matrix,
+		y: Sequence[int],
+		lr: float = 0.1,
+		epochs: int = 200,
+		l2: float = 0.0,
+		copy: bool = True,
+		X_val: Optional[Matrix] = None,
+		y_val: Optional[Sequence[int]] = None,
+		sparse: Optional[SparseRows] = None,
+		sparse_val: Optional[SparseRows] = None,
+		**train_options: object,
+	) -> None:
+		# copy=False standardizes a FeatureMatrix in place; callers must not reuse X afterwards.
+		# train_options: batch_size, optimizer, seed, patience, min_delta (see train_logistic_regression)
+		# sparse / sparse_val: hashed columns of X / X_val when self.hashing is set
+		hashed = self._hashed(sparse)
+		owned = not isinstance(X, FeatureMatrix)
+		Xc = as_feature_matrix(X)
+		self.scaler.fit(Xc)
+		Xz = self.scaler.transform(Xc, inplace=owned or not copy)
+		Xz_val = self.scaler.transform(as_feature_matrix(X_val)) if X_val is not None else None
+		info: Dict[str, float] = {}
+		self.weights = train_logistic_regression(
+			Xz, y, lr=lr, epochs=epochs, l2=l2, backend=self.backend,
+			X_val=Xz_val, y_val=y_val, info=info, sparse_val=sparse_val, **hashed, **train_options,  # type: ignore[arg-type]
+		)
+		self.metadata.update({k: str(v) for k, v in train_options.items()})
+		self.metadata.update({k: f"{v:.6g}" for k, v in info.items()})
+
+	def partial_fit(
+		self,
+		X: Matrix,
+		y: Sequence[int],
+		lr: float = 0.1,
+		epochs: int = 20,
+		l2: float = 0.0,
+		copy: bool = True,
+		X_val: Optional[Matrix] = None,
+		y_val: Optional[Sequence[int]] = None,
+		sparse: Optional[SparseRows] = None,
+		sparse_val: Optional[SparseRows] = None,
+		**train_options: object,
+	) -> None:
+		# Warm start from the current weights on a new batch only: X is merged into the scaler's
+		# running moments, the weights are refolded for the updated scaler (so predictions are
+		# unchanged before the first step), then `epochs` passes are taken over X. An unfitted
+		# model falls back to fit().
+		if not self.weights or not self.scaler.means:
+			self.fit(X, y, lr=lr, epochs=epochs, l2=l2, copy=copy, X_val=X_val, y_val=y_val, sparse=sparse, sparse_val=sparse_val, **train_options)
+			return
+		hashed = self._hashed(sparse)
+		owned = not isinstance(X, FeatureMatrix)
+		Xc = as_feature_matrix(X)
+		if Xc.n_features != len(self.scaler.means):
+			raise ValueError(f"Batch has {Xc.n_features} features, model has {len(self.scaler.means)}")
+		old_means, old_stds = list(self.scaler.means), list(self.scaler.stds)
+		self.scaler.partial_fit(Xc)
+		w0 = refold_weights(self.weights, old_means, old_stds, self.scaler.means, self.scaler.stds)
+		Xz = self.scaler.transform(Xc, inplace=owned or not copy)
+		Xz_val = self.scaler.transform(as_feature_matrix(X_val)) if X_val is not None else None
+		info: Dict[str, float] = {}
+		self.weights = train_logistic_regression(
+			Xz, y, lr=lr, epochs=epochs, l2=l2, backend=self.backend,
+			X_val=Xz_val, y_val=y_val, info=info, initial_weights=w0, sparse_val=sparse_val, **hashed, **train_options,  # type: ignore[arg-type]
+		)
+		self.metadata.update({k: str(v) for k, v in train_options.items()})
+		self.metadata.update({k: f"{v:.6g}" for k, v in info.items()})
+		self.metadata["partial_fits"] = str(int(self.metadata.get("partial_fits", "0")) + 1)
+
+	def fit_stream(
+		self,
+		chunks: Callable[[], Iterable[Tuple[FeatureMatrix, Sequence[int]]]],
+		lr: float = 0.1,
+		epochs: int = 200,
+		l2: float = 0.0,
+		**train_options: object,
+	) -> None:
+		# chunks() must return a fresh iterator of raw (X, y) chunks each call (e.g. data.iter_feature_chunks).
+		# Pass 1 fits the scaler from running moments; each epoch then re-streams and standardizes in place.
+		if self.hashing is not None:
+			raise ValueError("Streaming training does not support hashed columns")
+		self.scaler.reset()
+		for X, _ in chunks():
+			self.scaler.partial_fit(X)
+
+		def standardized() -> Iterable[Tuple[FeatureMatrix, Sequence[int]]]:
+			for X, y in chunks():
+				yield self.scaler.transform(X, inplace=True), y  # type: ignore[misc]
+
+		info: Dict[str, float] = {}
+		self.weights = train_logistic_regression_stream(
+			standardized, self.scaler.count, len(self.scaler.means), lr=lr, epochs=epochs, l2=l2,
+			backend=self.backend, info=info, **train_options,  # type: ignore[arg-type]
+		)
+		self.metadata.update({k: str(v) for k, v in train_options.items()})
+		self.metadata.update({k: f"{v:.6g}" for k, v in info.items()})
 
-	def fit(self, X: List[List[float]], y: List[int], lr: float = 0.1, epochs: int = 200, l2: float = 0.0) -> None:
-		self.scaler.fit(X)
-		Xz = self.scaler.transform(X)
-		self.weights = train_logistic_regression(Xz, y, lr=lr, epochs=epochs, l2=l2)
+	@profiled("predict_proba", rows=len)
+	def predict_proba(self, X: Matrix, copy: bool = True, sparse: Optional[SparseRows] = None) -> List[float]:
+		self._hashed(sparse)
+		owned = not isinstance(X, FeatureMatrix)
+		Xc = as_feature_matrix(X)
+		Xz = self.scaler.transform(Xc, inplace=owned or not copy)
+		return predict_proba(self.weights, Xz, backend=self.backend, sparse=sparse)
 
-	def predict_proba(self, X: List[List[float]]) -> List[float]:
-		Xz = self.scaler.transform(X)
-		return predict_proba(self.weights, Xz)
+	def hash_rows(self, rows: Iterable[Dict[str, object]]) -> Optional[SparseRows]:
+		# Hashed columns of dict rows (CSV, JSON, DataFrame records); None for a model without them
+		return self.hashing.encode_dicts(rows) if self.hashing is not None else None
 
 	def to_dict(self) -> Dict[str, object]:
-		return {
-			"weights": self.weights,
-			"scaler_means": self.scaler.means,
-			"scaler_stds": self.scaler.stds,
+		# list() so models loaded from a memory-mapped binary file serialize like any other
+		payload: Dict[str, object] = {
+			"weights": list(self.weights),
+			"scaler_means": list(self.scaler.means),
+			"scaler_stds": list(self.scaler.stds),
+			"scaler_count": self.scaler.count,
+			"scaler_m2": list(self.scaler.m2),
 			"metadata": self.metadata,
 		}
+		if self.hashing is not None:
+			payload["hashing"] = self.hashing.to_dict()
+		return payload
 
 	@classmethod
 	def from_dict(cls, payload: Dict[str, object]) -> "IdeaRankerModel":
@@ -110,5 +426,10 @@ class IdeaRankerModel:
 		m.weights = list(payload.get("weights", []))  # type: ignore[arg-type]
 		m.scaler.means = list(payload.get("scaler_means", []))  # type: ignore[arg-type]
 		m.scaler.stds = list(payload.get("scaler_stds", []))  # type: ignore[arg-type]
+		# Absent from models saved before warm starts; without M2, partial_fit restarts the moments
+		m.scaler.count = int(payload.get("scaler_count", 0))  # type: ignore[call-overload]
+		m.scaler.m2 = list(payload.get("scaler_m2", []))  # type: ignore[arg-type]
 		m.metadata = dict(payload.get("metadata", {}))  # type: ignore[arg-type]
+		if payload.get("hashing"):
+			m.hashing = HashConfig.from_dict(payload["hashing"])  # type: ignore[arg-type]
 		return m
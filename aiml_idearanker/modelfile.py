@@ -0,0 +1,154 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Sequence
+
+from .hashing import HashConfig
+from .model import IdeaRankerModel
+from .profiling import profiled
+from .utils import ensure_dir, load_json, save_json
+
+
+# Binary model container, written for a ".bin" path or with format="binary" (JSON otherwise):
+#   header (64 bytes, little-endian): magic, version, flags, n_weights, n_features, metadata length,
+#     scaler sample count, sha256 of everything after the header
+#   weights, scaler means, scaler stds as float64 arrays (8-byte aligned), then metadata as UTF-8 JSON
+# load_model maps the file read-only and the model's arrays are memoryviews into the mapping, so
+# loading copies nothing and only touches the pages that are used. JSON stays the default format
+# and IdeaRankerModel.to_dict / from_dict keep working for both.
+# Version 2 adds optional sections, each marked by a flag: FLAG_HASHING stores {"metadata": ...,
+# "hashing": ...} as the trailing JSON, and FLAG_MOMENTS stores the scaler's running M2 (one float64
+# per feature, after the stds) so warm starts continue the exact moments. A model with neither is
+# still written as version 1; version-1 readers refuse the others instead of misreading them.
+
+MAGIC = b"IRMB"
+VERSION = 2
+FLAG_HASHING = 1
+FLAG_MOMENTS = 2
+HEADER = struct.Struct("<4sHHIIIxxxxQ32s")
+BINARY_SUFFIX = ".bin"
+MODEL_FORMATS = ["auto", "json", "binary"]
+
+
+def is_binary(path: str) -> bool:
+	with open(path, "rb") as f:
+		return f.read(len(MAGIC)) == MAGIC
+
+
+def _f64_bytes(values: Sequence[float]) -> bytes:
+	arr = array("d", values)
+	if sys.byteorder != "little":
+		arr.byteswap()
+	return arr.tobytes()
+
+
+def _f64_view(buf: memoryview, offset: int, n: int) -> Sequence[float]:
+	raw = buf[offset:offset + 8 * n]
+	if sys.byteorder == "little":
+		return raw.cast("d")
+	arr = array("d", raw.tobytes())
+	arr.byteswap()
+	return arr
+
+
+@profiled("write_model")
+def save_binary(path: str, model: IdeaRankerModel) -> None:
+	means, stds = model.scaler.means, model.scaler.stds
+	if len(means) != len(stds):
+		raise ValueError(f"Scaler has {len(means)} means but {len(stds)} stds")
+	flags, trailer, sections = 0, model.metadata, [_f64_bytes(model.weights), _f64_bytes(means), _f64_bytes(stds)]
+	m2 = model.scaler.m2
+	if m2:
+		if len(m2) != len(means):
+			raise ValueError(f"Scaler has {len(means)} means but {len(m2)} moments")
+		flags |= FLAG_MOMENTS
+		sections.append(_f64_bytes(m2))
+	if model.hashing is not None:
+		flags |= FLAG_HASHING
+		trailer = {"metadata": model.metadata, "hashing": model.hashing.to_dict()}
+	meta = json.dumps(trailer, sort_keys=True, separators=(",", ":")).encode("utf-8")
+	version = 2 if flags else 1
+	body = b"".join(sections + [meta])
+	header = HEADER.pack(MAGIC, version, flags, len(model.weights), len(means), len(meta), model.scaler.count, hashlib.sha256(body).digest())
+	dirname = os.path.dirname(path)
+	if dirname:
+		ensure_dir(dirname)
+	# Write-then-rename: processes that still map the old file keep reading the old inode
+	tmp = path + ".tmp"
+	with open(tmp, "wb") as f:
+		f.write(header)
+		f.write(body)
+	os.replace(tmp, path)
+
+
+def from_buffer(buf: memoryview, name: str = "<buffer>", verify: bool = True) -> IdeaRankerModel:
+	# The model's arrays are views into buf (no copy); verify=False skips hashing the body
+	size = len(buf)
+	if size < HEADER.size:
+		raise ValueError(f"{name}: truncated model file ({size} bytes)")
+	magic, version, flags, n_weights, n_features, meta_len, count, checksum = HEADER.unpack_from(buf)
+	if magic != MAGIC:
+		raise ValueError(f"{name}: not a binary model file")
+	if version > VERSION:
+		raise ValueError(f"{name}: model format version {version} is newer than supported ({VERSION})")
+	n_arrays = 3 if flags & FLAG_MOMENTS else 2
+	expected = HEADER.size + 8 * (n_weights + n_arrays * n_features) + meta_len
+	if size != expected:
+		raise ValueError(f"{name}: expected {expected} bytes, found {size} (truncated or corrupt)")
+	if verify and hashlib.sha256(buf[HEADER.size:]).digest() != checksum:
+		raise ValueError(f"{name}: checksum mismatch (corrupt model file)")
+	offset = HEADER.size
+	m = IdeaRankerModel()
+	m.weights = _f64_view(buf, offset, n_weights)  # type: ignore[assignment]
+	offset += 8 * n_weights
+	m.scaler.means = _f64_view(buf, offset, n_features)  # type: ignore[assignment]
+	offset += 8 * n_features
+	m.scaler.stds = _f64_view(buf, offset, n_features)  # type: ignore[assignment]
+	offset += 8 * n_features
+	if flags & FLAG_MOMENTS:
+		m.scaler.m2 = _f64_view(buf, offset, n_features)  # type: ignore[assignment]
+		offset += 8 * n_features
+	m.scaler.count = count
+	trailer = json.loads(bytes(buf[offset:offset + meta_len]).decode("utf-8"))
+	if flags & FLAG_HASHING:
+		m.hashing = HashConfig.from_dict(trailer["hashing"])
+		trailer = trailer["metadata"]
+	m.metadata = dict(trailer)
+	return m
+
+
+def load_binary(path: str, verify: bool = True) -> IdeaRankerModel:
+	with open(path, "rb") as f:
+		if os.fstat(f.fileno()).st_size == 0:
+			raise ValueError(f"{path}: empty model file")
+		# The mapping stays alive as long as the model's memoryviews reference it
+		mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+	return from_buffer(memoryview(mm), path, verify)
+
+
+def from_bytes(data: bytes) -> IdeaRankerModel:
+	# Either format, e.g. an uploaded file's contents
+	if data[:len(MAGIC)] == MAGIC:
+		return from_buffer(memoryview(data))
+	return IdeaRankerModel.from_dict(json.loads(data.decode("utf-8")))
+
+
+def save_model(path: str, model: IdeaRankerModel, fmt: str = "auto") -> None:
+	# "auto" writes the binary format only for a ".bin" path, so other names stay JSON
+	if fmt not in MODEL_FORMATS:
+		raise ValueError(f"Unknown model format '{fmt}'. Choose from: {', '.join(MODEL_FORMATS)}")
+	if fmt == "binary" or (fmt == "auto" and path.lower().endswith(BINARY_SUFFIX)):
+		save_binary(path, model)
+	else:
+		save_json(path, model.to_dict())
+
+
+def load_model(path: str, verify: bool = True) -> IdeaRankerModel:
+	# Detects the format from the file's first bytes, so either format works under any name
+	if is_binary(path):
+		return load_binary(path, verify=verify)
+	return IdeaRankerModel.from_dict(load_json(path))
@@ -0,0 +1,58 @@
+import math
+from typing import Callable, Dict, List
+
+
+# Parameter-update rules. grad is already averaged over the batch (and includes the L2 term).
+
+class GradientDescent:
+	def __init__(self, lr: float, n_params: int) -> None:
+		self.lr = lr
+
+	def step(self, w: List[float], grad: List[float]) -> None:
+		for j, g in enumerate(grad):
+			w[j] -= self.lr * g
+
+
+class Momentum:
+	def __init__(self, lr: float, n_params: int, beta: float = 0.9) -> None:
+		self.lr = lr
+		self.beta = beta
+		self.velocity = [0.0 for _ in range(n_params)]
+
+	def step(self, w: List[float], grad: List[float]) -> None:
+		for j, g in enumerate(grad):
+			self.velocity[j] = self.beta * self.velocity[j] + g
+			w[j] -= self.lr * self.velocity[j]
+
+
+class Adam:
+	def __init__(self, lr: float, n_params: int, beta1: float = 0.9, beta2: float = 0.999, eps: float = 1e-8) -> None:
+		self.lr = lr
+		self.beta1 = beta1
+		self.beta2 = beta2
+		self.eps = eps
+		self.m = [0.0 for _ in range(n_params)]
+		self.v = [0.0 for _ in range(n_params)]
+		self.t = 0
+
+	def step(self, w: List[float], grad: List[float]) -> None:
+		self.t += 1
+		c1 = 1.0 - self.beta1 ** self.t
+		c2 = 1.0 - self.beta2 ** self.t
+		for j, g in enumerate(grad):
+			self.m[j] = self.beta1 * self.m[j] + (1.0 - self.beta1) * g
+			self.v[j] = self.beta2 * self.v[j] + (1.0 - self.beta2) * g * g
+			w[j] -= self.lr * (self.m[j] / c1) / (math.sqrt(self.v[j] / c2) + self.eps)
+
+
+OPTIMIZERS: Dict[str, Callable[..., object]] = {
+	"gd": GradientDescent,
+	"momentum": Momentum,
+	"adam": Adam,
+}
+
+
+def make_optimizer(name: str, lr: float, n_params: int) -> object:
+	if name not in OPTIMIZERS:
+		raise ValueError(f"Unknown optimizer '{name}'. Choose from: {', '.join(sorted(OPTIMIZERS))}")
+	return OPTIMIZERS[name](lr, n_params)
@@ -0,0 +1,269 @@
+import argparse
+import csv
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .backends import resolve_backend
+from .columnar import FeatureMatrix
+from .data import build_features, to_float, train_val_split
+from .hashing import HashConfig, SparseRows
+from .metrics import best_threshold, evaluate_probs, threshold_table
+from .model import IdeaRankerModel
+from .pricing import optimize_revenue_batch
+from .profiling import profiled, span
+from .scorer import Scorer
+from .utils import DEFAULT_SEED
+
+
+# In-process pipeline: stages exchange column-oriented Records instead of re-reading each other's
+# CSVs, every derived column is computed once, and files are written only by optional sinks.
+
+PRICE_COLUMNS = ["best_price", "expected_revenue", "expected_profit"]
+# Metadata written by a fit (training info) or tuned for its weights (train_model's threshold)
+FIT_RESULT_KEYS = ["epochs_run", "train_loss", "best_epoch", "val_loss", "stopped_early", "threshold", "threshold_metric"]
+
+
+class Records:
+	# Column-oriented batch of records: one list per named column, all the same length.
+	def __init__(self, columns: Optional[Dict[str, List[Any]]] = None) -> None:
+		self.columns: Dict[str, List[Any]] = {}
+		for name, values in (columns or {}).items():
+			self.add(name, values)
+
+	def __len__(self) -> int:
+		return len(next(iter(self.columns.values()))) if self.columns else 0
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.columns
+
+	def __getitem__(self, name: str) -> List[Any]:
+		return self.columns[name]
+
+	@property
+	def names(self) -> List[str]:
+		return list(self.columns)
+
+	def add(self, name: str, values: Sequence[Any]) -> None:
+		if self.columns and len(values) != len(self):
+			raise ValueError(f"Column '{name}' has {len(values)} values, expected {len(self)}")
+		self.columns[name] = list(values)
+
+	def to_dict(self) -> Dict[str, List[Any]]:
+		return dict(self.columns)
+
+	@classmethod
+	def from_dict(cls, payload: Dict[str, List[Any]]) -> "Records":
+		return cls(payload)
+
+	@classmethod
+	def from_csv(cls, path: str, columns: Dict[str, Callable[[str], Any]]) -> "Records":
+		# columns: name -> parser applied to each cell (missing/empty cells are passed as "0")
+		values: Dict[str, List[Any]] = {name: [] for name in columns}
+		with open(path, "r", encoding="utf-8", newline="") as f:
+			for row in csv.DictReader(f):
+				for name, parse in columns.items():
+					values[name].append(parse(row.get(name, "0") or "0"))
+		return cls(values)
+
+	def write_csv(self, path: str, formats: Dict[str, Callable[[Any], object]]) -> None:
+		# formats: output column -> formatter, in output order
+		names = list(formats)
+		cols = [self.columns[name] for name in names]
+		fmts = [formats[name] for name in names]
+		with span("write_csv", rows=len(self)), open(path, "w", encoding="utf-8", newline="") as f:
+			writer = csv.writer(f)
+			writer.writerow(names)
+			writer.writerows([fmt(v) for fmt, v in zip(fmts, vals)] for vals in zip(*cols))
+
+
+def fmt_prob(v: float) -> str:
+	return f"{v:.6f}"
+
+
+def fmt_money(v: float) -> str:
+	return f"{v:.2f}"
+
+
+def fmt_count(v: float) -> str:
+	return str(int(v)) if float(v).is_integer() else repr(v)
+
+
+class StageTimer:
+	# Collects (stage, seconds, rows, cached) for a per-stage timing breakdown.
+	def __init__(self) -> None:
+		self.stages: List[Tuple[str, float, int, bool]] = []
+
+	@contextmanager
+	def stage(self, name: str) -> Iterator[Dict[str, int]]:
+		# The body may set info["rows"] to report how many records the stage handled and
+		# info["cached"] = 1 when its output came from the stage cache.
+		info = {"rows": 0, "cached": 0}
+		t0 = time.perf_counter()
+		try:
+			yield info
+		finally:
+			self.stages.append((name, time.perf_counter() - t0, info["rows"], bool(info["cached"])))
+
+	def report(self) -> str:
+		total = sum(s for _, s, _, _ in self.stages)
+		lines = [f"{'stage':<10} {'seconds':>9} {'rows':>9} {'share':>6}"]
+		for name, seconds, rows, cached in self.stages:
+			share = seconds / total if total > 0 else 0.0
+			lines.append(f"{name:<10} {seconds:>9.3f} {rows:>9} {share:>6.1%}" + ("  (cached)" if cached else ""))
+		lines.append(f"{'total':<10} {total:>9.3f}")
+		return "\n".join(lines)
+
+
+def train_model(
+	X: FeatureMatrix,
+	y: Sequence[int],
+	args: argparse.Namespace,
+	base: Optional[IdeaRankerModel] = None,
+	sparse: Optional[SparseRows] = None,
+	hashing: Optional[HashConfig] = None,
+) -> IdeaRankerModel:
+	# In-memory training stage shared by cli_train and cli_app; prints train (and val) metrics.
+	# X, y as returned by data.read_features (or build_features of parsed rows).
+	# With base, the model is updated in place from X only (IdeaRankerModel.partial_fit).
+	# sparse: hashed columns of X, encoded with hashing (or base.hashing).
+	val_ratio = getattr(args, "val_ratio", 0.0)
+	seed = getattr(args, "seed", DEFAULT_SEED)
+	X_val = y_val = sparse_val = None
+	if val_ratio > 0:
+		if sparse is not None:
+			# Same seed, same shuffle: the hashed rows split exactly like X
+			sparse, _, sparse_val, _ = train_val_split(sparse, y, val_ratio=val_ratio, seed=seed)  # type: ignore[assignment]
+		X, y, X_val, y_val = train_val_split(X, y, val_ratio=val_ratio, seed=seed)
+	model = base if base is not None else IdeaRankerModel()
+	if base is None:
+		model.hashing = hashing
+	model.backend = resolve_backend(getattr(args, "backend", "auto"))
+	settings = {
+		"learning_rate": str(args.lr),
+		"epochs": str(args.epochs),
+		"l2": str(args.l2),
+		"data": args.data,
+		"backend": model.backend,
+		"val_ratio": str(val_ratio),
+	}
+	if base is None:
+		model.metadata = settings
+	else:
+		# Results of the base model's fit describe its old weights, not this update's
+		for key in FIT_RESULT_KEYS:
+			model.metadata.pop(key, None)
+		model.metadata.update(settings)
+	fit = model.fit if base is None else model.partial_fit
+	fit(
+		X, y, lr=args.lr, epochs=args.epochs, l2=args.l2, X_val=X_val, y_val=y_val,
+		batch_size=getattr(args, "batch_size", 0),
+		optimizer=getattr(args, "optimizer", "gd"),
+		seed=seed,
+		patience=getattr(args, "patience", 0),
+		min_delta=getattr(args, "min_delta", 1e-4),
+		sparse=sparse, sparse_val=sparse_val,
+	)
+	splits = [("Train", X, y, sparse)] + ([("Val", X_val, y_val, sparse_val)] if X_val is not None else [])
+	scored = [(name, ys, model.predict_proba(Xs, copy=False, sparse=Ss)) for name, Xs, ys, Ss in splits]
+	threshold = args.threshold
+	optimize = getattr(args, "optimize_threshold", None)
+	if optimize:
+		# Tuned on the validation split when there is one, else on the training data
+		tune_name, tune_y, tune_probs = scored[-1]
+		threshold, _ = best_threshold(threshold_table(tune_y, tune_probs), optimize)
+		# repr: the above-max threshold of best_threshold must not round down onto a probability
+		model.metadata["threshold"] = repr(threshold)
+		model.metadata["threshold_metric"] = optimize
+		print(f"Threshold: {threshold:.4f} (best {optimize} on {tune_name.lower()} split)")
+	for name, ys, probs in scored:
+		m = evaluate_probs(ys, probs, threshold)
+		print(f"{name} metrics | acc={m['accuracy']:.3f} p={m['precision']:.3f} r={m['recall']:.3f} f1={m['f1']:.3f} auc={m['auc']:.3f} log_loss={m['log_loss']:.4f}")
+	if "epochs_run" in model.metadata:
+		print(f"Epochs run: {model.metadata['epochs_run']} (val_loss={model.metadata.get('val_loss', 'n/a')})")
+	return model
+
+
+def score(model: Scorer, rows: List[Dict[str, str]]) -> Records:
+	# prob_success is kept at the 6 decimals the predictions artifact publishes, so prices computed
+	# in-process match those computed from the CSV by the file-based stages.
+	X, _ = build_features(rows)
+	probs = model.predict_proba(X, copy=False, sparse=model.hash_rows(rows))
+	return Records({
+		"prob_success": [round(p, 6) for p in probs],
+		"projected_users": [to_float(r, "projected_users") for r in rows],
+	})
+
+
+def price(records: Records, unit_cost: float, curve: str = "linear", objective: str = "revenue", method: str = "analytic") -> Records:
+	# Adds best_price / expected_revenue / expected_profit once; later stages only read them.
+	res = optimize_revenue_batch(
+		records["prob_success"], records["projected_users"], unit_cost=unit_cost,
+		curve=curve, objective=objective, method=method,
+	)
+	for name in PRICE_COLUMNS:
+		records.add(name, res[name])
+	return records
+
+
+def summarize(probabilities: List[float]) -> Tuple[float, float, float]:
+	if not probabilities:
+		return 0.0, 0.0, 0.0
+	pmin = min(probabilities)
+	pmax = max(probabilities)
+	pavg = sum(probabilities) / len(probabilities)
+	return pmin, pmax, pavg
+
+
+def product_brief(records: Records, unit_cost: float) -> str:
+	probs: List[float] = records["prob_success"]
+	pmin, pmax, pavg = summarize(probs)
+	rev_total = sum(records["expected_revenue"])
+	profit_total = sum(records["expected_profit"])
+	return "".join([
+		"IdeaRanker Product Brief\n",
+		"=======================\n\n",
+		f"Ideas scored: {len(probs)}\n",
+		f"Success probability: min={pmin:.3f} avg={pavg:.3f} max={pmax:.3f}\n",
+		f"Total expected revenue (naive curve): ${rev_total:,.2f}\n",
+		f"Total expected profit (unit_cost={unit_cost}): ${profit_total:,.2f}\n\n",
+		# Recommendation heuristics
+		"Recommendations\n",
+		"- Prioritize ideas with prob_success >= 0.7\n",
+		"- Deprioritize ideas with development time > 16 weeks unless prob_success >= 0.85\n",
+		"- Use best_price as a starting point; validate with A/B tests and user research\n",
+	])
+
+
+# Sinks: artifact writers in the formats the file-based CLIs have always produced
+
+def write_predictions(path: str, records: Records, id_column: Optional[str] = None) -> None:
+	# With id_column (present in records), the id is written first so cli_merge can join on it
+	formats: Dict[str, Callable[[Any], object]] = {id_column: str} if id_column else {}
+	formats["prob_success"] = fmt_prob
+	records.write_csv(path, formats)
+
+
+def write_pricing_input(path: str, records: Records) -> None:
+	records.write_csv(path, {"prob_success": fmt_prob, "projected_users": fmt_count})
+
+
+def write_pricing(path: str, records: Records) -> None:
+	records.write_csv(path, {
+		"prob_success": fmt_prob,
+		"projected_users": lambda u: int(u),
+		"best_price": fmt_money,
+		"expected_revenue": fmt_money,
+		"expected_profit": fmt_money,
+	})
+
+
+@profiled("write_text")
+def write_text(path: str, text: str) -> None:
+	with open(path, "w", encoding="utf-8") as f:
+		f.write(text)
+
+
+def read_pricing_input(path: str) -> Records:
+	# CSV with prob_success and projected_users (the merge stage's output)
+	return Records.from_csv(path, {"prob_success": float, "projected_users": float})
@@ -0,0 +1,259 @@
+import math
+from itertools import repeat
+from operator import add, gt
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Portfolio selection: pick ideas maximizing total value subject to a weeks budget (and optionally a
+# headcount budget). Exact 0/1 knapsack via a rolling 1-D DP with bit-packed choice rows, plus
+# greedy and branch-and-bound modes for inputs where an O(n*W) table is too large, and an FPTAS
+# whose table size depends on n and eps rather than W.
+
+METHODS = ["auto", "dp", "greedy", "bnb", "fptas"]
+DP_CELL_BUDGET = 50_000_000  # n * (W+1) [* (H+1)] above which "auto" stops using the exact DP
+
+_BITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def _pack(taken: List[bool]) -> int:
+	# taken[k] -> bit k of a Python int (1 bit per cell instead of a boxed float)
+	if not any(taken):
+		return 0
+	return int(bytes(taken[::-1]).translate(_BITS), 2)
+
+
+def _prune(weights: Sequence[int], heads: Sequence[int], values: Sequence[float], capacity: int, head_capacity: int) -> List[int]:
+	# Exact reduction: an optimal solution never takes more than min(W // wt, H // hc) items of one
+	# (weeks, headcount) class, and if it takes k of them they can be the k most valuable. Ideas are
+	# mostly a few weeks long, so this shrinks n from the number of ideas to roughly W * ln(max weeks).
+	groups: Dict[Tuple[int, int], List[int]] = {}
+	for i, (wt, hc, val) in enumerate(zip(weights, heads, values)):
+		if val > 0 and wt <= capacity and hc <= head_capacity:
+			groups.setdefault((wt, hc), []).append(i)
+	keep: List[int] = []
+	for (wt, hc), idx in groups.items():
+		limit = min(capacity // wt if wt else len(idx), head_capacity // hc if hc else len(idx))
+		if len(idx) > limit:
+			idx = sorted(idx, key=lambda i: -values[i])[:limit]
+		keep.extend(idx)
+	keep.sort()
+	return keep
+
+
+def _dp(weights: Sequence[int], values: Sequence[float], capacity: int) -> List[int]:
+	# dp[w] = best value with total weight <= w, rolled over items. choice[i] bit w is set when item i
+	# strictly improves dp[w], which reproduces the reconstruction of the dense (n+1) x (W+1) table.
+	dp = [0.0] * (capacity + 1)
+	choices: List[int] = []
+	for wt, val in zip(weights, values):
+		if wt > capacity or val <= 0:
+			choices.append(0)
+			continue
+		old = dp[wt:]
+		cand = list(map(add, dp[:capacity + 1 - wt], repeat(val)))
+		choices.append(_pack(list(map(gt, cand, old))) << wt)
+		dp[wt:] = map(max, old, cand)
+	chosen: List[int] = []
+	w = capacity
+	for i in range(len(choices) - 1, -1, -1):
+		if (choices[i] >> w) & 1:
+			chosen.append(i)
+			w -= weights[i]
+	chosen.reverse()
+	return chosen
+
+
+def _dp2(weights: Sequence[int], heads: Sequence[int], values: Sequence[float], capacity: int, head_capacity: int) -> List[int]:
+	# Two-constraint variant: one rolling row of (H+1) cells per weeks value.
+	H = head_capacity + 1
+	dp = [[0.0] * H for _ in range(capacity + 1)]
+	choices: List[List[int]] = []
+	for wt, hc, val in zip(weights, heads, values):
+		rows = [0] * (capacity + 1)
+		if wt <= capacity and hc <= head_capacity and val > 0:
+			for w in range(capacity, wt - 1, -1):
+				old = dp[w][hc:]
+				cand = list(map(add, dp[w - wt][:H - hc], repeat(val)))
+				rows[w] = _pack(list(map(gt, cand, old))) << hc
+				dp[w][hc:] = map(max, old, cand)
+		choices.append(rows)
+	chosen: List[int] = []
+	w, h = capacity, head_capacity
+	for i in range(len(choices) - 1, -1, -1):
+		if (choices[i][w] >> h) & 1:
+			chosen.append(i)
+			w -= weights[i]
+			h -= heads[i]
+	chosen.reverse()
+	return chosen
+
+
+def _sizes(weights: Sequence[int], heads: Sequence[int], capacity: int, head_capacity: int) -> Tuple[List[float], float]:
+	# Surrogate item size for ordering and bounding: weeks alone, or weeks + headcount as fractions of
+	# their budgets. A feasible portfolio has total surrogate size <= 2, so the LP bound stays valid.
+	if not any(heads):
+		return [float(w) for w in weights], float(capacity)
+	return [(w / capacity if capacity else 0.0) + h / head_capacity for w, h in zip(weights, heads)], 2.0
+
+
+def _ratio_order(sizes: Sequence[float], values: Sequence[float]) -> List[int]:
+	return sorted(
+		(i for i in range(len(values)) if values[i] > 0),
+		key=lambda i: values[i] / sizes[i] if sizes[i] > 0 else math.inf,
+		reverse=True,
+	)
+
+
+def _lp_bound(sizes: Sequence[float], values: Sequence[float], capacity: float) -> float:
+	value = 0.0
+	for i in _ratio_order(sizes, values):
+		if sizes[i] <= capacity:
+			capacity -= sizes[i]
+			value += values[i]
+		else:
+			return value + values[i] * capacity / sizes[i]
+	return value
+
+
+def _greedy(weights: Sequence[int], heads: Sequence[int], values: Sequence[float], capacity: int, head_capacity: int) -> List[int]:
+	# Best of (density-ordered fill, best single item): a 1/2-approximation for one constraint.
+	sizes, _ = _sizes(weights, heads, capacity, head_capacity)
+	chosen: List[int] = []
+	w = h = 0
+	for i in _ratio_order(sizes, values):
+		if w + weights[i] <= capacity and h + heads[i] <= head_capacity:
+			chosen.append(i)
+			w += weights[i]
+			h += heads[i]
+	fits = [i for i in range(len(values)) if weights[i] <= capacity and heads[i] <= head_capacity and values[i] > 0]
+	if fits:
+		best = max(fits, key=lambda i: values[i])
+		if values[best] > sum(values[i] for i in chosen):
+			chosen = [best]
+	return sorted(chosen)
+
+
+def _bnb(weights: Sequence[int], heads: Sequence[int], values: Sequence[float], capacity: int, head_capacity: int, node_limit: int) -> List[int]:
+	# Depth-first branch-and-bound in density order with the fractional (LP) bound on the surrogate
+	# size; weeks and headcount are enforced exactly for feasibility. Stops after node_limit nodes and
+	# returns the best incumbent (seeded with the greedy solution).
+	sizes, size_capacity = _sizes(weights, heads, capacity, head_capacity)
+	order = _ratio_order(sizes, values)
+	W = [weights[i] for i in order]
+	C = [heads[i] for i in order]
+	S = [sizes[i] for i in order]
+	V = [values[i] for i in order]
+	n = len(order)
+	incumbent = _greedy(weights, heads, values, capacity, head_capacity)
+	best_value = sum(values[i] for i in incumbent)
+	best_set: Optional[List[int]] = None
+	if n == 0:
+		return incumbent
+
+	def bound(k: int, s_left: float, value: float) -> float:
+		for j in range(k, n):
+			if S[j] <= s_left:
+				s_left -= S[j]
+				value += V[j]
+			else:
+				return value + V[j] * s_left / S[j]
+		return value
+
+	nodes = 0
+	taken: List[int] = []
+	# stack of (k, w_left, h_left, s_left, value, n_taken, take_k)
+	root = (0, capacity, head_capacity, size_capacity, 0.0, 0)
+	stack: List[Tuple[int, int, int, float, float, int, bool]] = [root + (True,), root + (False,)]
+	while stack and nodes < node_limit:
+		k, w_left, h_left, s_left, value, depth, take = stack.pop()
+		nodes += 1
+		del taken[depth:]
+		if take:
+			if W[k] > w_left or C[k] > h_left:
+				continue
+			w_left -= W[k]
+			h_left -= C[k]
+			s_left -= S[k]
+			value += V[k]
+			taken.append(k)
+		if value > best_value:
+			best_value = value
+			best_set = list(taken)
+		k += 1
+		if k >= n or bound(k, s_left, value) <= best_value:
+			continue
+		node = (k, w_left, h_left, s_left, value, len(taken))
+		stack.append(node + (False,))
+		stack.append(node + (True,))
+	if best_set is None:
+		return incumbent
+	return sorted(order[j] for j in best_set)
+
+
+def _fptas(weights: Sequence[int], values: Sequence[float], capacity: int, eps: float) -> List[int]:
+	# (1 - eps)-approximation: values scaled to integers, then min-weight-per-value DP with the same
+	# rolling/bit-packed scheme. Table size is n * sum(scaled values) <= n^2 / eps, independent of W.
+	items = [i for i in range(len(values)) if values[i] > 0 and weights[i] <= capacity]
+	if not items:
+		return []
+	K = eps * max(values[i] for i in items) / len(items)
+	scaled = [int(values[i] / K) for i in items]
+	# No solution is worth more than the fractional (LP) optimum, so the value axis stops there
+	total = min(sum(scaled), int(_lp_bound(weights, values, capacity) / K) + 1)
+	inf = math.inf
+	dp = [0.0] + [inf] * total  # dp[v] = min weight reaching scaled value v
+	choices: List[int] = []
+	for idx, sv in zip(items, scaled):
+		wt = weights[idx]
+		if sv == 0 or sv > total:
+			choices.append(0)
+			continue
+		old = dp[sv:]
+		cand = list(map(add, dp[:total + 1 - sv], repeat(wt)))
+		choices.append(_pack(list(map(gt, old, cand))) << sv)
+		dp[sv:] = map(min, old, cand)
+	v = max(i for i in range(total + 1) if dp[i] <= capacity)
+	chosen: List[int] = []
+	for k in range(len(items) - 1, -1, -1):
+		if (choices[k] >> v) & 1:
+			chosen.append(items[k])
+			v -= scaled[k]
+	return sorted(chosen)
+
+
+def select_portfolio(
+	values: Sequence[float],
+	weeks: Sequence[float],
+	max_weeks: float,
+	headcount: Optional[Sequence[float]] = None,
+	max_headcount: Optional[float] = None,
+	method: str = "auto",
+	eps: float = 0.1,
+	node_limit: int = 2_000_000,
+) -> List[int]:
+	# Returns ascending indices of the chosen ideas. Weeks/headcount are truncated to non-negative ints.
+	# method="auto" uses the exact DP while its table fits DP_CELL_BUDGET, otherwise branch-and-bound.
+	if method not in METHODS:
+		raise ValueError(f"Unknown method '{method}'. Choose from: {', '.join(METHODS)}")
+	capacity = max(0, int(max_weeks))
+	weights = [max(0, int(w)) for w in weeks]
+	vals = [float(v) for v in values]
+	two_d = headcount is not None and max_headcount is not None
+	heads = [max(0, int(h)) for h in headcount] if two_d else [0] * len(vals)  # type: ignore[union-attr]
+	head_capacity = max(0, int(max_headcount)) if two_d else 0  # type: ignore[arg-type]
+	if method == "fptas" and two_d:
+		raise ValueError("fptas supports the weeks constraint only")
+	keep = _prune(weights, heads, vals, capacity, head_capacity)
+	weights, heads, vals = [weights[i] for i in keep], [heads[i] for i in keep], [vals[i] for i in keep]
+	if method == "auto":
+		cells = len(keep) * (capacity + 1) * (head_capacity + 1)
+		method = "dp" if cells <= DP_CELL_BUDGET else "bnb"
+	if method == "dp":
+		chosen = _dp2(weights, heads, vals, capacity, head_capacity) if two_d else _dp(weights, vals, capacity)
+	elif method == "greedy":
+		chosen = _greedy(weights, heads, vals, capacity, head_capacity)
+	elif method == "bnb":
+		chosen = _bnb(weights, heads, vals, capacity, head_capacity, node_limit)
+	else:
+		chosen = _fptas(weights, vals, capacity, eps)
+	return [keep[i] for i in chosen]
@@ -1,4 +1,8 @@
-from typing import Dict, List, Tuple
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .profiling import profiled
 
 
 def demand_curve(prob_success: float, projected_users: float) -> List[Tuple[float, float]]:
@@ -12,6 +16,7 @@ def demand_curve(prob_success: float, projected_users: float) -> List[Tuple[floa
 	return points
 
 
+@profiled("optimize_revenue", rows=lambda r: 1)
 def optimize_revenue(prob_success: float, projected_users: float, unit_cost: float = 0.0) -> Dict[str, float]:
 	best_price = 0.0
 	best_revenue = 0.0
@@ -28,3 +33,156 @@ def optimize_revenue(prob_success: float, projected_users: float, unit_cost: flo
 		"expected_revenue": best_revenue,
 		"expected_profit": best_profit,
 	}
+
+
+# Batch pricing. Demand factorizes as base * fraction(price) with base = prob_success * projected_users,
+# so the optimal price does not depend on the idea: it is solved once per (curve, unit_cost, objective)
+# and every idea is then priced in O(1).
+
+GRID_PRICES = [i * 0.5 for i in range(1, 41)]  # the $0.5..$20 grid used by demand_curve
+
+
+class DemandCurve(ABC):
+	name = "custom"
+	max_price = 20.0  # upper bound for numeric search
+
+	@abstractmethod
+	def fraction(self, price: float) -> float:
+		...
+
+	def best_price(self, unit_cost: float, objective: str) -> Optional[float]:
+		# Closed-form optimum; None (the default) means there is none and the price is searched numerically.
+		return None
+
+
+class LinearDemand(DemandCurve):
+	# demand = base * (1 - price / max_price), the curve used by demand_curve/optimize_revenue
+	name = "linear"
+
+	def __init__(self, max_price: float = 20.0) -> None:
+		self.max_price = max_price
+
+	def fraction(self, price: float) -> float:
+		return max(0.0, 1.0 - price / self.max_price)
+
+	def best_price(self, unit_cost: float, objective: str) -> Optional[float]:
+		if objective == "profit":
+			return min(self.max_price, (self.max_price + max(0.0, unit_cost)) / 2.0)
+		return self.max_price / 2.0
+
+
+class ExponentialDemand(DemandCurve):
+	# demand = base * exp(-price / scale)
+	name = "exponential"
+
+	def __init__(self, scale: float = 10.0, max_price: float = 100.0) -> None:
+		self.scale = scale
+		self.max_price = max_price
+
+	def fraction(self, price: float) -> float:
+		return math.exp(-price / self.scale)
+
+	def best_price(self, unit_cost: float, objective: str) -> Optional[float]:
+		if objective == "profit":
+			return self.scale + max(0.0, unit_cost)
+		return self.scale
+
+
+DEMAND_CURVES: Dict[str, Callable[[], DemandCurve]] = {
+	"linear": LinearDemand,
+	"exponential": ExponentialDemand,
+}
+
+
+def register_demand_curve(name: str, factory: Callable[[], DemandCurve]) -> None:
+	DEMAND_CURVES[name] = factory
+
+
+def get_demand_curve(curve: Union[str, DemandCurve]) -> DemandCurve:
+	if isinstance(curve, DemandCurve):
+		return curve
+	if curve not in DEMAND_CURVES:
+		raise ValueError(f"Unknown demand curve '{curve}'. Choose from: {', '.join(sorted(DEMAND_CURVES))}")
+	return DEMAND_CURVES[curve]()
+
+
+def _objective_value(curve: DemandCurve, price: float, unit_cost: float, objective: str) -> float:
+	margin = price if objective == "revenue" else max(0.0, price - unit_cost)
+	return margin * curve.fraction(price)
+
+
+def _grid_price(curve: DemandCurve, unit_cost: float, objective: str) -> float:
+	# Same scan and strict-improvement tie-breaking as optimize_revenue
+	best_price = 0.0
+	best_value = 0.0
+	for price in GRID_PRICES:
+		value = _objective_value(curve, price, unit_cost, objective)
+		if value > best_value:
+			best_value, best_price = value, price
+	return best_price
+
+
+def _search_price(curve: DemandCurve, unit_cost: float, objective: str, tol: float = 1e-6) -> float:
+	# Golden-section search on [0, max_price]; assumes a unimodal objective.
+	inv_phi = (math.sqrt(5.0) - 1.0) / 2.0
+	lo, hi = 0.0, curve.max_price
+	while hi - lo > tol:
+		a = hi - inv_phi * (hi - lo)
+		b = lo + inv_phi * (hi - lo)
+		if _objective_value(curve, a, unit_cost, objective) < _objective_value(curve, b, unit_cost, objective):
+			lo = a
+		else:
+			hi = b
+	return (lo + hi) / 2.0
+
+
+def solve_price(curve: Union[str, DemandCurve] = "linear", unit_cost: float = 0.0, objective: str = "revenue", method: str = "analytic") -> float:
+	# method: "analytic" (closed form, falling back to "search"), "search" (golden section) or "grid" (legacy grid)
+	if objective not in ("revenue", "profit"):
+		raise ValueError("objective must be 'revenue' or 'profit'")
+	c = get_demand_curve(curve)
+	if method == "grid":
+		return _grid_price(c, unit_cost, objective)
+	if method == "analytic":
+		price = c.best_price(unit_cost, objective)
+		if price is not None:
+			return price
+	elif method != "search":
+		raise ValueError("method must be 'analytic', 'search' or 'grid'")
+	return _search_price(c, unit_cost, objective)
+
+
+@profiled("optimize_revenue", rows=lambda r: len(r["best_price"]))
+def optimize_revenue_batch(
+	prob_success: Sequence[float],
+	projected_users: Sequence[float],
+	unit_cost: float = 0.0,
+	curve: Union[str, DemandCurve] = "linear",
+	objective: str = "revenue",
+	method: str = "analytic",
+) -> Dict[str, List[float]]:
+	# Vector counterpart of optimize_revenue: one price solve, then O(1) per idea.
+	c = get_demand_curve(curve)
+	price = solve_price(c, unit_cost=unit_cost, objective=objective, method=method)
+	frac = c.fraction(price)
+	margin = max(0.0, price - unit_cost)
+	prices: List[float] = []
+	revenues: List[float] = []
+	profits: List[float] = []
+	for p, u in zip(prob_success, projected_users):
+		demand = max(0.0, min(1.0, p)) * max(0.0, u) * frac
+		revenue = price * demand
+		profit = margin * demand
+		if (revenue if objective == "revenue" else profit) > 0.0:
+			prices.append(price)
+			revenues.append(revenue)
+			profits.append(profit)
+		else:
+			prices.append(0.0)
+			revenues.append(0.0)
+			profits.append(0.0)
+	return {
+		"best_price": prices,
+		"expected_revenue": revenues,
+		"expected_profit": profits,
+	}
@@ -0,0 +1,213 @@
+import argparse
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+
+# Opt-in profiling of the hot paths (CSV loading, feature building, scaling, training epochs,
+# prediction, pricing, file writes). Instrumented code uses span() or @profiled; with no active
+# profiler both reduce to one global lookup, so normal runs pay nothing measurable. The --profile
+# flag of every cli_* command activates one for the run: each span records wall time, rows/sec and
+# the tracemalloc peak, and a JSON trace (optionally cProfile stats) is written at the end.
+# tracemalloc slows allocation-heavy code, so compare seconds between profiled runs only, or use
+# --no-profile-memory. Spans run in worker processes are not collected.
+
+MAX_EVENTS = 100_000
+F = TypeVar("F", bound=Callable[..., Any])
+
+_ACTIVE: Optional["Profiler"] = None
+# Disabled spans still yield a dict, so callers can always set info["rows"]
+_NULL = nullcontext({"rows": 0})
+
+
+class Profiler:
+	def __init__(self, memory: bool = True) -> None:
+		self.memory = memory
+		self.t0 = time.perf_counter()
+		self.events: List[Dict[str, Any]] = []
+		self.totals: Dict[str, Dict[str, Any]] = {}
+		self.dropped = 0
+		self.depth = 0
+		# Highest traced memory seen by each open span; tracemalloc has one peak, reset per span
+		self._peaks: List[int] = []
+
+	@contextmanager
+	def span(self, name: str, rows: int = 0) -> Iterator[Dict[str, int]]:
+		info = {"rows": rows}
+		if self.memory:
+			current, peak = tracemalloc.get_traced_memory()
+			if self._peaks:
+				self._peaks[-1] = max(self._peaks[-1], peak)
+			tracemalloc.reset_peak()
+			self._peaks.append(current)
+		self.depth += 1
+		start = time.perf_counter()
+		try:
+			yield info
+		finally:
+			seconds = time.perf_counter() - start
+			self.depth -= 1
+			peak = 0
+			if self.memory:
+				peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+				if self._peaks:
+					self._peaks[-1] = max(self._peaks[-1], peak)
+			self._record(name, start - self.t0, seconds, info["rows"], peak)
+
+	def _record(self, name: str, offset: float, seconds: float, rows: int, peak: int) -> None:
+		total = self.totals.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0, "peak_bytes": 0})
+		total["calls"] += 1
+		total["seconds"] += seconds
+		total["rows"] += rows
+		total["peak_bytes"] = max(total["peak_bytes"], peak)
+		if len(self.events) >= MAX_EVENTS:
+			self.dropped += 1
+			return
+		self.events.append({
+			"name": name,
+			"start": round(offset, 6),
+			"seconds": round(seconds, 6),
+			"rows": rows,
+			"depth": self.depth,
+			"peak_bytes": peak,
+		})
+
+	def report(self) -> Dict[str, Any]:
+		spans = []
+		for name, total in sorted(self.totals.items(), key=lambda kv: -kv[1]["seconds"]):
+			rate = total["rows"] / total["seconds"] if total["rows"] and total["seconds"] > 0 else None
+			spans.append({"name": name, **total, "rows_per_sec": rate})
+		return {
+			"command": sys.argv,
+			"wall_seconds": time.perf_counter() - self.t0,
+			"memory": self.memory,
+			"peak_bytes": tracemalloc.get_traced_memory()[1] if self.memory and tracemalloc.is_tracing() else 0,
+			"spans": spans,
+			"events": self.events,
+			"dropped_events": self.dropped,
+		}
+
+
+def summary(report: Dict[str, Any]) -> str:
+	lines = [f"{'span':<20} {'calls':>7} {'seconds':>9} {'rows/sec':>11} {'peak MB':>8}"]
+	for s in report["spans"]:
+		rate = f"{s['rows_per_sec']:>11,.0f}" if s["rows_per_sec"] else f"{'-':>11}"
+		peak = f"{s['peak_bytes'] / 1e6:>8.1f}" if report["memory"] else f"{'-':>8}"
+		lines.append(f"{s['name']:<20} {s['calls']:>7} {s['seconds']:>9.3f} {rate} {peak}")
+	lines.append(f"{'wall':<20} {'':>7} {report['wall_seconds']:>9.3f}")
+	return "\n".join(lines)
+
+
+def enabled() -> bool:
+	return _ACTIVE is not None
+
+
+def span(name: str, rows: int = 0) -> Any:
+	# Context manager yielding an info dict; set info["rows"] when the count is known only at the end
+	p = _ACTIVE
+	if p is None:
+		return _NULL
+	return p.span(name, rows)
+
+
+def profiled(name: str, rows: Optional[Callable[[Any], int]] = None) -> Callable[[F], F]:
+	# Decorator form of span(); rows(result) gives the row count of a call
+	def decorate(fn: F) -> F:
+		@functools.wraps(fn)
+		def wrapper(*args: Any, **kwargs: Any) -> Any:
+			p = _ACTIVE
+			if p is None:
+				return fn(*args, **kwargs)
+			with p.span(name) as info:
+				result = fn(*args, **kwargs)
+				if rows is not None:
+					info["rows"] = rows(result)
+				return result
+		return wrapper  # type: ignore[return-value]
+	return decorate
+
+
+def start(memory: bool = True) -> Profiler:
+	global _ACTIVE
+	if memory and not tracemalloc.is_tracing():
+		tracemalloc.start()
+	_ACTIVE = Profiler(memory=memory)
+	return _ACTIVE
+
+
+def stop() -> Optional[Dict[str, Any]]:
+	global _ACTIVE
+	p, _ACTIVE = _ACTIVE, None
+	if p is None:
+		return None
+	report = p.report()
+	if p.memory:
+		tracemalloc.stop()
+	return report
+
+
+def _reset_in_child() -> None:
+	# Forked workers would otherwise keep tracing into a copy of the parent's profiler
+	global _ACTIVE
+	if _ACTIVE is not None:
+		_ACTIVE = None
+		tracemalloc.stop()
+
+
+if hasattr(os, "register_at_fork"):
+	os.register_at_fork(after_in_child=_reset_in_child)
+
+
+def _ensure_parent(path: str) -> None:
+	dirname = os.path.dirname(path)
+	if dirname:
+		os.makedirs(dirname, exist_ok=True)
+
+
+def write_report(path: str, report: Dict[str, Any]) -> None:
+	_ensure_parent(path)
+	tmp = path + ".tmp"
+	with open(tmp, "w", encoding="utf-8") as f:
+		json.dump(report, f, indent=2)
+	os.replace(tmp, path)
+
+
+def add_profile_args(parser: argparse.ArgumentParser) -> None:
+	g = parser.add_argument_group("profiling")
+	g.add_argument("--profile", action="store_true", help="Time the hot paths (wall time, rows/sec, tracemalloc peak) and write a JSON trace")
+	g.add_argument("--profile-output", default="profile.json", help="Path of the --profile JSON trace")
+	g.add_argument("--no-profile-memory", action="store_true", help="With --profile, skip tracemalloc (lower overhead, no peak memory)")
+	g.add_argument("--cprofile", default="", help="Also dump cProfile stats to this path (read with python -m pstats)")
+
+
+def run_profiled(fn: Callable[[argparse.Namespace], Any], args: argparse.Namespace) -> Any:
+	# Runs fn(args) under the profilers requested by add_profile_args; reports are written even
+	# when fn raises (or the server is interrupted)
+	want = getattr(args, "profile", False)
+	cprofile_path = getattr(args, "cprofile", "")
+	if not want and not cprofile_path:
+		return fn(args)
+	if want:
+		start(memory=not getattr(args, "no_profile_memory", False))
+	cprof = cProfile.Profile() if cprofile_path else None
+	if cprof is not None:
+		cprof.enable()
+	try:
+		return fn(args)
+	finally:
+		if cprof is not None:
+			cprof.disable()
+			_ensure_parent(cprofile_path)
+			cprof.dump_stats(cprofile_path)
+			print(f"Wrote cProfile stats to {cprofile_path}", file=sys.stderr)
+		report = stop()
+		if report is not None:
+			write_report(args.profile_output, report)
+			print(summary(report), file=sys.stderr)
+			print(f"Wrote profile trace to {args.profile_output}", file=sys.stderr)
@@ -0,0 +1,265 @@
+import math
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .backends import _numpy, resolve_backend
+from .columnar import FeatureMatrix, Matrix, as_feature_matrix
+from .hashing import HashConfig, SparseOps, SparseRows
+from .metrics import evaluate_probs
+from .model import IdeaRankerModel
+from .modelfile import is_binary, load_model
+from .profiling import profiled
+from .utils import load_json, save_json
+
+
+# Compiled scorer for inference. StandardScaler is affine, so b + sum w_j (x_j - m_j) / s_j folds
+# once into b' + sum w'_j x_j with w'_j = w_j / s_j and b' = b - sum w_j m_j / s_j (a constant
+# column, s_j = 0, gets w'_j = 0 as transform maps it to 0). The per-row function is generated
+# with the folded constants inlined and mapped over the raw feature columns: no scaler pass, no
+# standardized copy, no per-row lists. Under numpy the same sum is taken column by column.
+# Precisions: float64 (the model up to rounding), float32 (weights rounded to float32, and the
+# numpy sum accumulated in float32) and fixed16 (each weight a 16-bit integer with its own
+# power-of-two scale).
+# compare() measures the deltas against IdeaRankerModel.predict_proba on real rows.
+
+FORMAT = "idearanker-scorer"
+VERSION = 1
+PRECISIONS = ["float64", "float32", "fixed16"]
+# "reference" in load_scorer keeps the uncompiled model
+REFERENCE = "reference"
+FIXED_BITS = 16
+
+
+def fold_weights(weights: Sequence[float], means: Sequence[float], stds: Sequence[float]) -> Tuple[float, List[float]]:
+	# (bias, weights) on raw features; an unfitted scaler (no means) leaves the weights as they are
+	if not means:
+		return float(weights[0]), [float(w) for w in weights[1:]]
+	bias = float(weights[0])
+	folded = []
+	for w, m, s in zip(weights[1:], means, stds):
+		if s == 0:
+			folded.append(0.0)
+			continue
+		folded.append(w / s)
+		bias -= w * m / s
+	return bias, folded
+
+
+def quantize_fixed(values: Sequence[float], bits: int = FIXED_BITS) -> Tuple[List[int], List[int]]:
+	# value ~= q * 2**-shift with |q| < 2**(bits - 1); the shift is chosen per value so small
+	# weights (e.g. per-user weights folded by a large std) keep the same relative precision
+	top = (1 << (bits - 1)) - 1
+	q, shifts = [], []
+	for v in values:
+		if v == 0 or not math.isfinite(v):
+			q.append(0)
+			shifts.append(0)
+			continue
+		_, e = math.frexp(v)
+		shift = bits - 1 - e
+		q.append(max(-top, min(top, round(v * 2.0 ** shift))))
+		shifts.append(shift)
+	return q, shifts
+
+
+def dequantize_fixed(q: Sequence[int], shifts: Sequence[int]) -> List[float]:
+	return [math.ldexp(v, -s) for v, s in zip(q, shifts)]
+
+
+def round_float32(values: Sequence[float]) -> List[float]:
+	return list(array("f", values))
+
+
+def _row_function(bias: float, weights: Sequence[float], offset: bool) -> Callable[..., float]:
+	# def row([o, ]x0, x1, ...): the stable sigmoid of the folded sum, constants inlined.
+	# Zero weights are dropped from the sum; their columns are still passed positionally.
+	for v in [bias, *weights]:
+		if not math.isfinite(v):
+			raise ValueError(f"Cannot compile non-finite weight {v!r}")
+	params = (["o"] if offset else []) + [f"x{j}" for j in range(len(weights))]
+	terms = "".join(f" + {w!r} * x{j}" for j, w in enumerate(weights) if w != 0.0)
+	src = (
+		f"def row({', '.join(params)}):\n"
+		f"\tz = {bias!r}{' + o' if offset else ''}{terms}\n"
+		"\tif z >= 0:\n"
+		"\t\treturn 1.0 / (1.0 + exp(-z))\n"
+		"\te = exp(z)\n"
+		"\treturn e / (1.0 + e)\n"
+	)
+	namespace: Dict[str, Any] = {"exp": math.exp}
+	exec(compile(src, "<idearanker-scorer>", "exec"), namespace)
+	return namespace["row"]
+
+
+class CompiledScorer:
+	# Drop-in for IdeaRankerModel at inference: predict_proba, hash_rows, hashing, metadata, backend
+	def __init__(
+		self,
+		bias: float,
+		weights: Sequence[float],
+		precision: str = "float64",
+		hashing: Optional[HashConfig] = None,
+		hashed: Sequence[float] = (),
+		metadata: Optional[Dict[str, str]] = None,
+		backend: str = "auto",
+	) -> None:
+		if precision not in PRECISIONS:
+			raise ValueError(f"Unknown precision '{precision}'. Choose from: {', '.join(PRECISIONS)}")
+		self.precision = precision
+		self.bias = bias
+		self.weights = list(weights)
+		self.hashing = hashing
+		self.hashed = list(hashed)
+		self.metadata: Dict[str, str] = dict(metadata or {})
+		self.backend = backend
+		# Results of compare() recorded at compile time, saved with the scorer
+		self.checks: Dict[str, float] = {}
+		self._row = _row_function(bias, self.weights, offset=False)
+		self._row_offset = _row_function(bias, self.weights, offset=True)
+
+	@property
+	def n_features(self) -> int:
+		return len(self.weights)
+
+	def hash_rows(self, rows: Any) -> Optional[SparseRows]:
+		return self.hashing.encode_dicts(rows) if self.hashing is not None else None
+
+	@profiled("scorer.predict_proba", rows=len)
+	def predict_proba(self, X: Matrix, copy: bool = True, sparse: Optional[SparseRows] = None) -> List[float]:
+		# X holds raw (unstandardized) features and is never modified, so copy is irrelevant
+		if (sparse is None) != (self.hashing is None):
+			raise ValueError("Hashed rows are required exactly when the scorer has a hash config")
+		Xc = as_feature_matrix(X)
+		if sparse is not None and len(sparse) != len(Xc):
+			raise ValueError(f"Hashed rows ({len(sparse)}) do not match feature rows ({len(Xc)})")
+		if not Xc:
+			return []
+		if Xc.n_features != self.n_features:
+			raise ValueError(f"Expected {self.n_features} features, got {Xc.n_features}")
+		offset = SparseOps(sparse).margins(self.hashed) if sparse is not None else None
+		np = _numpy() if resolve_backend(self.backend) == "numpy" else None
+		if np is not None:
+			return self._numpy_proba(np, Xc, offset)
+		if offset is not None:
+			return list(map(self._row_offset, offset, *Xc.columns))
+		if not self.weights:
+			return [self._row()] * len(Xc)
+		return list(map(self._row, *Xc.columns))
+
+	def _numpy_proba(self, np: Any, X: FeatureMatrix, offset: Optional[List[float]]) -> List[float]:
+		dtype = np.float32 if self.precision == "float32" else np.float64
+		z = np.full(len(X), self.bias, dtype=dtype)
+		if offset is not None:
+			z += np.asarray(offset, dtype=dtype)
+		for w, col in zip(self.weights, X.columns):
+			if w != 0.0:
+				z += dtype(w) * np.frombuffer(col, dtype=np.float64).astype(dtype, copy=False)
+		# The sigmoid runs in float64: in float32 it saturates to exactly 0 / 1 past |z| ~ 17
+		z = z.astype(np.float64, copy=False)
+		e = np.exp(-np.abs(z))
+		return np.where(z >= 0, 1.0 / (1.0 + e), e / (1.0 + e)).tolist()
+
+	def to_dict(self) -> Dict[str, object]:
+		payload: Dict[str, object] = {
+			"format": FORMAT,
+			"version": VERSION,
+			"precision": self.precision,
+		}
+		if self.precision == "fixed16":
+			# The integers are the payload; the floats they stand for follow exactly
+			q, shifts = quantize_fixed([self.bias] + self.weights)
+			payload.update(q=q, shifts=shifts)
+			if self.hashed:
+				hashed_q, hashed_shifts = quantize_fixed(self.hashed)
+				payload.update(hashed_q=hashed_q, hashed_shifts=hashed_shifts)
+		else:
+			payload.update(bias=self.bias, weights=self.weights)
+			if self.hashed:
+				payload["hashed_weights"] = self.hashed
+		if self.hashing is not None:
+			payload["hashing"] = self.hashing.to_dict()
+		payload.update(metadata=self.metadata, checks=self.checks)
+		return payload
+
+	@classmethod
+	def from_dict(cls, payload: Dict[str, Any], backend: str = "auto") -> "CompiledScorer":
+		if payload.get("format") != FORMAT:
+			raise ValueError("Not a compiled scorer payload")
+		if payload.get("version", 0) > VERSION:
+			raise ValueError(f"Scorer format version {payload.get('version')} is newer than supported ({VERSION})")
+		precision = payload["precision"]
+		if precision == "fixed16":
+			values = dequantize_fixed(payload["q"], payload["shifts"])
+			bias, weights = values[0], values[1:]
+			hashed = dequantize_fixed(payload.get("hashed_q", []), payload.get("hashed_shifts", []))
+		else:
+			bias, weights, hashed = payload["bias"], payload["weights"], payload.get("hashed_weights", [])
+		hashing = HashConfig.from_dict(payload["hashing"]) if payload.get("hashing") else None
+		scorer = cls(bias, weights, precision, hashing, hashed, payload.get("metadata"), backend)
+		scorer.checks = dict(payload.get("checks", {}))
+		return scorer
+
+
+Scorer = Union[IdeaRankerModel, CompiledScorer]
+
+
+def compile_model(model: IdeaRankerModel, precision: str = "float64") -> CompiledScorer:
+	if not model.weights:
+		raise ValueError("Cannot compile a model without weights")
+	n_dense = len(model.weights) - (model.hashing.n_buckets if model.hashing is not None else 0)
+	bias, weights = fold_weights(model.weights[:n_dense], model.scaler.means, model.scaler.stds)
+	hashed = [float(w) for w in model.weights[n_dense:]]
+	if precision == "float32":
+		[bias], weights, hashed = round_float32([bias]), round_float32(weights), round_float32(hashed)
+	elif precision == "fixed16":
+		values = dequantize_fixed(*quantize_fixed([bias] + weights))
+		bias, weights = values[0], values[1:]
+		hashed = dequantize_fixed(*quantize_fixed(hashed))
+	return CompiledScorer(bias, weights, precision, model.hashing, hashed, model.metadata, model.backend)
+
+
+def compare(
+	model: IdeaRankerModel,
+	scorer: CompiledScorer,
+	X: FeatureMatrix,
+	y: Optional[Sequence[int]] = None,
+	sparse: Optional[SparseRows] = None,
+	threshold: float = 0.5,
+) -> Dict[str, float]:
+	# Scorer vs the model's own predict_proba on the same raw rows: probability deltas, decisions
+	# that flip at the threshold, and (with labels) the change in AUC and log-loss
+	ref = model.predict_proba(X, copy=True, sparse=sparse)
+	got = scorer.predict_proba(X, sparse=sparse)
+	deltas = [abs(a - b) for a, b in zip(ref, got)]
+	n = max(1, len(deltas))
+	out = {
+		"rows": float(len(deltas)),
+		"max_abs_delta": max(deltas, default=0.0),
+		"mean_abs_delta": sum(deltas) / n,
+		"flipped": float(sum((a >= threshold) != (b >= threshold) for a, b in zip(ref, got))),
+	}
+	if y is not None and len(y):
+		m_ref, m_got = evaluate_probs(y, ref, threshold), evaluate_probs(y, got, threshold)
+		out["auc_delta"] = m_got["auc"] - m_ref["auc"]
+		out["log_loss_delta"] = m_got["log_loss"] - m_ref["log_loss"]
+	return out
+
+
+def save_scorer(path: str, scorer: CompiledScorer) -> None:
+	save_json(path, scorer.to_dict())
+
+
+def load_scorer(path: str, precision: str = "float64", backend: str = "auto") -> Scorer:
+	# A compiled scorer file is used as saved; a model file (JSON or binary) is compiled at load
+	# with `precision`, or returned as is for "reference"
+	if is_binary(path):
+		model = load_model(path)
+	else:
+		payload = load_json(path)
+		if payload.get("format") == FORMAT:
+			return CompiledScorer.from_dict(payload, backend)
+		model = IdeaRankerModel.from_dict(payload)
+	model.backend = backend
+	if precision == REFERENCE:
+		return model
+	return compile_model(model, precision)
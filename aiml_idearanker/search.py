@@ -0,0 +1,178 @@
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Sequence
+
+from .columnar import FeatureMatrix
+from .cv import run_cv, shared_pool, worker_data
+from .utils import ensure_dir, load_json
+
+
+# Hyperparameter search over (lr, epochs, l2). Every trial is scored with k-fold CV; finished
+# trials are cached on disk keyed by (data hash, hyperparameters, CV settings).
+
+METRICS = ["accuracy", "precision", "recall", "f1", "auc", "pr_auc"]
+
+
+def grid_trials(space: Dict[str, List[float]]) -> List[Dict[str, float]]:
+	keys = sorted(space)
+	return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_trials(space: Dict[str, List[float]], n_trials: int, seed: int = 42) -> List[Dict[str, float]]:
+	# lr is sampled log-uniformly and l2 uniformly between the smallest and largest listed values;
+	# epochs is drawn from the listed values.
+	rng = random.Random(seed)
+	lo_lr, hi_lr = min(space["lr"]), max(space["lr"])
+	if lo_lr <= 0:
+		raise ValueError(f"Learning rates must be positive to sample them log-uniformly, got {lo_lr:g}")
+	lo_l2, hi_l2 = min(space["l2"]), max(space["l2"])
+	trials = []
+	for _ in range(n_trials):
+		trials.append({
+			"epochs": rng.choice(space["epochs"]),
+			"l2": rng.uniform(lo_l2, hi_l2),
+			"lr": math.exp(rng.uniform(math.log(lo_lr), math.log(hi_lr))),
+		})
+	return trials
+
+
+class TrialCache:
+	def __init__(self, directory: str, data_hash: str, settings: Dict[str, object]) -> None:
+		self.directory = directory
+		self.data_hash = data_hash
+		self.settings = settings
+		ensure_dir(directory)
+
+	def key(self, params: Dict[str, float]) -> str:
+		blob = json.dumps({"data": self.data_hash, "params": params, "settings": self.settings}, sort_keys=True)
+		return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+	def get(self, params: Dict[str, float]) -> Optional[Dict[str, float]]:
+		path = os.path.join(self.directory, self.key(params) + ".json")
+		if not os.path.exists(path):
+			return None
+		try:
+			metrics = load_json(path)["metrics"]
+		except (ValueError, KeyError):
+			return None
+		# Entries written before a metric existed are re-run rather than ranked without it
+		return metrics if all(m in metrics for m in METRICS) else None
+
+	def put(self, params: Dict[str, float], metrics: Dict[str, float]) -> None:
+		path = os.path.join(self.directory, self.key(params) + ".json")
+		tmp = path + ".tmp"
+		with open(tmp, "w", encoding="utf-8") as f:
+			json.dump({"params": params, "metrics": metrics, "settings": self.settings}, f)
+		os.replace(tmp, path)
+
+
+def _cv_metrics(X: FeatureMatrix, y: Sequence[int], params: Dict[str, float], settings: Dict[str, object]) -> Dict[str, float]:
+	result = run_cv(
+		X, y, k=int(settings["k"]), seed=int(settings["seed"]), workers=1,  # type: ignore[arg-type]
+		threshold=float(settings["threshold"]), backend=str(settings["backend"]),  # type: ignore[arg-type]
+		lr=params["lr"], epochs=int(params["epochs"]), l2=params["l2"],
+	)
+	return result["metrics"]  # type: ignore[return-value]
+
+
+def _run_trial(params: Dict[str, float], settings: Dict[str, object]) -> Dict[str, float]:
+	X, y = worker_data()
+	return _cv_metrics(X, y, params, settings)
+
+
+def evaluate_trials(
+	trials: List[Dict[str, float]],
+	X: FeatureMatrix,
+	y: Sequence[int],
+	cache: TrialCache,
+	pool: Optional[ProcessPoolExecutor] = None,
+) -> List[Dict[str, object]]:
+	records: List[Dict[str, object]] = [{"params": t} for t in trials]
+	pending: List[int] = []
+	for i, params in enumerate(trials):
+		hit = cache.get(params)
+		if hit is not None:
+			records[i].update(metrics=hit, cached=True)
+		else:
+			pending.append(i)
+	if pool is None:
+		for i in pending:
+			metrics = _cv_metrics(X, y, trials[i], cache.settings)
+			cache.put(trials[i], metrics)
+			records[i].update(metrics=metrics, cached=False)
+	else:
+		futures = {pool.submit(_run_trial, trials[i], cache.settings): i for i in pending}
+		for fut in as_completed(futures):
+			i = futures[fut]
+			metrics = fut.result()
+			# Cache as each trial finishes so an interrupted search resumes where it stopped
+			cache.put(trials[i], metrics)
+			records[i].update(metrics=metrics, cached=False)
+	return records
+
+
+def halving_rungs(min_epochs: int, max_epochs: int, eta: int) -> List[int]:
+	if eta < 2:
+		raise ValueError(f"eta must be at least 2, got {eta}")
+	rungs = []
+	e = max(1, min_epochs)
+	while e < max_epochs:
+		rungs.append(e)
+		e *= eta
+	rungs.append(max_epochs)
+	return rungs
+
+
+def search(
+	X: FeatureMatrix,
+	y: Sequence[int],
+	trials: List[Dict[str, float]],
+	cache: TrialCache,
+	metric: str = "f1",
+	workers: int = 1,
+	halving: bool = False,
+	eta: int = 3,
+	min_epochs: int = 10,
+) -> Dict[str, object]:
+	# With halving, epochs is the budget: all configs run at the smallest rung, the best 1/eta
+	# advance to eta-times more epochs, up to the largest epochs value in the trials.
+	if halving and eta < 2:
+		# eta = 1 never grows the rungs (and prunes nothing); eta <= 0 gives no valid rungs
+		raise ValueError(f"eta must be at least 2, got {eta}")
+
+	def score(record: Dict[str, object]) -> float:
+		return float(record["metrics"][metric])  # type: ignore[index]
+
+	with ExitStack() as stack:
+		pool = stack.enter_context(shared_pool(X, y, workers)) if workers > 1 else None
+		history: List[Dict[str, object]] = []
+		if not halving:
+			records = evaluate_trials(trials, X, y, cache, pool)
+			history.extend(records)
+		else:
+			max_epochs = int(max(t["epochs"] for t in trials))
+			configs = list({(t["lr"], t["l2"]): t for t in trials}.values())
+			records = []
+			for rung, epochs in enumerate(halving_rungs(min_epochs, max_epochs, eta)):
+				rung_trials = [dict(c, epochs=epochs) for c in configs]
+				records = evaluate_trials(rung_trials, X, y, cache, pool)
+				for r in records:
+					r["rung"] = rung
+				history.extend(records)
+				records.sort(key=score, reverse=True)
+				configs = [r["params"] for r in records[:max(1, math.ceil(len(records) / eta))]]  # type: ignore[misc]
+	best = max(records, key=score)
+	return {
+		"metric": metric,
+		"halving": halving,
+		"best": best,
+		"trials": history,
+		"n_evaluated": sum(1 for r in history if not r.get("cached")),
+		"n_cached": sum(1 for r in history if r.get("cached")),
+	}
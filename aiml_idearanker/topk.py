@@ -0,0 +1,126 @@
+import csv
+import heapq
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .data import build_features, iter_csv_chunks
+from .join import read_header
+from .scorer import Scorer
+from .profiling import span
+
+
+# Top-K ranking while streaming: a bounded min-heap keeps the K best rows seen so far, so memory is
+# O(K + chunk) and time O(n log K) (most rows only cost one comparison against the heap's floor).
+# Entries are (score, tiebreak, row id, passthrough values) with tiebreak = (-source, -row): equal
+# scores rank the earlier shard / earlier row first, so merging per-shard heaps gives the same
+# ranking as one pass over the concatenated input.
+
+Entry = Tuple[float, Tuple[int, int], str, Tuple[str, ...]]
+DEFAULT_CHUNK = 50_000
+
+
+class TopK:
+	def __init__(self, k: int) -> None:
+		if k <= 0:
+			raise ValueError("k must be positive")
+		self.k = k
+		self.heap: List[Entry] = []
+
+	def __len__(self) -> int:
+		return len(self.heap)
+
+	def push(self, entry: Entry) -> None:
+		if len(self.heap) < self.k:
+			heapq.heappush(self.heap, entry)
+		elif entry > self.heap[0]:
+			heapq.heapreplace(self.heap, entry)
+
+	def extend(self, entries: Iterable[Entry]) -> None:
+		for entry in entries:
+			self.push(entry)
+
+	def offer(self, scores: Sequence[float], source: int, first_row: int, ids: Sequence[str], values: Sequence[Tuple[str, ...]]) -> None:
+		# Scores of consecutive rows first_row, first_row + 1, ...; ids / values are built lazily
+		# only for rows that make it into the heap.
+		heap = self.heap
+		for i, s in enumerate(scores):
+			if len(heap) >= self.k and s < heap[0][0]:
+				continue
+			self.push((s, (-source, -(first_row + i)), ids[i], values[i]))
+
+	def merge(self, other: "TopK") -> "TopK":
+		self.extend(other.heap)
+		return self
+
+	def ranked(self) -> List[Entry]:
+		return sorted(self.heap, reverse=True)
+
+
+class _Lazy:
+	# Sequence view that applies fn on index access
+	def __init__(self, rows: Sequence[object], fn: object) -> None:
+		self.rows = rows
+		self.fn = fn
+
+	def __getitem__(self, i: int) -> object:
+		return self.fn(self.rows[i])  # type: ignore[operator]
+
+
+def top_k_file(
+	model: Scorer,
+	input_path: str,
+	k: int,
+	id_column: Optional[str] = "idea_id",
+	columns: Sequence[str] = (),
+	chunk_size: int = 0,
+	source: int = 0,
+) -> Tuple[TopK, int]:
+	# (heap, rows scored). Entries carry the id_column value ("" when the input has no such column).
+	header = read_header(input_path)
+	missing = [c for c in columns if c not in header]
+	if missing:
+		raise ValueError(f"{input_path}: missing passthrough columns {missing}")
+	if id_column not in header:
+		id_column = None
+	top = TopK(k)
+	n = 0
+	for rows in iter_csv_chunks(input_path, chunk_size if chunk_size > 0 else DEFAULT_CHUNK):
+		X, _ = build_features(rows)
+		probs = model.predict_proba(X, copy=False, sparse=model.hash_rows(rows))
+		ids = _Lazy(rows, lambda r: r[id_column]) if id_column else [""] * len(rows)
+		values = _Lazy(rows, lambda r: tuple(r[c] for c in columns))
+		top.offer(probs, source, n + 1, ids, values)  # type: ignore[arg-type]
+		n += len(rows)
+	return top, n
+
+
+def write_top_k(path: str, entries: Sequence[Entry], id_name: Optional[str] = None, columns: Sequence[str] = (), sources: Optional[Sequence[str]] = None) -> None:
+	# Columns: rank, [source], row (1-based within its input), [id_name], prob_success, passthrough.
+	# prob_success is written with full precision (repr) so per-shard files merge without new ties.
+	# With sources (shard paths by index), a "source" column names where each row came from.
+	with span("write_csv", rows=len(entries)), open(path, "w", encoding="utf-8", newline="") as f:
+		w = csv.writer(f)
+		w.writerow(["rank"] + (["source"] if sources is not None else []) + ["row"] + ([id_name] if id_name else []) + ["prob_success", *columns])
+		for rank, (score, (neg_source, neg_row), row_id, values) in enumerate(entries, start=1):
+			src = [sources[-neg_source]] if sources is not None else []
+			w.writerow([rank, *src, -neg_row] + ([row_id] if id_name else []) + [repr(score), *values])
+
+
+def read_top_k(path: str, k: int, source: int = 0) -> TopK:
+	# Loads a write_top_k file (written without sources) back into a heap tagged with `source`
+	top = TopK(k)
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		reader = csv.reader(f)
+		header = next(reader, [])
+		r, p = header.index("row"), header.index("prob_success")
+		for row in reader:
+			if row:
+				row_id = row[r + 1] if p > r + 1 else ""
+				top.push((float(row[p]), (-source, -int(row[r])), row_id, tuple(row[p + 1:])))
+	return top
+
+
+def merge_top_k(heaps: Iterable[TopK], k: int) -> TopK:
+	merged = TopK(k)
+	for h in heaps:
+		merged.merge(h)
+	return merged
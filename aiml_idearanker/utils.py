@@ -1,8 +1,11 @@
+import hashlib
 import json
 import math
 import os
 import random
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, MutableSequence, Sequence, Tuple
+
+from .profiling import profiled
 
 
 DEFAULT_SEED = 42
@@ -40,6 +43,33 @@ def mean_std(values: List[float]) -> Tuple[float, float]:
 	return m, std
 
 
+def moments(values: Sequence[float]) -> Tuple[int, float, float]:
+	# (count, mean, M2) where M2 = sum of squared deviations from the mean
+	n = len(values)
+	if n == 0:
+		return 0, 0.0, 0.0
+	m = sum(values) / n
+	return n, m, sum((v - m) * (v - m) for v in values)
+
+
+def merge_moments(a: Tuple[int, float, float], b: Tuple[int, float, float]) -> Tuple[int, float, float]:
+	# Chan et al. parallel update of running (count, mean, M2)
+	na, ma, m2a = a
+	nb, mb, m2b = b
+	if na == 0:
+		return b
+	if nb == 0:
+		return a
+	n = na + nb
+	delta = mb - ma
+	return n, ma + delta * nb / n, m2a + m2b + delta * delta * na * nb / n
+
+
+def std_from_moments(count: int, m2: float) -> float:
+	var = m2 / max(1, count - 1)
+	return math.sqrt(var) if var > 0 else 1.0
+
+
 def standardize_column(values: List[float]) -> Tuple[List[float], float, float]:
 	m, s = mean_std(values)
 	return [((v - m) / s) for v in values], m, s
@@ -51,6 +81,16 @@ def apply_standardize(values: List[float], mean: float, std: float) -> List[floa
 	return [((v - mean) / std) for v in values]
 
 
+def apply_standardize_inplace(values: MutableSequence[float], mean: float, std: float) -> None:
+	if std == 0:
+		for i in range(len(values)):
+			values[i] = 0.0
+		return
+	for i, v in enumerate(values):
+		values[i] = (v - mean) / std
+
+
+@profiled("write_json")
 def save_json(path: str, payload: Dict[str, Any]) -> None:
 	dirname = os.path.dirname(path)
 	if dirname:
@@ -59,6 +99,14 @@ def save_json(path: str, payload: Dict[str, Any]) -> None:
 		json.dump(payload, f, indent=2)
 
 
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+	h = hashlib.sha256()
+	with open(path, "rb") as f:
+		for block in iter(lambda: f.read(chunk_size), b""):
+			h.update(block)
+	return h.hexdigest()
+
+
 def load_json(path: str) -> Dict[str, Any]:
 	with open(path, "r", encoding="utf-8") as f:
 		return json.load(f)
@@ -0,0 +1,38 @@
+import argparse
+import time
+
+from aiml_idearanker.backends import numpy_available
+from aiml_idearanker.data import build_features
+from aiml_idearanker.model import IdeaRankerModel
+
+from .synthetic import synthetic_rows
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Compare python and numpy training/scoring backends")
+	p.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+	p.add_argument("--epochs", type=int, default=50)
+	args = p.parse_args()
+	backends = ["python"] + (["numpy"] if numpy_available() else [])
+	if len(backends) == 1:
+		print("numpy not installed; only the python backend will be timed")
+	print(f"{'rows':>9} {'backend':>8} {'fit s':>8} {'predict s':>10} {'max |dw|':>10}")
+	for n in args.rows:
+		X, y = build_features(synthetic_rows(n))
+		reference = None
+		for backend in backends:
+			model = IdeaRankerModel(backend=backend)
+			t0 = time.perf_counter()
+			model.fit(X, y, epochs=args.epochs)
+			t_fit = time.perf_counter() - t0
+			t0 = time.perf_counter()
+			model.predict_proba(X)
+			t_pred = time.perf_counter() - t0
+			if reference is None:
+				reference = model.weights
+			diff = max(abs(a - b) for a, b in zip(reference, model.weights))
+			print(f"{n:>9} {backend:>8} {t_fit:>8.3f} {t_pred:>10.3f} {diff:>10.2e}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from aiml_idearanker.batch import score_shards
+from aiml_idearanker.data import build_features, load_csv
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.utils import save_json
+
+from .synthetic import write_synthetic_csv
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Sharded batch scoring throughput (rows/sec) by worker count")
+	p.add_argument("--shards", type=int, default=16)
+	p.add_argument("--rows-per-shard", type=int, default=25_000)
+	p.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	p.add_argument("--chunk-size", type=int, default=0)
+	args = p.parse_args()
+	with tempfile.TemporaryDirectory() as tmp:
+		train_path = os.path.join(tmp, "train.csv")
+		model_path = os.path.join(tmp, "model.json")
+		shard_dir = os.path.join(tmp, "shards")
+		os.makedirs(shard_dir)
+		write_synthetic_csv(train_path, 2_000)
+		X, y = build_features(load_csv(train_path))
+		model = IdeaRankerModel(backend="python")
+		model.fit(X, y, epochs=50)
+		save_json(model_path, model.to_dict())
+		for i in range(args.shards):
+			write_synthetic_csv(os.path.join(shard_dir, f"part-{i:05d}.csv"), args.rows_per_shard, seed=i, with_label=False, with_id=True)
+		total = args.shards * args.rows_per_shard
+		print(f"{args.shards} shards x {args.rows_per_shard} rows, {os.cpu_count()} CPUs")
+		print(f"{'workers':>7} {'seconds':>8} {'rows/sec':>10} {'speedup':>8} {'resume s':>9}")
+		base = None
+		for workers in args.workers:
+			out = os.path.join(tmp, f"out-{workers}")
+			t0 = time.perf_counter()
+			score_shards(model_path, shard_dir, out, workers=workers, backend=args.backend, chunk_size=args.chunk_size)
+			elapsed = time.perf_counter() - t0
+			# A second run finds every shard done in the manifest and rescores nothing
+			t0 = time.perf_counter()
+			score_shards(model_path, shard_dir, out, workers=workers, backend=args.backend, chunk_size=args.chunk_size)
+			resume = time.perf_counter() - t0
+			base = base or elapsed
+			print(f"{workers:>7} {elapsed:>8.2f} {total / elapsed:>10.0f} {base / elapsed:>7.2f}x {resume:>9.3f}")
+			shutil.rmtree(out)
+
+
+if __name__ == "__main__":
+	main()
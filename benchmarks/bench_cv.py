@@ -0,0 +1,31 @@
+import argparse
+import os
+import time
+
+from aiml_idearanker.cv import run_cv
+from aiml_idearanker.data import build_features
+
+from .synthetic import synthetic_rows
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Parallel k-fold CV speedup vs worker count")
+	p.add_argument("--rows", type=int, default=50_000)
+	p.add_argument("--k", type=int, default=5)
+	p.add_argument("--epochs", type=int, default=50)
+	p.add_argument("--backend", default="python")
+	args = p.parse_args()
+	X, y = build_features(synthetic_rows(args.rows))
+	print(f"rows={args.rows} k={args.k} epochs={args.epochs} backend={args.backend} cpus={os.cpu_count()}")
+	print(f"{'workers':>7} {'seconds':>8} {'speedup':>8}")
+	base = None
+	for workers in range(1, args.k + 1):
+		t0 = time.perf_counter()
+		run_cv(X, y, k=args.k, workers=workers, epochs=args.epochs, backend=args.backend)
+		elapsed = time.perf_counter() - t0
+		base = base or elapsed
+		print(f"{workers:>7} {elapsed:>8.2f} {base / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,66 @@
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from aiml_idearanker.data import build_features, to_float, to_int
+from aiml_idearanker.model import StandardScaler
+from aiml_idearanker.utils import apply_standardize
+
+from .synthetic import synthetic_rows
+
+
+def legacy_pipeline(rows: List[Dict[str, str]]) -> object:
+	# The List[List[float]] path as it existed before the columnar store.
+	X: List[List[float]] = []
+	for r in rows:
+		X.append([
+			to_float(r, "novelty_score"),
+			to_float(r, "feasibility_score"),
+			float(to_int(r, "projected_users")),
+			float(to_int(r, "est_dev_weeks")),
+			to_float(r, "prior_similar_success_rate"),
+		])
+	scaler = StandardScaler()
+	scaler.fit(X)
+	Xz: List[List[float]] = []
+	for row in X:
+		Xz.append([apply_standardize([row[j]], scaler.means[j], scaler.stds[j])[0] for j in range(len(row))])
+	return X, Xz
+
+
+def columnar_pipeline(rows: List[Dict[str, str]]) -> object:
+	X, _ = build_features(rows)
+	scaler = StandardScaler()
+	scaler.fit(X)
+	scaler.transform(X, inplace=True)
+	return X
+
+
+def measure(fn: Callable[[List[Dict[str, str]]], object], rows: List[Dict[str, str]]) -> Tuple[float, int, int]:
+	gc.collect()
+	tracemalloc.start()
+	t0 = time.perf_counter()
+	result = fn(rows)
+	elapsed = time.perf_counter() - t0
+	retained, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	del result
+	return elapsed, retained, peak
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Bytes-per-row of feature matrix: List[List[float]] vs columnar")
+	p.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+	args = p.parse_args()
+	print(f"{'rows':>10} {'impl':>9} {'seconds':>8} {'retained B/row':>15} {'peak B/row':>11}")
+	for n in args.rows:
+		rows = list(synthetic_rows(n, with_label=False))
+		for name, fn in (("legacy", legacy_pipeline), ("columnar", columnar_pipeline)):
+			elapsed, retained, peak = measure(fn, rows)
+			print(f"{n:>10} {name:>9} {elapsed:>8.2f} {retained / n:>15.1f} {peak / n:>11.1f}")
+
+
+if __name__ == "__main__":
+	main()
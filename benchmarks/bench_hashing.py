@@ -0,0 +1,67 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from aiml_idearanker.data import read_hashed_features
+from aiml_idearanker.hashing import HashConfig
+from aiml_idearanker.model import IdeaRankerModel
+
+from .synthetic import write_synthetic_csv
+
+
+def add_categoricals(src: str, dst: str, vocab: int, tags_per_row: int, seed: int) -> None:
+	# Appends a team column and a "|"-separated tags column drawn from `vocab` distinct tokens
+	rng = random.Random(seed)
+	with open(src, "r", encoding="utf-8", newline="") as f, open(dst, "w", encoding="utf-8", newline="") as out:
+		reader, writer = csv.reader(f), csv.writer(out)
+		writer.writerow(next(reader) + ["team", "tags"])
+		for row in reader:
+			tags = "|".join(f"tag{rng.randrange(vocab)}" for _ in range(tags_per_row))
+			writer.writerow(row + [f"team{rng.randrange(vocab)}", tags])
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Hashed categorical features: memory and per-row cost stay flat as the vocabulary grows")
+	p.add_argument("--rows", type=int, default=50_000)
+	p.add_argument("--vocab", type=int, nargs="+", default=[100, 10_000, 1_000_000], help="Distinct tokens per column")
+	p.add_argument("--tags", type=int, default=5, help="Tags per row")
+	p.add_argument("--buckets", type=int, default=1 << 18)
+	p.add_argument("--epochs", type=int, default=5)
+	p.add_argument("--batch-size", type=int, default=256)
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	args = p.parse_args()
+	config = HashConfig.from_specs(["team", "tags:|"], n_buckets=args.buckets)
+	print(f"{'vocab':>9} {'one-hot w':>10} {'hashed w':>9} {'rows MiB':>9} {'read us/row':>12} {'train us/row/ep':>16} {'predict us/row':>15} {'train peak MiB':>15}")
+	with tempfile.TemporaryDirectory() as tmp:
+		base, path = os.path.join(tmp, "base.csv"), os.path.join(tmp, "hashed.csv")
+		write_synthetic_csv(base, args.rows, seed=1)
+		for vocab in args.vocab:
+			add_categoricals(base, path, vocab, args.tags, seed=vocab)
+			t0 = time.perf_counter()
+			X, y, S = read_hashed_features(path, config)
+			read_s = time.perf_counter() - t0
+			model = IdeaRankerModel(backend=args.backend)
+			model.hashing = config
+			tracemalloc.start()
+			t0 = time.perf_counter()
+			model.fit(X, y, epochs=args.epochs, batch_size=args.batch_size, sparse=S)
+			train_s = time.perf_counter() - t0
+			_, peak = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			t0 = time.perf_counter()
+			model.predict_proba(X, sparse=S)
+			predict_s = time.perf_counter() - t0
+			n = len(X)
+			# One-hot encoding would need a weight per distinct team and tag
+			print(
+				f"{vocab:>9} {2 * vocab:>10,} {args.buckets:>9,} {S.nbytes / 2**20:>9.2f} {read_s / n * 1e6:>12.2f} "
+				f"{train_s / n / args.epochs * 1e6:>16.2f} {predict_s / n * 1e6:>15.2f} {peak / 2**20:>15.1f}"
+			)
+
+
+if __name__ == "__main__":
+	main()
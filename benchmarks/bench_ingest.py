@@ -0,0 +1,47 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+from aiml_idearanker.data import build_features, load_csv, read_features
+
+from .synthetic import write_synthetic_csv
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+	best = float("inf")
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - t0)
+	return best
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="CSV ingestion: DictReader + build_features vs typed csv.reader vs parsed cache")
+	p.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+	p.add_argument("--repeat", type=int, default=3)
+	args = p.parse_args()
+	print(f"{'rows':>9} {'reader':>14} {'seconds':>8} {'rows/sec':>11} {'speedup':>8}")
+	with tempfile.TemporaryDirectory() as tmp:
+		for n in args.rows:
+			path = os.path.join(tmp, "train.csv")
+			cache = os.path.join(tmp, "train.features")
+			write_synthetic_csv(path, n, seed=n)
+			X_ref, y_ref = build_features(load_csv(path))
+			X, y = read_features(path, cache_path=cache)
+			assert X.columns == X_ref.columns and y == y_ref
+			base = None
+			for label, fn in (
+				("dictreader", lambda: build_features(load_csv(path))),
+				("typed", lambda: read_features(path)),
+				("typed+cache", lambda: read_features(path, cache_path=cache)),
+			):
+				seconds = best_of(fn, args.repeat)
+				base = base or seconds
+				print(f"{n:>9} {label:>14} {seconds:>8.3f} {n / seconds:>11.0f} {base / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+	main()
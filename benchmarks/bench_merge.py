@@ -0,0 +1,78 @@
+import argparse
+import csv
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from .synthetic import write_synthetic_csv
+
+
+def write_predictions(path: str, n: int, shuffled: bool, seed: int = 7) -> None:
+	# ids 0..n-1 in ascending order, or permuted by i -> (a*i + c) mod n (no O(n) shuffle buffer)
+	rng = random.Random(seed)
+	a = 2_654_435_761 % n if n > 1 else 1
+	while n > 1 and _gcd(a, n) != 1:
+		a += 1
+	c = rng.randrange(n) if n > 1 else 0
+	with open(path, "w", encoding="utf-8", newline="") as f:
+		w = csv.writer(f)
+		w.writerow(["idea_id", "prob_success"])
+		for i in range(n):
+			j = (a * i + c) % n if shuffled else i
+			w.writerow([f"{j:010d}", f"{rng.random():.6f}"])
+
+
+def _gcd(a: int, b: int) -> int:
+	while b:
+		a, b = b, a % b
+	return a
+
+
+def run_child(argv: List[str]) -> Tuple[float, float]:
+	# Wall seconds and peak RSS (MiB) of one cli_merge process
+	t0 = time.perf_counter()
+	proc = subprocess.Popen([sys.executable, "-m", "aiml_idearanker.cli_merge", *argv], stdout=subprocess.DEVNULL)
+	_, status, usage = os.wait4(proc.pid, 0)
+	elapsed = time.perf_counter() - t0
+	if status != 0:
+		raise RuntimeError(f"cli_merge failed: {argv}")
+	return elapsed, usage.ru_maxrss / 1024
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="cli_merge: positional (old) vs sort-merge vs in-memory / spilling hash join")
+	p.add_argument("--rows", type=int, nargs="+", default=[200_000, 1_000_000])
+	p.add_argument("--memory-mb", type=float, default=16.0, help="Hash-join budget for the spilling run")
+	p.add_argument("--tmp-dir", default=None, help="Where to write the synthetic inputs and spill files")
+	args = p.parse_args()
+	print(f"{'rows':>10} {'input MiB':>9} {'mode':>18} {'seconds':>8} {'peak RSS MiB':>12}")
+	with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp:
+		for n in args.rows:
+			inference = os.path.join(tmp, "inference.csv")
+			sorted_preds = os.path.join(tmp, "pred_sorted.csv")
+			shuffled_preds = os.path.join(tmp, "pred_shuffled.csv")
+			out = os.path.join(tmp, "merged.csv")
+			write_synthetic_csv(inference, n, seed=n, with_label=False, with_id=True)
+			write_predictions(sorted_preds, n, shuffled=False)
+			write_predictions(shuffled_preds, n, shuffled=True)
+			size = (os.path.getsize(inference) + os.path.getsize(sorted_preds)) / 2**20
+			runs = [
+				("positional (old)", ["--predictions", sorted_preds, "--key", ""]),
+				("sort-merge", ["--predictions", sorted_preds, "--method", "merge"]),
+				("hash (in memory)", ["--predictions", shuffled_preds, "--method", "hash", "--memory-mb", "100000"]),
+				("hash (spill)", ["--predictions", shuffled_preds, "--method", "hash", "--memory-mb", str(args.memory_mb)]),
+			]
+			for name, argv in runs:
+				extra = ["--tmp-dir", args.tmp_dir] if args.tmp_dir else []
+				elapsed, rss = run_child(argv + ["--inference", inference, "--output", out] + extra)
+				print(f"{n:>10} {size:>9.1f} {name:>18} {elapsed:>8.2f} {rss:>12.1f}")
+			for path in (inference, sorted_preds, shuffled_preds, out):
+				os.remove(path)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,62 @@
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from aiml_idearanker.backends import numpy_available
+from aiml_idearanker.metrics import (
+	best_threshold,
+	confusion,
+	evaluate_probs,
+	scores_from_confusion,
+	threshold_predictions,
+	threshold_table,
+)
+
+
+def synthetic_scores(n: int, seed: int = 0) -> Tuple[List[int], List[float]]:
+	# Calibrated-ish scores rounded to 4 decimals, so there are many tied probabilities
+	rng = random.Random(seed)
+	probs = [round(rng.random(), 4) for _ in range(n)]
+	return [1 if rng.random() < p else 0 for p in probs], probs
+
+
+def legacy_sweep(y: List[int], probs: List[float], n_thresholds: int) -> Tuple[float, float]:
+	# The old way: threshold_predictions + confusion for each candidate threshold, O(n * T)
+	best = (0.5, -1.0)
+	for i in range(n_thresholds + 1):
+		t = i / n_thresholds
+		f1 = scores_from_confusion(*confusion(y, threshold_predictions(probs, t)))[3]
+		if f1 > best[1]:
+			best = (t, f1)
+	return best
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Threshold sweep: per-threshold re-scoring vs sort-once table")
+	p.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+	p.add_argument("--thresholds", type=int, default=100, help="Grid size for the legacy sweep")
+	p.add_argument("--legacy-max-rows", type=int, default=1_000_000)
+	p.add_argument("--python-max-rows", type=int, default=1_000_000)
+	args = p.parse_args()
+	backends = ["python"] + (["numpy"] if numpy_available() else [])
+	print(f"{'rows':>10} {'impl':>36} {'seconds':>8} {'best f1':>8} {'auc':>6}")
+	for n in args.rows:
+		y, probs = synthetic_scores(n, seed=n)
+		if n <= args.legacy_max_rows:
+			t0 = time.perf_counter()
+			_, f1 = legacy_sweep(y, probs, args.thresholds)
+			print(f"{n:>10} {f'legacy ({args.thresholds + 1} thresholds)':>36} {time.perf_counter() - t0:>8.2f} {f1:>8.4f} {'-':>6}")
+		for backend in backends:
+			if backend == "python" and n > args.python_max_rows:
+				continue
+			t0 = time.perf_counter()
+			table = threshold_table(y, probs, backend)
+			_, f1 = best_threshold(table, "f1")
+			m = evaluate_probs(y, probs, backend=backend)
+			label = f"sort-once {backend} ({len(table['threshold'])} thresholds)"
+			print(f"{n:>10} {label:>36} {time.perf_counter() - t0:>8.2f} {f1:>8.4f} {m['auc']:>6.3f}")
+
+
+if __name__ == "__main__":
+	main()
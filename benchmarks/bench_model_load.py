@@ -0,0 +1,51 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.modelfile import load_model, save_model
+
+
+def synthetic_model(n_features: int, seed: int = 0) -> IdeaRankerModel:
+	rng = random.Random(seed)
+	m = IdeaRankerModel()
+	m.weights = [rng.gauss(0, 1) for _ in range(n_features + 1)]
+	m.scaler.means = [rng.gauss(0, 10) for _ in range(n_features)]
+	m.scaler.stds = [rng.uniform(0.5, 5) for _ in range(n_features)]
+	m.scaler.count = 1_000_000
+	m.metadata = {"epochs_run": "300", "train_loss": "0.41"}
+	return m
+
+
+def best_of(fn, repeat: int) -> float:
+	best = float("inf")
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - t0)
+	return best
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Model load time and file size: model.json vs memory-mapped binary")
+	p.add_argument("--features", type=int, nargs="+", default=[6, 10_000, 1_000_000])
+	p.add_argument("--repeat", type=int, default=5)
+	args = p.parse_args()
+	print(f"{'features':>9} {'format':>18} {'MiB':>8} {'load ms':>9}")
+	with tempfile.TemporaryDirectory() as tmp:
+		for n in args.features:
+			model = synthetic_model(n)
+			json_path = os.path.join(tmp, "model.json")
+			bin_path = os.path.join(tmp, "model.bin")
+			save_model(json_path, model)
+			save_model(bin_path, model)
+			assert load_model(bin_path).to_dict() == load_model(json_path).to_dict()
+			for label, path, verify in (("json", json_path, True), ("binary+checksum", bin_path, True), ("binary (mmap)", bin_path, False)):
+				seconds = best_of(lambda: load_model(path, verify=verify), args.repeat)
+				print(f"{n:>9} {label:>18} {os.path.getsize(path) / (1 << 20):>8.2f} {seconds * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,87 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from aiml_idearanker.portfolio import select_portfolio
+
+
+def legacy_select_portfolio(items: List[Dict[str, float]], max_weeks: int) -> List[int]:
+	# The dense (n+1) x (W+1) table as it existed in streamlit_app before the portfolio module.
+	W = max(0, int(max_weeks))
+	n = len(items)
+	dp = [[0.0] * (W + 1) for _ in range(n + 1)]
+	for i in range(1, n + 1):
+		wt = max(0, int(items[i - 1]["weeks"]))
+		val = float(items[i - 1]["value"])
+		for w in range(W + 1):
+			if wt <= w:
+				dp[i][w] = max(dp[i - 1][w], dp[i - 1][w - wt] + val)
+			else:
+				dp[i][w] = dp[i - 1][w]
+	w = W
+	chosen: List[int] = []
+	for i in range(n, 0, -1):
+		if dp[i][w] != dp[i - 1][w]:
+			chosen.append(i - 1)
+			w -= max(0, int(items[i - 1]["weeks"]))
+	chosen.reverse()
+	return chosen
+
+
+def synthetic_items(n: int, seed: int = 42) -> Tuple[List[float], List[float], List[float]]:
+	rng = random.Random(seed)
+	weeks = [float(rng.randint(1, 52)) for _ in range(n)]
+	values = [round(rng.lognormvariate(9, 1.2), 2) for _ in range(n)]
+	heads = [float(rng.randint(1, 8)) for _ in range(n)]
+	return values, weeks, heads
+
+
+def measure(fn: Callable[[], List[int]]) -> Tuple[float, int, List[int]]:
+	# Timed and traced in separate runs: tracemalloc slows allocation-heavy code several-fold.
+	gc.collect()
+	t0 = time.perf_counter()
+	chosen = fn()
+	elapsed = time.perf_counter() - t0
+	gc.collect()
+	tracemalloc.start()
+	fn()
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return elapsed, peak, chosen
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Portfolio selection: dense 2-D table vs rolling DP / greedy / branch-and-bound / FPTAS")
+	p.add_argument("--n", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+	p.add_argument("--weeks", type=int, nargs="+", default=[52, 520])
+	p.add_argument("--methods", nargs="+", default=["legacy", "dp", "greedy", "bnb"])
+	p.add_argument("--legacy-max-cells", type=int, default=5_000_000, help="Skip the dense table above this many cells")
+	p.add_argument("--headcount", type=int, default=0, help="Also apply a headcount budget (0 = weeks only)")
+	args = p.parse_args()
+	print(f"{'n':>7} {'W':>5} {'method':>7} {'seconds':>8} {'peak MiB':>9} {'value':>14} {'% of best':>9}")
+	for n in args.n:
+		values, weeks, heads = synthetic_items(n)
+		for W in args.weeks:
+			rows = []
+			for method in args.methods:
+				if method == "legacy":
+					if args.headcount or n * (W + 1) > args.legacy_max_cells:
+						continue
+					items = [{"weeks": w, "value": v} for w, v in zip(weeks, values)]
+					fn = lambda: legacy_select_portfolio(items, W)
+				elif args.headcount:
+					fn = lambda: select_portfolio(values, weeks, W, headcount=heads, max_headcount=args.headcount, method=method)
+				else:
+					fn = lambda: select_portfolio(values, weeks, W, method=method)
+				elapsed, peak, chosen = measure(fn)
+				rows.append((method, elapsed, peak, sum(values[i] for i in chosen)))
+			best = max((r[3] for r in rows), default=0.0) or 1.0
+			for method, elapsed, peak, value in rows:
+				print(f"{n:>7} {W:>5} {method:>7} {elapsed:>8.2f} {peak / 2**20:>9.1f} {value:>14,.0f} {100 * value / best:>8.2f}%")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from aiml_idearanker.data import build_features, load_csv
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.utils import save_json
+
+from .synthetic import write_synthetic_csv
+
+
+def run_child(argv: List[str]) -> Tuple[float, float]:
+	# Wall seconds and peak RSS (MiB) of one cli_predict process
+	t0 = time.perf_counter()
+	proc = subprocess.Popen([sys.executable, "-m", "aiml_idearanker.cli_predict", *argv], stdout=subprocess.DEVNULL)
+	_, status, usage = os.wait4(proc.pid, 0)
+	elapsed = time.perf_counter() - t0
+	if status != 0:
+		raise RuntimeError(f"cli_predict failed: {argv}")
+	return elapsed, usage.ru_maxrss / 1024
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Peak RSS of cli_predict: whole-file vs --chunk-size streaming (exit 1 if the streaming peak grows with the input)")
+	p.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+	p.add_argument("--chunk-size", type=int, default=5_000)
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="python")
+	p.add_argument("--tolerance-mb", type=float, default=4.0, help="Allowed growth of the streaming peak RSS from the smallest to the largest input")
+	args = p.parse_args()
+	streaming: List[Tuple[int, float]] = []
+	with tempfile.TemporaryDirectory() as tmp:
+		train_path = os.path.join(tmp, "train.csv")
+		model_path = os.path.join(tmp, "model.json")
+		write_synthetic_csv(train_path, 2_000)
+		X, y = build_features(load_csv(train_path))
+		model = IdeaRankerModel(backend="python")
+		model.fit(X, y, epochs=50)
+		save_json(model_path, model.to_dict())
+		print(f"{'rows':>9} {'mode':>10} {'seconds':>8} {'peak RSS MiB':>12}")
+		for n in sorted(args.rows):
+			input_path = os.path.join(tmp, f"infer_{n}.csv")
+			output_path = os.path.join(tmp, f"pred_{n}.csv")
+			write_synthetic_csv(input_path, n, seed=n, with_label=False)
+			for mode, chunk in (("full", 0), ("streaming", args.chunk_size)):
+				argv = ["--model", model_path, "--input", input_path, "--output", output_path, "--backend", args.backend, "--chunk-size", str(chunk)]
+				elapsed, rss = run_child(argv)
+				print(f"{n:>9} {mode:>10} {elapsed:>8.2f} {rss:>12.1f}")
+				if chunk:
+					streaming.append((n, rss))
+			os.remove(input_path)
+			os.remove(output_path)
+	(n0, rss0), (n1, rss1) = streaming[0], streaming[-1]
+	growth = rss1 - rss0
+	print(f"streaming peak RSS grew {growth:+.1f} MiB from {n0} to {n1} rows (tolerance {args.tolerance_mb:g} MiB)")
+	if growth > args.tolerance_mb:
+		raise SystemExit(1)
+
+
+if __name__ == "__main__":
+	main()
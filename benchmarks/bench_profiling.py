@@ -0,0 +1,75 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+from aiml_idearanker import profiling
+from aiml_idearanker.data import read_features
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.pricing import optimize_revenue_batch
+
+from .synthetic import write_synthetic_csv
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+	best = float("inf")
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - t0)
+	return best
+
+
+def per_call_overhead(calls: int = 1_000_000) -> float:
+	# Seconds added to each call of a @profiled function while profiling is off
+	def raw(x: int) -> int:
+		return x
+
+	wrapped = profiling.profiled("noop")(raw)
+	t_raw = best_of(lambda: [raw(i) for i in range(calls)], 3)
+	t_wrapped = best_of(lambda: [wrapped(i) for i in range(calls)], 3)
+	return (t_wrapped - t_raw) / calls
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Cost of the profiling layer: disabled spans vs --profile with and without tracemalloc")
+	p.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+	p.add_argument("--epochs", type=int, default=50)
+	p.add_argument("--chunk", type=int, default=1000, help="Rows per predict call (small chunks = many spans)")
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	p.add_argument("--repeat", type=int, default=3)
+	args = p.parse_args()
+	print(f"disabled @profiled overhead: {per_call_overhead() * 1e9:.0f} ns/call")
+	print(f"{'rows':>9} {'mode':>10} {'seconds':>8} {'overhead':>9}")
+	with tempfile.TemporaryDirectory() as tmp:
+		for n in args.rows:
+			path = os.path.join(tmp, "train.csv")
+			write_synthetic_csv(path, n, seed=n)
+
+			def workload() -> None:
+				X, y = read_features(path)
+				model = IdeaRankerModel(backend=args.backend)
+				model.fit(X, y, epochs=args.epochs, copy=False)
+				for start in range(0, n, args.chunk):
+					part = X.take(range(start, min(n, start + args.chunk)))
+					probs = model.predict_proba(part, copy=False)
+					optimize_revenue_batch(probs, part.columns[2])
+
+			base = None
+			for mode in ("off", "on", "on+memory"):
+				def run() -> None:
+					if mode != "off":
+						profiling.start(memory=mode == "on+memory")
+					try:
+						workload()
+					finally:
+						profiling.stop()
+
+				seconds = best_of(run, args.repeat)
+				base = base or seconds
+				print(f"{n:>9} {mode:>10} {seconds:>8.3f} {seconds / base - 1:>+8.1%}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aiml_idearanker.backends import numpy_available
+from aiml_idearanker.cli_serve import MicroBatcher, ModelHolder, ScoringServer
+from aiml_idearanker.data import load_csv, read_features, read_hashed_features
+from aiml_idearanker.hashing import HashConfig, SparseRows
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.modelfile import save_model
+from aiml_idearanker.scorer import PRECISIONS, REFERENCE, compare, compile_model
+
+from .bench_hashing import add_categoricals
+from .synthetic import write_synthetic_csv
+
+# Written predictions carry 6 decimals, so file outputs may differ by one unit in the last place
+FILE_TOLERANCE = 1e-6
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+	best = float("inf")
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - t0)
+	return best
+
+
+def read_probs(path: str) -> List[float]:
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		return [float(r["prob_success"]) for r in csv.DictReader(f)]
+
+
+def max_delta(a: List[float], b: List[float]) -> float:
+	if len(a) != len(b):
+		return float("inf")
+	return max((abs(x - y) for x, y in zip(a, b)), default=0.0)
+
+
+def split_csv(path: str, directory: str, parts: int) -> None:
+	os.makedirs(directory, exist_ok=True)
+	with open(path, "r", encoding="utf-8", newline="") as f:
+		header, *rows = list(csv.reader(f))
+	size = -(-len(rows) // parts)
+	for i in range(parts):
+		with open(os.path.join(directory, f"part{i}.csv"), "w", encoding="utf-8", newline="") as f:
+			w = csv.writer(f)
+			w.writerow(header)
+			w.writerows(rows[i * size:(i + 1) * size])
+
+
+def predict_cli(argv: List[str]) -> None:
+	subprocess.run([sys.executable, "-m", "aiml_idearanker.cli_predict", *argv], check=True, stdout=subprocess.DEVNULL)
+
+
+def cli_deltas(model_path: str, input_path: str, tmp: str, shards: int = 3) -> Dict[str, float]:
+	# cli_predict at --precision reference vs float64: whole file, --chunk-size streaming, and
+	# --shards (batch._score_shard in worker processes)
+	shard_dir = os.path.join(tmp, "shards")
+	split_csv(input_path, shard_dir, shards)
+	out: Dict[str, List[List[float]]] = {"file": [], "chunked": [], "shards": []}
+	for precision in (REFERENCE, "float64"):
+		path = os.path.join(tmp, f"pred_{precision}.csv")
+		out_dir = os.path.join(tmp, f"out_{precision}")
+		predict_cli(["--model", model_path, "--input", input_path, "--output", path, "--precision", precision])
+		out["file"].append(read_probs(path))
+		predict_cli(["--model", model_path, "--input", input_path, "--output", path, "--precision", precision, "--chunk-size", "997"])
+		out["chunked"].append(read_probs(path))
+		predict_cli(["--model", model_path, "--shards", shard_dir, "--output-dir", out_dir, "--precision", precision, "--workers", "2"])
+		out["shards"].append([p for i in range(shards) for p in read_probs(os.path.join(out_dir, f"part{i}.predictions.csv"))])
+	return {name: max_delta(ref, got) for name, (ref, got) in out.items()}
+
+
+def serve_probs(model_path: str, precision: str, bodies: List[bytes]) -> List[float]:
+	# Concurrent /score requests through ScoringServer.dispatch, so MicroBatcher coalesces them
+	async def run() -> List[float]:
+		holder = ModelHolder(model_path, precision=precision)
+		batcher = MicroBatcher(holder, max_wait_ms=5.0)
+		server = ScoringServer(holder, batcher)
+		task = asyncio.create_task(batcher.run())
+		try:
+			responses = await asyncio.gather(*(server.dispatch("POST", "/score", b) for b in bodies))
+		finally:
+			task.cancel()
+		probs: List[float] = []
+		for status, payload in responses:
+			if status != 200:
+				raise RuntimeError(f"/score returned {status}: {payload}")
+			probs.extend(r["prob_success"] for r in payload["results"])
+		return probs
+	return asyncio.run(run())
+
+
+def check_paths(tmp: str, rows: int, tolerance: float) -> bool:
+	# float64 scorer vs the reference model on every scoring path, for a dense and a hashed model
+	work = os.path.join(tmp, "paths")
+	os.makedirs(work)
+	base, data = os.path.join(work, "base.csv"), os.path.join(work, "hashed.csv")
+	write_synthetic_csv(base, rows, seed=3)
+	add_categoricals(base, data, 200, 3, seed=4)
+	config = HashConfig.from_specs(["team", "tags:|"], n_buckets=4096)
+	ideas = load_csv(data)[:600]
+	bodies = [json.dumps({"ideas": ideas[i:i + 1 + i % 7]}).encode("utf-8") for i in range(0, len(ideas), 7)]
+	ok = True
+	print(f"\n{'model':>7} {'path':>16} {'max delta':>10} {'tolerance':>10}")
+	for name in ("dense", "hashed"):
+		X, y, S = read_hashed_features(data, config)
+		sparse: Optional[SparseRows] = S if name == "hashed" else None
+		model = IdeaRankerModel(backend="python")
+		if sparse is not None:
+			model.hashing = config
+		model.fit(X, y, epochs=30, sparse=sparse)
+		checks: List[Tuple[str, float, float]] = []
+		for backend in ["python"] + (["numpy"] if numpy_available() else []):
+			model.backend = backend
+			c = compare(model, compile_model(model, "float64"), X, y, sparse)
+			checks.append((f"in-memory {backend}", c["max_abs_delta"], tolerance))
+		model.backend = "python"
+		model_path = os.path.join(work, f"{name}.json")
+		save_model(model_path, model)
+		for path, delta in cli_deltas(model_path, data, os.path.join(work, name)).items():
+			checks.append((f"cli {path}", delta, FILE_TOLERANCE))
+		checks.append(("serve", max_delta(serve_probs(model_path, REFERENCE, bodies), serve_probs(model_path, "float64", bodies)), tolerance))
+		for path, delta, limit in checks:
+			failed = delta > limit * (1 + 1e-9)
+			ok = ok and not failed
+			print(f"{name:>7} {path:>16} {delta:>10.2e} {limit:>10.0e}" + ("  FAIL" if failed else ""))
+	return ok
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Compiled scorer (scaler folded into the weights) vs IdeaRankerModel.predict_proba: speed and accuracy deltas per precision")
+	p.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+	p.add_argument("--train-rows", type=int, default=20_000)
+	p.add_argument("--epochs", type=int, default=100)
+	p.add_argument("--repeat", type=int, default=3)
+	p.add_argument("--tolerance", type=float, default=1e-12, help="float64 must match the model within this (exit 1 otherwise)")
+	p.add_argument("--check-rows", type=int, default=5_000, help="Rows for the path checks: dense and hashed model, in memory, through cli_predict (file, --chunk-size, --shards) and serve (0 = skip)")
+	args = p.parse_args()
+	backends = ["python"] + (["numpy"] if numpy_available() else [])
+	failed = False
+	print(f"{'rows':>9} {'backend':>8} {'scorer':>9} {'seconds':>8} {'speedup':>8} {'max delta':>10} {'auc delta':>10} {'flipped':>8}")
+	with tempfile.TemporaryDirectory() as tmp:
+		train = os.path.join(tmp, "train.csv")
+		write_synthetic_csv(train, args.train_rows, seed=1)
+		X, y = read_features(train)
+		model = IdeaRankerModel(backend="python")
+		model.fit(X, y, epochs=args.epochs, copy=False)
+		for n in args.rows:
+			path = os.path.join(tmp, "score.csv")
+			write_synthetic_csv(path, n, seed=n)
+			X, y = read_features(path)
+			for backend in backends:
+				model.backend = backend
+				ref = best_of(lambda: model.predict_proba(X), args.repeat)
+				print(f"{n:>9} {backend:>8} {'reference':>9} {ref:>8.3f} {1.0:>7.1f}x")
+				for precision in PRECISIONS:
+					scorer = compile_model(model, precision)
+					seconds = best_of(lambda: scorer.predict_proba(X), args.repeat)
+					c = compare(model, scorer, X, y)
+					print(f"{n:>9} {backend:>8} {precision:>9} {seconds:>8.3f} {ref / seconds:>7.1f}x {c['max_abs_delta']:>10.2e} {c['auc_delta']:>10.2e} {int(c['flipped']):>8}")
+					if precision == "float64" and c["max_abs_delta"] > args.tolerance:
+						failed = True
+		if failed:
+			print(f"float64 scorer differs from the model by more than {args.tolerance:g}")
+		if args.check_rows > 0 and not check_paths(tmp, args.check_rows, args.tolerance):
+			print("float64 scorer differs from the reference on a scoring path (FAIL above)")
+			failed = True
+	if failed:
+		raise SystemExit(1)
+
+
+if __name__ == "__main__":
+	main()
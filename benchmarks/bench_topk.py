@@ -0,0 +1,69 @@
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from aiml_idearanker.batch import score_file
+from aiml_idearanker.data import build_features, load_csv
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.topk import top_k_file, write_top_k
+
+from .synthetic import write_synthetic_csv
+
+
+def full_then_sort(model: IdeaRankerModel, path: str, out: str, k: int, chunk_size: int) -> None:
+	# The old flow: write every prediction, then sort the whole file downstream and keep the head
+	score_file(model, path, out, chunk_size)
+	with open(out, "r", encoding="utf-8", newline="") as f:
+		rows = list(csv.DictReader(f))
+	rows.sort(key=lambda r: -float(r["prob_success"]))
+	with open(out, "w", encoding="utf-8", newline="") as f:
+		w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+		w.writeheader()
+		w.writerows(rows[:k])
+
+
+def heap_top_k(model: IdeaRankerModel, path: str, out: str, k: int, chunk_size: int) -> None:
+	top, _ = top_k_file(model, path, k, chunk_size=chunk_size)
+	write_top_k(out, top.ranked(), "idea_id")
+
+
+def measure(fn: Callable[[], None]) -> Tuple[float, float]:
+	# Timed and traced in separate runs: tracemalloc slows allocation-heavy code several-fold
+	t0 = time.perf_counter()
+	fn()
+	elapsed = time.perf_counter() - t0
+	tracemalloc.start()
+	fn()
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return elapsed, peak / (1 << 20)
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="cli_predict: full output + downstream sort vs --top-k bounded heap")
+	p.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+	p.add_argument("--k", type=int, default=1_000)
+	p.add_argument("--chunk-size", type=int, default=50_000)
+	args = p.parse_args()
+	with tempfile.TemporaryDirectory() as tmp:
+		train_path = os.path.join(tmp, "train.csv")
+		write_synthetic_csv(train_path, 2_000)
+		X, y = build_features(load_csv(train_path))
+		model = IdeaRankerModel(backend="python")
+		model.fit(X, y, epochs=50)
+		print(f"{'rows':>9} {'mode':>14} {'seconds':>8} {'peak MiB':>9}")
+		for n in args.rows:
+			path = os.path.join(tmp, "inference.csv")
+			write_synthetic_csv(path, n, seed=n, with_label=False, with_id=True)
+			for label, fn in (("full + sort", full_then_sort), ("top-k heap", heap_top_k)):
+				out = os.path.join(tmp, "out.csv")
+				seconds, peak = measure(lambda: fn(model, path, out, args.k, args.chunk_size))
+				print(f"{n:>9} {label:>14} {seconds:>8.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,37 @@
+import argparse
+import time
+
+from aiml_idearanker.data import build_features, train_val_split
+from aiml_idearanker.model import IdeaRankerModel
+
+from .synthetic import synthetic_rows
+
+
+CONFIGS = [
+	("full-batch gd", 0.1, dict(optimizer="gd", batch_size=0, patience=0)),
+	("full-batch gd + early stop", 0.1, dict(optimizer="gd", batch_size=0, patience=5)),
+	("sgd momentum b=1024", 0.05, dict(optimizer="momentum", batch_size=1024, patience=5)),
+	("sgd adam b=1024", 0.01, dict(optimizer="adam", batch_size=1024, patience=5)),
+]
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Training time vs final validation loss for each optimizer")
+	p.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+	p.add_argument("--epochs", type=int, default=300)
+	p.add_argument("--backend", default="auto")
+	args = p.parse_args()
+	print(f"{'rows':>9} {'config':>28} {'seconds':>8} {'epochs':>7} {'val_loss':>9}")
+	for n in args.rows:
+		X, y = build_features(synthetic_rows(n))
+		X_train, y_train, X_val, y_val = train_val_split(X, y, val_ratio=0.2)
+		for name, lr, opts in CONFIGS:
+			model = IdeaRankerModel(backend=args.backend)
+			t0 = time.perf_counter()
+			model.fit(X_train, y_train, lr=lr, epochs=args.epochs, X_val=X_val, y_val=y_val, **opts)
+			elapsed = time.perf_counter() - t0
+			print(f"{n:>9} {name:>28} {elapsed:>8.2f} {model.metadata['epochs_run']:>7} {float(model.metadata['val_loss']):>9.5f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from aiml_idearanker.data import read_features
+from aiml_idearanker.metrics import evaluate_probs
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.modelfile import load_model, save_model
+
+from .synthetic import write_synthetic_csv
+
+
+def concat_csv(out: str, *paths: str) -> None:
+	with open(out, "w", encoding="utf-8", newline="") as f:
+		for i, path in enumerate(paths):
+			with open(path, "r", encoding="utf-8", newline="") as src:
+				if i:
+					next(src)
+				shutil.copyfileobj(src, f)
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Time to refresh a model with a new batch: full retrain on all history vs warm start (partial_fit) on the batch only")
+	p.add_argument("--history", type=int, nargs="+", default=[100_000, 1_000_000], help="Rows the existing model was trained on")
+	p.add_argument("--batch", type=int, default=5_000, help="New labelled rows")
+	p.add_argument("--val", type=int, default=20_000)
+	p.add_argument("--epochs", type=int, default=100, help="Epochs of the full retrain (and of the original model)")
+	p.add_argument("--warm-epochs", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+	p.add_argument("--tolerance", type=float, default=0.001, help="Val log-loss within this of the full retrain counts as equal")
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	args = p.parse_args()
+	print(f"{'history':>9} {'mode':>14} {'seconds':>8} {'val_loss':>9} {'auc':>6} {'speedup':>8}")
+	with tempfile.TemporaryDirectory() as tmp:
+		val_path, batch_path = os.path.join(tmp, "val.csv"), os.path.join(tmp, "batch.csv")
+		write_synthetic_csv(val_path, args.val, seed=1)
+		write_synthetic_csv(batch_path, args.batch, seed=2)
+		X_val, y_val = read_features(val_path)
+		for n in args.history:
+			history, combined, base_path = (os.path.join(tmp, name) for name in ("history.csv", "all.csv", "model.json"))
+			write_synthetic_csv(history, n, seed=n)
+			concat_csv(combined, history, batch_path)
+			X, y = read_features(history)
+			base = IdeaRankerModel(backend=args.backend)
+			base.fit(X, y, epochs=args.epochs, copy=False)
+			save_model(base_path, base)
+
+			# Full retrain: read every row again and train from zeros
+			t0 = time.perf_counter()
+			X, y = read_features(combined)
+			full = IdeaRankerModel(backend=args.backend)
+			full.fit(X, y, epochs=args.epochs, copy=False)
+			full_seconds = time.perf_counter() - t0
+			full_m = evaluate_probs(y_val, full.predict_proba(X_val))
+			print(f"{n:>9} {'full retrain':>14} {full_seconds:>8.3f} {full_m['log_loss']:>9.5f} {full_m['auc']:>6.3f} {1.0:>7.1f}x")
+
+			# Warm start: load the saved model, read only the batch, bounded passes over it
+			matched = False
+			for epochs in args.warm_epochs:
+				t0 = time.perf_counter()
+				model = load_model(base_path)
+				model.backend = base.backend
+				Xb, yb = read_features(batch_path)
+				model.partial_fit(Xb, yb, epochs=epochs, copy=False)
+				seconds = time.perf_counter() - t0
+				m = evaluate_probs(y_val, model.predict_proba(X_val))
+				equal = m["log_loss"] <= full_m["log_loss"] + args.tolerance
+				mark = "  <- matches full" if equal and not matched else ""
+				matched = matched or equal
+				print(f"{n:>9} {f'warm e={epochs}':>14} {seconds:>8.3f} {m['log_loss']:>9.5f} {m['auc']:>6.3f} {full_seconds / seconds:>7.1f}x{mark}")
+			for path in (history, combined, base_path):
+				os.remove(path)
+
+
+if __name__ == "__main__":
+	main()
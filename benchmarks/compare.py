@@ -0,0 +1,71 @@
+import argparse
+from typing import Any, Dict, List, Tuple
+
+from .suite import load_results
+
+
+# Diffs two benchmarks.suite result files by (bench, rows). A bench regresses when its best time
+# grows by more than --tolerance (relative); timings under --min-seconds are too noisy to judge.
+# Exits with status 1 on any regression so it can gate CI.
+
+ENV_KEYS = ["python", "implementation", "machine", "cpu_count", "backend", "numpy"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float, min_seconds: float) -> List[Dict[str, Any]]:
+	base = {(r["bench"], r["rows"]): r for r in baseline["results"]}
+	cur = {(r["bench"], r["rows"]): r for r in current["results"]}
+	rows: List[Dict[str, Any]] = []
+	for key in sorted(set(base) | set(cur)):
+		b, c = base.get(key), cur.get(key)
+		entry: Dict[str, Any] = {"bench": key[0], "rows": key[1], "baseline": None, "current": None, "change": None}
+		if b is None:
+			entry.update(current=c["seconds"], status="new")  # type: ignore[index]
+		elif c is None:
+			entry.update(baseline=b["seconds"], status="missing")
+		else:
+			change = c["seconds"] / b["seconds"] - 1.0 if b["seconds"] > 0 else 0.0
+			if max(b["seconds"], c["seconds"]) < min_seconds:
+				status = "noise"
+			elif change > tolerance:
+				status = "REGRESSION"
+			elif change < -tolerance:
+				status = "improved"
+			else:
+				status = "ok"
+			entry.update(baseline=b["seconds"], current=c["seconds"], change=change, status=status)
+		rows.append(entry)
+	return rows
+
+
+def environment_diff(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Tuple[str, object, object]]:
+	b, c = baseline.get("environment", {}), current.get("environment", {})
+	return [(k, b.get(k), c.get(k)) for k in ENV_KEYS if b.get(k) != c.get(k)]
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Compare benchmark results against a baseline and flag regressions")
+	p.add_argument("baseline", help="Stored results JSON (from benchmarks.suite)")
+	p.add_argument("current", help="New results JSON")
+	p.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown before flagging (0.10 = 10%%)")
+	p.add_argument("--min-seconds", type=float, default=0.01, help="Ignore benches faster than this in both runs")
+	args = p.parse_args()
+	baseline, current = load_results(args.baseline), load_results(args.current)
+	for key, old, new in environment_diff(baseline, current):
+		print(f"warning: environment differs: {key} {old} -> {new}")
+	if baseline.get("config") != current.get("config"):
+		print(f"warning: config differs: {baseline.get('config')} -> {current.get('config')}")
+	rows = compare(baseline, current, args.tolerance, args.min_seconds)
+	print(f"{'bench':>10} {'rows':>10} {'baseline s':>11} {'current s':>10} {'change':>8}  status")
+	for r in rows:
+		fmt = lambda v: f"{v:.4f}" if v is not None else "-"
+		change = f"{r['change']:+.1%}" if r["change"] is not None else "-"
+		print(f"{r['bench']:>10} {r['rows']:>10} {fmt(r['baseline']):>11} {fmt(r['current']):>10} {change:>8}  {r['status']}")
+	regressions = [r for r in rows if r["status"] == "REGRESSION"]
+	if regressions:
+		print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+		raise SystemExit(1)
+	print(f"No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+from .synthetic import synthetic_rows
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str, body: bytes) -> int:
+	writer.write(
+		f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+		f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+	)
+	await writer.drain()
+	status = int((await reader.readline()).split()[1])
+	length = 0
+	while True:
+		line = await reader.readline()
+		if line in (b"\r\n", b""):
+			break
+		if line.lower().startswith(b"content-length:"):
+			length = int(line.split(b":")[1])
+	await reader.readexactly(length)
+	return status
+
+
+async def _client(host: str, port: int, path: str, bodies: List[bytes], latencies: List[float], errors: List[int]) -> None:
+	reader, writer = await asyncio.open_connection(host, port)
+	try:
+		for body in bodies:
+			t0 = time.perf_counter()
+			status = await _request(reader, writer, host, path, body)
+			latencies.append(time.perf_counter() - t0)
+			if status != 200:
+				errors.append(status)
+	finally:
+		writer.close()
+
+
+async def _wait_ready(host: str, port: int, timeout: float = 15.0) -> None:
+	deadline = time.monotonic() + timeout
+	while True:
+		try:
+			_, writer = await asyncio.open_connection(host, port)
+			writer.close()
+			return
+		except OSError:
+			if time.monotonic() > deadline:
+				raise
+			await asyncio.sleep(0.1)
+
+
+async def check_isolation(host: str, port: int, concurrency: int = 8) -> None:
+	# Concurrent requests are coalesced into one batch; a malformed one must get its own 400
+	# without failing the valid requests batched with it
+	good = [json.dumps({"ideas": [idea]}).encode("utf-8") for idea in synthetic_rows(concurrency, with_label=False)]
+	bad = json.dumps({"ideas": [{"novelty_score": "abc"}]}).encode("utf-8")
+	connections = [await asyncio.open_connection(host, port) for _ in range(concurrency + 1)]
+	try:
+		statuses = await asyncio.gather(*(
+			_request(reader, writer, host, "/score", body) for (reader, writer), body in zip(connections, [bad] + good)
+		))
+	finally:
+		for _, writer in connections:
+			writer.close()
+	if statuses[0] != 400 or any(s != 200 for s in statuses[1:]):
+		raise SystemExit(f"Isolation check failed: malformed request -> {statuses[0]}, valid requests -> {statuses[1:]}")
+	print(f"isolation: malformed request -> 400, {concurrency} concurrent valid requests -> 200")
+
+
+async def run(args: argparse.Namespace) -> None:
+	ideas = list(synthetic_rows(args.ideas_per_request * 64, with_label=False))
+	bodies = [
+		json.dumps({"ideas": ideas[(i * args.ideas_per_request) % len(ideas):][:args.ideas_per_request]}).encode("utf-8")
+		for i in range(args.requests)
+	]
+	await _wait_ready(args.host, args.port)
+	await check_isolation(args.host, args.port)
+	latencies: List[float] = []
+	errors: List[int] = []
+	per_client = [bodies[i::args.concurrency] for i in range(args.concurrency)]
+	t0 = time.perf_counter()
+	await asyncio.gather(*(_client(args.host, args.port, args.endpoint, b, latencies, errors) for b in per_client if b))
+	elapsed = time.perf_counter() - t0
+	latencies.sort()
+	p50 = latencies[len(latencies) // 2] * 1000
+	p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+	print(f"requests={len(latencies)} concurrency={args.concurrency} ideas/request={args.ideas_per_request} errors={len(errors)}")
+	print(f"p50={p50:.2f}ms p99={p99:.2f}ms throughput={len(latencies) / elapsed:.0f} req/s ({len(latencies) * args.ideas_per_request / elapsed:.0f} ideas/s)")
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Load-test cli_serve: p50/p99 latency and requests/sec")
+	p.add_argument("--host", default="127.0.0.1")
+	p.add_argument("--port", type=int, default=8000)
+	p.add_argument("--endpoint", default="/score", choices=["/score", "/score_price"])
+	p.add_argument("--requests", type=int, default=5000)
+	p.add_argument("--concurrency", type=int, default=64)
+	p.add_argument("--ideas-per-request", type=int, default=1)
+	p.add_argument("--spawn-model", default="", help="Start a cli_serve subprocess for this model.json first")
+	args = p.parse_args()
+	proc = None
+	if args.spawn_model:
+		proc = subprocess.Popen(
+			[sys.executable, "-m", "aiml_idearanker.cli_serve", "--model", args.spawn_model, "--host", args.host, "--port", str(args.port)],
+			stdout=subprocess.DEVNULL,
+			env=dict(os.environ),
+		)
+	try:
+		asyncio.run(run(args))
+	finally:
+		if proc is not None:
+			proc.terminate()
+			proc.wait()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from aiml_idearanker.backends import numpy_available, resolve_backend
+from aiml_idearanker.data import read_features
+from aiml_idearanker.join import join_files
+from aiml_idearanker.model import IdeaRankerModel
+from aiml_idearanker.portfolio import select_portfolio
+from aiml_idearanker.pricing import optimize_revenue_batch
+
+from .bench_merge import write_predictions
+from .synthetic import ID_COLUMN, write_synthetic_csv
+
+
+# Fixed-workload timings of the core hot paths on synthetic data, written as JSON so that
+# benchmarks.compare can diff a run against a stored baseline. Inputs are generated once per
+# (rows, seed) into --data-dir and reused, so repeated runs time the same bytes. Each bench reports
+# the best of --repeat runs (least sensitive to noise) plus the median and every run.
+
+BENCHES = ["ingest", "train", "predict", "pricing", "merge", "portfolio"]
+RESULTS_VERSION = 1
+
+
+def time_runs(fn: Callable[[], object], repeat: int) -> List[float]:
+	runs = []
+	for _ in range(max(1, repeat)):
+		t0 = time.perf_counter()
+		fn()
+		runs.append(time.perf_counter() - t0)
+	return runs
+
+
+def dataset(data_dir: str, kind: str, n: int, seed: int) -> str:
+	# kind: "train" (labelled), "inference" (ascending ids, no label) or "predictions" (shuffled ids)
+	path = os.path.join(data_dir, f"{kind}_{n}_{seed}.csv")
+	if not os.path.exists(path):
+		tmp = path + ".tmp"
+		if kind == "predictions":
+			write_predictions(tmp, n, shuffled=True, seed=seed)
+		else:
+			write_synthetic_csv(tmp, n, seed=seed, with_label=kind == "train", with_id=kind == "inference")
+		os.replace(tmp, path)
+	return path
+
+
+def environment(backend: str) -> Dict[str, Any]:
+	env: Dict[str, Any] = {
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"platform": platform.platform(),
+		"machine": platform.machine(),
+		"cpu_count": os.cpu_count(),
+		"backend": backend,
+		"numpy": None,
+		"commit": None,
+	}
+	if numpy_available():
+		import numpy as np
+		env["numpy"] = np.__version__
+	try:
+		out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10)
+		if out.returncode == 0:
+			env["commit"] = out.stdout.strip()
+	except (OSError, subprocess.SubprocessError):
+		pass
+	return env
+
+
+def load_results(path: str) -> Dict[str, Any]:
+	with open(path, "r", encoding="utf-8") as f:
+		payload = json.load(f)
+	if payload.get("version") != RESULTS_VERSION:
+		raise ValueError(f"{path}: unsupported results version {payload.get('version')}")
+	return payload
+
+
+def run_size(n: int, args: argparse.Namespace, backend: str, data_dir: str) -> List[Dict[str, Any]]:
+	results: List[Dict[str, Any]] = []
+	selected = set(args.only or BENCHES)
+
+	def record(bench: str, fn: Callable[[], object]) -> None:
+		if bench not in selected:
+			return
+		runs = time_runs(fn, args.repeat)
+		best = min(runs)
+		results.append({
+			"bench": bench,
+			"rows": n,
+			"seconds": best,
+			"median": statistics.median(runs),
+			"runs": runs,
+			"rows_per_sec": n / best if best > 0 else None,
+		})
+		print(f"{bench:>10} {n:>10} {best:>9.4f} {statistics.median(runs):>9.4f} {n / best if best > 0 else 0:>13,.0f}", flush=True)
+
+	train_path = dataset(data_dir, "train", n, args.seed)
+	record("ingest", lambda: read_features(train_path))
+	X, y = read_features(train_path)
+	record("train", lambda: IdeaRankerModel(backend=backend).fit(X, y, epochs=args.epochs))
+	model = IdeaRankerModel(backend=backend)
+	model.fit(X, y, epochs=args.epochs)
+	record("predict", lambda: model.predict_proba(X))
+	probs = model.predict_proba(X)
+	users, weeks = X.columns[2], X.columns[3]
+	record("pricing", lambda: optimize_revenue_batch(probs, users, unit_cost=args.unit_cost))
+	if "merge" in selected:
+		inference = dataset(data_dir, "inference", n, args.seed)
+		predictions = dataset(data_dir, "predictions", n, args.seed)
+		# Shuffled predictions: the hash join path, spilling when the build side exceeds --memory-mb
+		record("merge", lambda: sum(1 for _ in join_files(
+			inference, predictions, ID_COLUMN, ["projected_users"], ["prob_success"],
+			memory_mb=args.memory_mb, tmp_dir=data_dir,
+		)))
+	values = optimize_revenue_batch(probs, users, unit_cost=args.unit_cost)["expected_profit"]
+	record("portfolio", lambda: select_portfolio(values, weeks, args.max_weeks))
+	return results
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Benchmark suite: ingestion, training, prediction, pricing, merge and portfolio selection -> JSON results")
+	p.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000], help="Dataset sizes (1k to 10M rows)")
+	p.add_argument("--only", nargs="+", choices=BENCHES, default=None, help="Run only these benches")
+	p.add_argument("--repeat", type=int, default=3)
+	p.add_argument("--epochs", type=int, default=20, help="Training epochs per train run (and for the model used by predict)")
+	p.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto")
+	p.add_argument("--unit-cost", type=float, default=1.0)
+	p.add_argument("--max-weeks", type=int, default=52, help="Portfolio week budget")
+	p.add_argument("--memory-mb", type=float, default=256.0, help="Hash-join memory budget for the merge bench")
+	p.add_argument("--seed", type=int, default=42)
+	p.add_argument("--data-dir", default="", help="Keep generated inputs here and reuse them across runs (default: a temp dir)")
+	p.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+	args = p.parse_args()
+	backend = resolve_backend(args.backend)
+	print(f"{'bench':>10} {'rows':>10} {'best s':>9} {'median s':>9} {'rows/sec':>13}")
+	results: List[Dict[str, Any]] = []
+	with tempfile.TemporaryDirectory() as tmp:
+		data_dir = args.data_dir or tmp
+		os.makedirs(data_dir, exist_ok=True)
+		for n in args.rows:
+			results.extend(run_size(n, args, backend, data_dir))
+	payload = {
+		"version": RESULTS_VERSION,
+		"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+		"command": sys.argv,
+		"environment": environment(backend),
+		"config": {
+			"repeat": args.repeat,
+			"epochs": args.epochs,
+			"unit_cost": args.unit_cost,
+			"max_weeks": args.max_weeks,
+			"memory_mb": args.memory_mb,
+			"seed": args.seed,
+		},
+		"results": results,
+	}
+	dirname = os.path.dirname(args.output)
+	if dirname:
+		os.makedirs(dirname, exist_ok=True)
+	with open(args.output, "w", encoding="utf-8") as f:
+		json.dump(payload, f, indent=2)
+	print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+	main()
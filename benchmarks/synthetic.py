@@ -0,0 +1,59 @@
+import argparse
+import csv
+import math
+import random
+from typing import Dict, Iterator
+
+from aiml_idearanker.data import FEATURE_COLUMNS, LABEL_COLUMN
+
+ID_COLUMN = "idea_id"
+
+
+def synthetic_rows(n: int, seed: int = 42, with_label: bool = True, with_id: bool = False) -> Iterator[Dict[str, str]]:
+	# Rows shaped like sample_data.csv; label drawn from a logistic model of the features.
+	# with_id adds a zero-padded idea_id (string order == numeric order), ascending.
+	rng = random.Random(seed)
+	for i in range(n):
+		novelty = rng.random()
+		feasibility = rng.random()
+		users = int(rng.lognormvariate(9.5, 1.0))
+		weeks = rng.randint(2, 26)
+		prior = rng.random()
+		row = {
+			"novelty_score": f"{novelty:.3f}",
+			"feasibility_score": f"{feasibility:.3f}",
+			"projected_users": str(users),
+			"est_dev_weeks": str(weeks),
+			"prior_similar_success_rate": f"{prior:.3f}",
+		}
+		if with_id:
+			row[ID_COLUMN] = f"{i:010d}"
+		if with_label:
+			z = 1.5 * novelty + 1.0 * feasibility + 0.4 * math.log1p(users) - 0.15 * weeks + 1.2 * prior - 3.5
+			row[LABEL_COLUMN] = "1" if rng.random() < 1.0 / (1.0 + math.exp(-z)) else "0"
+		yield row
+
+
+def write_synthetic_csv(path: str, n: int, seed: int = 42, with_label: bool = True, with_id: bool = False) -> None:
+	fields = ([ID_COLUMN] if with_id else []) + FEATURE_COLUMNS + ([LABEL_COLUMN] if with_label else [])
+	with open(path, "w", encoding="utf-8", newline="") as f:
+		w = csv.DictWriter(f, fieldnames=fields)
+		w.writeheader()
+		for row in synthetic_rows(n, seed=seed, with_label=with_label, with_id=with_id):
+			w.writerow(row)
+
+
+def main() -> None:
+	p = argparse.ArgumentParser(description="Write a synthetic CSV with the sample_data.csv schema")
+	p.add_argument("--rows", type=int, required=True)
+	p.add_argument("--output", required=True)
+	p.add_argument("--seed", type=int, default=42)
+	p.add_argument("--no-label", action="store_true", help="Inference-style file without the label column")
+	p.add_argument("--with-id", action="store_true", help=f"Add an ascending {ID_COLUMN} column")
+	args = p.parse_args()
+	write_synthetic_csv(args.output, args.rows, seed=args.seed, with_label=not args.no_label, with_id=args.with_id)
+	print(f"Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,16 +1,95 @@
+import hashlib
 import io
-import json
-import csv
-from typing import List, Dict
+import os
+from typing import Dict, Optional, Tuple
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import altair as alt
 
-from aiml_idearanker.data import build_features, FEATURE_COLUMNS
+from aiml_idearanker.columnar import FeatureMatrix
+from aiml_idearanker.data import FEATURE_COLUMNS, INT_COLUMNS
 from aiml_idearanker.model import IdeaRankerModel
-from aiml_idearanker.pricing import optimize_revenue
-from aiml_idearanker.utils import load_json
+from aiml_idearanker.modelfile import from_bytes, load_model
+from aiml_idearanker.portfolio import select_portfolio
+from aiml_idearanker.pricing import optimize_revenue_batch
+from aiml_idearanker.utils import file_sha256
+
+
+DEFAULT_MODEL = "artifacts/model.json"
+SORT_COLUMNS = ["#", "prob_success", "expected_revenue", "expected_profit", "best_price", "projected_users", "dev_weeks"]
+MappingKey = Tuple[Tuple[str, str], ...]
+
+
+# Streamlit reruns this script on every widget change. Loading, parsing, scoring and pricing are
+# memoized by content hash (model payload, upload bytes, column mapping, unit cost; arguments
+# starting with "_" are not hashed by Streamlit), so a rerun only re-applies filters and sorting
+# to the cached results.
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def cached_model(model_hash: str, _data: Optional[bytes] = None, _path: str = DEFAULT_MODEL) -> IdeaRankerModel:
+	return from_bytes(_data) if _data is not None else load_model(_path)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_upload(upload_hash: str, _data: bytes) -> pd.DataFrame:
+	return pd.read_csv(io.BytesIO(_data))
+
+
+def mapped_features(df: pd.DataFrame, mapping: Dict[str, str]) -> FeatureMatrix:
+	# Vectorized column selection: one numeric conversion per mapped column instead of a dict per row.
+	# Non-numeric and empty cells read as 0; integer features are truncated like data.to_int.
+	columns = []
+	for name in FEATURE_COLUMNS:
+		values = pd.to_numeric(df[mapping[name]], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+		if name in INT_COLUMNS:
+			values = np.trunc(values)
+		columns.append(memoryview(np.ascontiguousarray(values)))
+	return FeatureMatrix(columns, FEATURE_COLUMNS)
+
+
+@st.cache_data(show_spinner="Scoring...", max_entries=4)
+def cached_scores(model_hash: str, upload_hash: str, mapping_key: MappingKey, _model: IdeaRankerModel, _df: pd.DataFrame) -> pd.DataFrame:
+	X = mapped_features(_df, dict(mapping_key))
+	users, weeks = np.array(X.columns[2]), np.array(X.columns[3])
+	# Hashed columns are looked up by the names the model was trained with
+	sparse = _model.hash_rows(_df.to_dict("records")) if _model.hashing is not None else None
+	probs = _model.predict_proba(X, copy=False, sparse=sparse)
+	return pd.DataFrame({
+		"#": np.arange(1, len(probs) + 1),
+		"prob_success": probs,
+		"projected_users": users,
+		"dev_weeks": weeks,
+	})
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_pricing(model_hash: str, upload_hash: str, mapping_key: MappingKey, unit_cost: float, _scores: pd.DataFrame) -> pd.DataFrame:
+	opt = optimize_revenue_batch(_scores["prob_success"].tolist(), _scores["projected_users"].tolist(), unit_cost=unit_cost)
+	return pd.DataFrame({
+		"#": _scores["#"],
+		"prob_success": _scores["prob_success"].round(6),
+		"projected_users": _scores["projected_users"].astype(np.int64),
+		"dev_weeks": _scores["dev_weeks"].astype(np.int64),
+		"best_price": np.round(opt["best_price"], 2),
+		"expected_revenue": np.round(opt["expected_revenue"], 2),
+		"expected_profit": np.round(opt["expected_profit"], 2),
+	})
+
+
+def apply_view(df: pd.DataFrame, min_users: float, min_prob: float, max_weeks: int, sort_by: str, descending: bool) -> pd.DataFrame:
+	mask = np.ones(len(df), dtype=bool)
+	if min_users > 0:
+		mask &= (df["projected_users"] >= min_users).to_numpy()
+	if min_prob > 0:
+		mask &= (df["prob_success"] >= min_prob).to_numpy()
+	if max_weeks > 0:
+		mask &= (df["dev_weeks"] <= max_weeks).to_numpy()
+	view = df[mask]
+	if sort_by != "#" or descending:
+		view = view.sort_values(sort_by, ascending=not descending, kind="stable")
+	return view
 
 
 st.set_page_config(page_title="IdeaRanker", page_icon="💡", layout="wide")
@@ -55,39 +134,44 @@ tab1, tab2, tab3 = st.tabs(["Data & Model", "Results", "Portfolio"])
 
 with tab1:
 	st.subheader("1) Load Model")
-	model_file = st.file_uploader("Upload model.json (optional)", type=["json"], key="model")
-	model: IdeaRankerModel
+	model_file = st.file_uploader("Upload model.json or model.bin (optional)", type=["json", "bin"], key="model")
+	model = IdeaRankerModel()
+	model_hash = ""
 	if model_file is not None:
 		try:
-			payload = json.loads(model_file.getvalue().decode("utf-8"))
-			model = IdeaRankerModel.from_dict(payload)
+			data = model_file.getvalue()
+			digest = hashlib.sha256(data).hexdigest()
+			model = cached_model(digest, data)
+			model_hash = digest
 			st.success("Model loaded from upload.")
 		except Exception as e:
 			st.error(f"Failed to load model: {e}")
 	else:
 		try:
-			payload = load_json("artifacts/model.json")
-			model = IdeaRankerModel.from_dict(payload)
-			st.info("Using default artifacts/model.json")
+			# A retrained model file has a new hash, so it is picked up on the next rerun
+			digest = file_sha256(DEFAULT_MODEL) if os.path.exists(DEFAULT_MODEL) else ""
+			model = cached_model(digest, _path=DEFAULT_MODEL)
+			model_hash = digest
+			st.info(f"Using default {DEFAULT_MODEL}")
 		except Exception:
-			model = IdeaRankerModel()
 			st.warning("No model provided. Upload model.json or train with CLI first.")
 
 	st.subheader("2) Load Ideas CSV")
 	st.caption("Required columns (or map your columns): \n" + ", ".join(FEATURE_COLUMNS))
 	ideas_file = st.file_uploader("Upload ideas CSV", type=["csv"], key="ideas")
 
-	raws: List[Dict[str, str]] = []
-	df_raw: pd.DataFrame | None = None
+	df_raw: Optional[pd.DataFrame] = None
+	upload_hash = ""
 	if ideas_file is not None:
 		try:
-			content = ideas_file.getvalue().decode("utf-8")
-			df_raw = pd.read_csv(io.StringIO(content))
+			content = ideas_file.getvalue()
+			upload_hash = hashlib.sha256(content).hexdigest()
+			df_raw = cached_upload(upload_hash, content)
 			st.success(f"Loaded {len(df_raw)} rows.")
 		except Exception as e:
 			st.error(f"Failed to parse CSV: {e}")
 
-	mapping = {}
+	mapping: Dict[str, str] = {}
 	if df_raw is not None:
 		st.subheader("3) Map Columns (if needed)")
 		cols = list(df_raw.columns)
@@ -101,16 +185,6 @@ with tab1:
 		with m3:
 			mapping["prior_similar_success_rate"] = st.selectbox("prior_similar_success_rate", cols, index=cols.index("prior_similar_success_rate") if "prior_similar_success_rate" in cols else 0)
 
-		raws = []
-		for _, r in df_raw.iterrows():
-			raws.append({
-				"novelty_score": r.get(mapping["novelty_score"], 0),
-				"feasibility_score": r.get(mapping["feasibility_score"], 0),
-				"projected_users": r.get(mapping["projected_users"], 0),
-				"est_dev_weeks": r.get(mapping["est_dev_weeks"], 0),
-				"prior_similar_success_rate": r.get(mapping["prior_similar_success_rate"], 0),
-			})
-
 	st.subheader("4) Filters")
 	f1, f2, f3 = st.columns(3)
 	with f1:
@@ -119,68 +193,61 @@ with tab1:
 		min_prob = st.number_input("Min probability", min_value=0.0, max_value=1.0, value=0.0, step=0.05)
 	with f3:
 		max_weeks_filter = st.number_input("Max dev weeks per idea", min_value=0, value=0, step=1)
+	s1, s2 = st.columns(2)
+	with s1:
+		sort_by = st.selectbox("Sort by", SORT_COLUMNS, index=0)
+	with s2:
+		descending = st.checkbox("Descending", value=False)
 
 	run = st.button("Predict + Price", type="primary")
 
+# Scores are keyed by what they depend on; the button records which inputs to show results for.
+# Filters, sorting and the unit cost are applied on every rerun to the cached scores.
+mapping_key: MappingKey = tuple(sorted(mapping.items()))
+inputs = (model_hash, upload_hash, mapping_key)
+if run and df_raw is not None:
+	st.session_state["scored"] = inputs
+results: Optional[pd.DataFrame] = None
+scored = st.session_state.get("scored")
+if scored is not None and scored == inputs and df_raw is not None:
+	scores = cached_scores(*inputs, model, df_raw)
+	priced = cached_pricing(*inputs, float(unit_cost), scores)
+	results = apply_view(priced, min_users, min_prob, int(max_weeks_filter), sort_by, descending)
+stale = scored is not None and results is None
+
 with tab2:
 	st.subheader("Results & Insights")
-	results_list = st.session_state.get('results', [])
-	if not results_list:
-		st.info("Run predictions in the 'Data & Model' tab.")
+	if results is None:
+		st.info("Inputs changed; click 'Predict + Price' to rescore." if stale else "Run predictions in the 'Data & Model' tab.")
 	else:
-		result_rows = results_list
-		probs_list = [r["prob_success"] for r in result_rows]
-		pmin = min(probs_list) if probs_list else 0.0
-		pavg = sum(probs_list) / len(probs_list) if probs_list else 0.0
-		pmax = max(probs_list) if probs_list else 0.0
-		rev_total = sum(r["expected_revenue"] for r in result_rows)
-		profit_total = sum(r["expected_profit"] for r in result_rows)
+		df_res = results
+		probs_col = df_res["prob_success"]
+		pmin = float(probs_col.min()) if len(df_res) else 0.0
+		pavg = float(probs_col.mean()) if len(df_res) else 0.0
+		pmax = float(probs_col.max()) if len(df_res) else 0.0
+		rev_total = float(df_res["expected_revenue"].sum())
+		profit_total = float(df_res["expected_profit"].sum())
 		c1, c2, c3, c4 = st.columns(4)
-		c1.markdown(f"<div class='kpi'><b>Ideas</b><br>{len(result_rows)}</div>", unsafe_allow_html=True)
+		c1.markdown(f"<div class='kpi'><b>Ideas</b><br>{len(df_res)}</div>", unsafe_allow_html=True)
 		c2.markdown(f"<div class='kpi'><b>Prob min/avg/max</b><br>{pmin:.3f}/{pavg:.3f}/{pmax:.3f}</div>", unsafe_allow_html=True)
 		c3.markdown(f"<div class='kpi'><b>Total revenue</b><br>${rev_total:,.2f}</div>", unsafe_allow_html=True)
 		c4.markdown(f"<div class='kpi'><b>Total profit</b><br>${profit_total:,.2f}</div>", unsafe_allow_html=True)
 		st.divider()
-		df_res = pd.DataFrame(result_rows)
 		chart_prob = alt.Chart(df_res).mark_bar().encode(x=alt.X("prob_success:Q", bin=True), y="count()").properties(height=180)
 		chart_rev = alt.Chart(df_res).mark_bar(color=primary).encode(x=alt.X("expected_revenue:Q", bin=True), y="count()").properties(height=180)
 		st.altair_chart(chart_prob | chart_rev, use_container_width=True)
-		st.dataframe(result_rows, use_container_width=True, hide_index=True)
+		st.dataframe(df_res, use_container_width=True, hide_index=True)
 
 with tab3:
 	st.subheader("Recommended Portfolio")
-	results_list = st.session_state.get('results', [])
-	if not results_list:
+	if results is None:
 		st.info("Run predictions first.")
 	else:
-		result_rows = results_list
-		def select_portfolio(items: List[Dict[str, float]], max_weeks: int) -> List[int]:
-			W = max(0, int(max_weeks))
-			n = len(items)
-			dp = [[0.0] * (W + 1) for _ in range(n + 1)]
-			for i in range(1, n + 1):
-				wt = max(0, int(items[i - 1]["weeks"]))
-				val = float(items[i - 1]["value"])
-				for w in range(W + 1):
-					if wt <= w:
-						dp[i][w] = max(dp[i - 1][w], dp[i - 1][w - wt] + val)
-					else:
-						dp[i][w] = dp[i - 1][w]
-			w = W
-			chosen: List[int] = []
-			for i in range(n, 0, -1):
-				if dp[i][w] != dp[i - 1][w]:
-					chosen.append(i - 1)
-					w -= max(0, int(items[i - 1]["weeks"]))
-			chosen.reverse()
-			return chosen
-
-		items = [{"weeks": r["dev_weeks"], "value": r["expected_revenue"]} for r in result_rows]
-		idxs = select_portfolio(items, int(max_weeks))
-		portfolio = [result_rows[i] for i in idxs]
-		p_weeks = sum(r["dev_weeks"] for r in portfolio)
-		p_rev = sum(r["expected_revenue"] for r in portfolio)
-		p_profit = sum(r["expected_profit"] for r in portfolio)
+		idxs = select_portfolio(results["expected_revenue"].tolist(), results["dev_weeks"].tolist(), int(max_weeks))
+		portfolio = results.iloc[idxs]
+		p_weeks = portfolio["dev_weeks"].sum()
+		p_rev = float(portfolio["expected_revenue"].sum())
+		p_profit = float(portfolio["expected_profit"].sum())
 		c1, c2, c3, c4 = st.columns(4)
 		c1.markdown(f"<div class='kpi'><b>Selected</b><br>{len(portfolio)} ideas</div>", unsafe_allow_html=True)
 		c2.markdown(f"<div class='kpi'><b>Total weeks</b><br>{int(p_weeks)}</div>", unsafe_allow_html=True)
@@ -188,40 +255,4 @@ with tab3:
 		c4.markdown(f"<div class='kpi'><b>Total profit</b><br>${p_profit:,.2f}</div>", unsafe_allow_html=True)
 		st.dataframe(portfolio, use_container_width=True, hide_index=True)
 
-# Initialize session keys safely
-if 'results' not in st.session_state or st.session_state['results'] is None:
-	st.session_state['results'] = []
-
-# Run pipeline when clicked in tab1
-if 'raws' not in locals():
-	raws = []
-
-if run and raws:
-	X, _ = build_features(raws)
-	probs = model.predict_proba(X)
-	result_rows: List[Dict[str, object]] = []
-	for i, (p, r) in enumerate(zip(probs, raws)):
-		projected_users = float(r.get("projected_users", 0) or 0)
-		est_weeks = float(r.get("est_dev_weeks", 0) or 0)
-		opt = optimize_revenue(p, projected_users, unit_cost=unit_cost)
-		result_rows.append({
-			"#": i + 1,
-			"prob_success": round(p, 6),
-			"projected_users": int(projected_users),
-			"dev_weeks": int(est_weeks),
-			"best_price": round(opt["best_price"], 2),
-			"expected_revenue": round(opt["expected_revenue"], 2),
-			"expected_profit": round(opt["expected_profit"], 2),
-		})
-	# store and filter/sort
-	if run:
-		res = result_rows
-		if min_users > 0:
-			res = [r for r in res if r["projected_users"] >= min_users]
-		if min_prob > 0:
-			res = [r for r in res if r["prob_success"] >= min_prob]
-		if max_weeks_filter > 0:
-			res = [r for r in res if r["dev_weeks"] <= max_weeks_filter]
-		st.session_state['results'] = res
-
 st.markdown("<footer class='fixed small'>IdeaRanker • Built for product leaders to ship the right ideas</footer>", unsafe_allow_html=True)
@@ -54,28 +54,62 @@
 		const url=URL.createObjectURL(blob); const a=document.createElement("a"); a.href=url; a.download=filename; a.click(); URL.revokeObjectURL(url);
 	}
 
-	// 0/1 Knapsack for portfolio selection
+	// 0/1 Knapsack for portfolio selection (same algorithm as aiml_idearanker/portfolio.py)
+	const DP_CELL_BUDGET = 50000000;
 	function selectPortfolio(items, maxWeeks){
 		// items: [{idx, weeks, value}] maximize value under sum weeks <= maxWeeks
 		const n=items.length; const W = Math.max(0, Math.floor(maxWeeks));
-		const dp = Array.from({length:n+1}, ()=>Array(W+1).fill(0));
-		for(let i=1;i<=n;i++){
-			const wt = Math.max(0, Math.floor(items[i-1].weeks));
-			const val = items[i-1].value;
-			for(let w=0; w<=W; w++){
-				if(wt<=w){ dp[i][w] = Math.max(dp[i-1][w], dp[i-1][w-wt] + val); }
-				else { dp[i][w] = dp[i-1][w]; }
+		const wts = items.map(it=>Math.max(0, Math.floor(it.weeks)));
+		// at most floor(W/wt) ideas of one length fit, and the most valuable ones are always preferable
+		const groups=new Map();
+		for(let i=0;i<n;i++){
+			if(wts[i]>W || !(items[i].value>0)) continue;
+			if(!groups.has(wts[i])) groups.set(wts[i], []);
+			groups.get(wts[i]).push(i);
+		}
+		let keep=[];
+		for(const [wt, idx] of groups){
+			const limit = wt>0 ? Math.floor(W/wt) : idx.length;
+			keep = keep.concat(idx.length>limit ? idx.slice().sort((a,b)=>items[b].value-items[a].value).slice(0,limit) : idx);
+		}
+		keep.sort((a,b)=>a-b);
+		const m=keep.length;
+		if(m*(W+1) > DP_CELL_BUDGET){ return greedyPortfolio(items, wts, W); }
+		// rolling 1-D DP; one bit per (item, weeks) cell records "item k improved dp[w]"
+		const dp = new Float64Array(W+1);
+		const stride = (W>>3)+1;
+		const choice = new Uint8Array(m*stride);
+		for(let k=0;k<m;k++){
+			const wt = wts[keep[k]]; const val = items[keep[k]].value;
+			const base = k*stride;
+			for(let w=W; w>=wt; w--){
+				const cand = dp[w-wt] + val;
+				if(cand > dp[w]){ dp[w] = cand; choice[base+(w>>3)] |= 1<<(w&7); }
 			}
 		}
 		// reconstruct
 		let w=W; const chosen=[];
-		for(let i=n;i>=1;i--){
-			if(dp[i][w]!==dp[i-1][w]){ chosen.push(i-1); w -= Math.max(0, Math.floor(items[i-1].weeks)); }
+		for(let k=m-1;k>=0;k--){
+			if(choice[k*stride+(w>>3)] & (1<<(w&7))){ chosen.push(keep[k]); w -= wts[keep[k]]; }
 		}
 		chosen.reverse();
 		return chosen; // indices into items
 	}
 
+	function greedyPortfolio(items, wts, W){
+		// value-density fill, or the single best item if that is worth more (1/2-approximation)
+		const dens = items.map((it,i)=>wts[i]>0 ? it.value/wts[i] : Infinity);
+		const order = items.map((_,i)=>i).filter(i=>items[i].value>0)
+			.sort((a,b)=>dens[a]===dens[b] ? 0 : (dens[b]>dens[a] ? 1 : -1));
+		let used=0, total=0, best=-1; const chosen=[];
+		for(const i of order){
+			if(used+wts[i]<=W){ chosen.push(i); used+=wts[i]; total+=items[i].value; }
+			if(wts[i]<=W && (best<0 || items[i].value>items[best].value)) best=i;
+		}
+		if(best>=0 && items[best].value>total) return [best];
+		return chosen.sort((a,b)=>a-b);
+	}
+
 	// State
 	let model=null; // {weights, scaler_means, scaler_stds}
 	let ideas=[]; // parsed rows